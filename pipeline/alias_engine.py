@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Answer aliases for players.
+
+Every alias is stored in normalized form (normalize_alias): case-folded,
+accents stripped, apostrophes and dots dropped, any other punctuation
+collapsed into single spaces. src/lib/answerIndex.js normalizes guesses the
+same way, so an exact guess is a single lookup in the exported answer index
+(answer_index.py).
+
+From a name the engine derives the full name, the surname (with its particle:
+"van persie", and without it: "persie") and first + last name. Names are split
+on spaces only, so a hyphenated part stays whole: "Oxlade-Chamberlain" gives
+"oxlade chamberlain", never "chamberlain", and "Son Heung-min" never "min".
+Nicknames (Wikidata altLabel / P1449 / P1559, passed in by the caller) are
+added as full strings only: their parts are often generic words ("gaucho") or
+legal names nobody answers with ("cuccittini").
+"""
+
+import re
+from typing import Iterable
+
+from text_normalization import fold_accents
+
+DROPPED_RE = re.compile(r"['’`.]")
+SEPARATOR_RE = re.compile(r"[^a-z0-9]+")
+
+# Surname particles kept with the surname ("van persie", "de bruyne", "dos santos")
+PARTICLES = {"van", "von", "der", "den", "de", "da", "di", "del", "della", "dos", "das", "do", "du", "le", "la", "ben", "el"}
+
+# Shortest alias worth accepting as an answer (the app ignores shorter guesses)
+MIN_ALIAS_LENGTH = 3
+
+
+def normalize_alias(text: str) -> str:
+    """Normalized answer form: "N'Golo Kanté" -> "ngolo kante"."""
+    text = DROPPED_RE.sub("", fold_accents(text).lower())
+    return SEPARATOR_RE.sub(" ", text).strip()
+
+
+def _surnames(words: list[str]) -> list[str]:
+    """Surname with and without its particles ("van persie", "persie")."""
+    start = len(words) - 1
+    while start > 1 and words[start - 1] in PARTICLES:
+        start -= 1
+    surnames = [" ".join(words[start:])]
+    if start < len(words) - 1:
+        surnames.append(words[-1])
+    return surnames
+
+
+def generate_aliases(name: str, nicknames: Iterable[str] = ()) -> list[str]:
+    """Normalized aliases of a player, most specific first, without duplicates."""
+    aliases = []
+    # Normalized space-separated words ("Heung-min" -> "heung min")
+    words = [w for w in map(normalize_alias, name.split()) if w]
+    if words:
+        aliases.append(" ".join(words))
+    if len(words) > 1:
+        aliases += _surnames(words)
+    if len(words) > 2:
+        aliases.append(f"{words[0]} {words[-1]}")
+
+    for nickname in nicknames:
+        alias = normalize_alias(nickname)
+        if alias:
+            aliases.append(alias)
+
+    return [a for a in dict.fromkeys(aliases) if len(a) >= MIN_ALIAS_LENGTH or a == aliases[0]]
+
+
+def generate_aliases_batch(players: Iterable[tuple[str, Iterable[str]]]) -> list[list[str]]:
+    """generate_aliases over many (name, nicknames) pairs."""
+    return [generate_aliases(name, nicknames) for name, nicknames in players]
@@ -4,11 +4,12 @@ Analyze player distribution by nationality and period.
 """
 
 import os
-import re
 import requests
 from collections import defaultdict
 from dotenv import load_dotenv
 
+from text_normalization import year_numbers
+
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL", "https://tjxdbdueayzlxgywigth.supabase.co")
@@ -83,11 +84,10 @@ def extract_years(years_str):
         return None, None
 
     # Find all 4-digit years
-    years = re.findall(r'\b(19\d{2}|20\d{2})\b', years_str)
+    years = year_numbers(years_str)
     if not years:
         return None, None
 
-    years = [int(y) for y in years]
     return min(years), max(years)
 
 
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Export the answer index the app checks guesses against (public/answer_index.json).
+
+The index maps every normalized alias (alias_engine.normalize_alias) to the
+players it names, so an exact guess is one dictionary lookup instead of a
+fuzzy scan over the player's aliases. Players are stored once in a list and
+referenced by position:
+
+  {
+    "version": 1,
+    "players": [[player_id, name], ...],
+    "aliases": {"van persie": [12], ...}
+  }
+
+Aliases come from player_quiz_payloads and are normalized again here, so rows
+written before the alias engine still index correctly.
+
+Run after uploads (scrape_players.py does this), then deploy the site:
+  python answer_index.py                     # Write ../public/answer_index.json
+  python answer_index.py path/to/index.json  # Write elsewhere
+"""
+
+import os
+import sys
+import json
+import logging
+
+import requests
+from dotenv import load_dotenv
+
+from alias_engine import generate_aliases, normalize_alias
+
+load_dotenv()
+
+log = logging.getLogger(__name__)
+
+SUPABASE_URL = os.getenv("SUPABASE_URL", "https://tjxdbdueayzlxgywigth.supabase.co")
+SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
+
+INDEX_VERSION = 1
+INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "public", "answer_index.json")
+
+
+def fetch_answer_players():
+    """(player_id, name, aliases) of every active quiz payload, or None on error."""
+    headers = {"apikey": SUPABASE_KEY, "Authorization": f"Bearer {SUPABASE_KEY}"}
+    players = []
+    last_id = None
+    limit = 1000
+
+    while True:
+        after = f"&player_id=gt.{last_id}" if last_id else ""
+        resp = requests.get(
+            f"{SUPABASE_URL}/rest/v1/player_quiz_payloads"
+            f"?select=player_id,name,aliases&is_active=eq.true{after}"
+            f"&order=player_id&limit={limit}",
+            headers=headers,
+        )
+        if resp.status_code != 200:
+            log.error(f"Failed to fetch players: {resp.status_code} {resp.text}")
+            return None
+
+        batch = resp.json()
+        players.extend((row["player_id"], row["name"], row.get("aliases") or []) for row in batch)
+        if len(batch) < limit:
+            break
+        last_id = batch[-1]["player_id"]
+
+    return players
+
+
+def build_answer_index(players) -> dict:
+    """Index of (player_id, name, aliases) rows: alias -> player positions."""
+    aliases = {}
+    for position, (_player_id, name, stored) in enumerate(players):
+        for alias in dict.fromkeys([*generate_aliases(name), *(normalize_alias(a) for a in stored)]):
+            if alias:
+                aliases.setdefault(alias, []).append(position)
+
+    return {
+        "version": INDEX_VERSION,
+        "players": [[player_id, name] for player_id, name, _ in players],
+        "aliases": aliases,
+    }
+
+
+def export_answer_index(path: str = INDEX_PATH) -> bool:
+    """Fetch players, build the index and write it. Returns True on success."""
+    if not SUPABASE_KEY:
+        log.warning("No Supabase key. Skipping answer index export.")
+        return False
+
+    players = fetch_answer_players()
+    if players is None:
+        return False
+
+    index = build_answer_index(players)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+
+    log.info(f"Answer index: {len(players)} players, {len(index['aliases'])} aliases -> {path}")
+    return True
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    ok = export_answer_index(sys.argv[1] if len(sys.argv) > 1 else INDEX_PATH)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Offline benchmarks for the scrape pipeline (no network, no Supabase).
+
+Usage:
+  python benchmarks.py memory [players]   # Career model memory, default 50k players
+  python benchmarks.py parse [pages]      # Parse throughput per worker count, default 4000 pages
+  python benchmarks.py regex [pages]      # Infobox parsing, per-field searches vs one scan
+"""
+
+import gc
+import os
+import random
+import re
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+
+from fix_countries import CLUB_COUNTRIES, COUNTRY_FLAGS
+from scrape_players import CareerEntry, Player, iter_parsed_pages, parse_career_from_wikitext
+
+CLUBS_PER_PLAYER = 8
+
+
+@dataclass
+class LegacyCareerEntry:
+    """CareerEntry before slots: per-instance __dict__, stored flag, no interning."""
+    years: str
+    club: str
+    country_code: str = ""
+    country_flag: str = ""
+    matches: int = 0
+    goals: int = 0
+    chronological_order: int = 0
+    sort_order: int = 0
+
+
+@dataclass
+class LegacyPlayer:
+    name: str
+    aliases: list = field(default_factory=list)
+    wikipedia_title: str = ""
+    wikidata_id: str = ""
+    difficulty: int = 3
+    career: list = field(default_factory=list)
+    revid: int = 0
+
+
+def _fresh(s: str) -> str:
+    """A new str object equal to s, like the ones re.sub hands back while parsing."""
+    return "".join(list(s))
+
+
+def synthetic_careers(n_players: int, seed: int = 42) -> list[list[tuple]]:
+    """(years, club, code, flag, matches, goals) rows drawn from the real club table."""
+    rng = random.Random(seed)
+    clubs = list(CLUB_COUNTRIES.items())
+    careers = []
+    for _ in range(n_players):
+        start = rng.randint(1980, 2015)
+        rows = []
+        for i in range(CLUBS_PER_PLAYER):
+            club, code = rng.choice(clubs)
+            rows.append((f"{start + 2 * i}–{start + 2 * i + 2}", club, code, COUNTRY_FLAGS.get(code, ""),
+                         rng.randint(0, 200), rng.randint(0, 50)))
+        careers.append(rows)
+    return careers
+
+
+def build_legacy(careers):
+    return [LegacyPlayer(name=f"Player {i}", career=[
+        LegacyCareerEntry(_fresh(years), _fresh(club), _fresh(code), _fresh(flag), matches, goals, j + 1)
+        for j, (years, club, code, flag, matches, goals) in enumerate(rows)
+    ]) for i, rows in enumerate(careers)]
+
+
+def build_current(careers):
+    return [Player(name=f"Player {i}", career=[
+        CareerEntry(_fresh(years), sys.intern(_fresh(club)), sys.intern(_fresh(code)), matches, goals, j + 1)
+        for j, (years, club, code, _flag, matches, goals) in enumerate(rows)
+    ]) for i, rows in enumerate(careers)]
+
+
+def measure(build, careers) -> tuple[float, float]:
+    """(MB held by the built players, seconds to build them)."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    players = build(careers)
+    elapsed = time.perf_counter() - start
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del players
+    return size / 1e6, elapsed
+
+
+def bench_memory(n_players: int = 50_000):
+    careers = synthetic_careers(n_players)
+    print(f"{n_players} players x {CLUBS_PER_PLAYER} clubs")
+    legacy_mb, legacy_s = measure(build_legacy, careers)
+    current_mb, current_s = measure(build_current, careers)
+    print(f"  dataclass + stored flag : {legacy_mb:7.1f} MB  {legacy_s:5.2f} s")
+    print(f"  slots + derived flag    : {current_mb:7.1f} MB  {current_s:5.2f} s")
+    print(f"  reduction               : {100 * (1 - current_mb / legacy_mb):6.1f} %")
+
+
+# Prose after the infobox: real pages are tens of KB, and every field search
+# that finds nothing scans all of it
+FILLER = "He was known for his vision and passing. [[Category:Footballers]]\n" * 300
+
+
+def synthetic_wikitext(name: str, rows: list[tuple]) -> str:
+    lines = ["{{Infobox football biography", f"| name = {name}"]
+    for i, (years, club, _code, _flag, matches, goals) in enumerate(rows, 1):
+        lines += [f"| years{i} = {years}", f"| clubs{i} = → [[{club} F.C.|{club}]] (loan)",
+                  f"| caps{i} = {matches}", f"| goals{i} = {goals}"]
+    return "\n".join(lines) + "\n}}\n" + FILLER
+
+
+def bench_parse(n_pages: int = 4000):
+    careers = synthetic_careers(n_pages)
+    pages = [({"name": f"Zinédine Zidane {i}"}, synthetic_wikitext(f"Player {i}", rows), 0)
+             for i, rows in enumerate(careers)]
+    print(f"{n_pages} pages of {len(pages[0][1]) // 1000} KB, {os.cpu_count()} CPUs")
+
+    baseline = None
+    for workers in sorted({0, 1, 2, 4, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        parsed = sum(1 for _ in iter_parsed_pages(pages, workers))
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"  workers={workers:<2} {parsed / elapsed:8.0f} pages/s  x{baseline / elapsed:4.2f}")
+
+
+def legacy_parse(wikitext: str) -> list[tuple]:
+    """Infobox parsing before text_normalization: one f-string search per field, four subs per club."""
+    def extract(name):
+        match = re.search(rf'\|\s*{re.escape(name)}\s*=\s*(.*?)(?=\n\s*\||\n\s*\}})', wikitext, re.DOTALL)
+        return match.group(1).strip() if match else None
+
+    def clean_club(raw):
+        raw = re.sub(r'→\s*', '', raw)
+        raw = re.sub(r'\[\[([^\]|]*)\|([^\]]*)\]\]', r'\2', raw)
+        raw = re.sub(r'\[\[([^\]]*)\]\]', r'\1', raw)
+        raw = re.sub(r"<[^>]+>|\{\{[^}]*\}\}|'''?|\(loan\)", "", raw, flags=re.IGNORECASE)
+        return raw.strip()
+
+    def parse_int(raw):
+        match = re.search(r'\d+', raw) if raw else None
+        return min(int(match.group()), 2000) if match else 0
+
+    entries = []
+    for i in range(1, 30):
+        years, clubs = extract(f"years{i}"), extract(f"clubs{i}")
+        caps, goals = extract(f"caps{i}"), extract(f"goals{i}")
+        if not clubs:
+            break
+        club = clean_club(clubs)
+        if club:
+            years = re.sub(r'[–—]', '–', re.sub(r'\[\[([^\]]*)\]\]|\{\{[^}]*\}\}', r'\1', years)).strip() \
+                if years else ""
+            entries.append((years, club, parse_int(caps), parse_int(goals), i))
+    return entries
+
+
+def bench_regex(n_pages: int = 4000):
+    pages = [synthetic_wikitext(f"Player {i}", rows) for i, rows in enumerate(synthetic_careers(n_pages))]
+    same = all(legacy_parse(p) == [(e.years, e.club, e.matches, e.goals, e.chronological_order)
+                                   for e in parse_career_from_wikitext(p)] for p in pages[:200])
+    print(f"{n_pages} pages of {len(pages[0]) // 1000} KB, same careers: {same}")
+
+    timings = {}
+    for label, parse in (("per-field searches", legacy_parse), ("one precompiled scan", parse_career_from_wikitext)):
+        start = time.perf_counter()
+        for page in pages:
+            parse(page)
+        timings[label] = time.perf_counter() - start
+        print(f"  {label:21} {n_pages / timings[label]:8.0f} pages/s")
+    print(f"  speedup               x{timings['per-field searches'] / timings['one precompiled scan']:.2f}")
+
+
+if __name__ == "__main__":
+    mode = sys.argv[1] if len(sys.argv) > 1 else "memory"
+    if mode == "memory":
+        bench_memory(int(sys.argv[2]) if len(sys.argv) > 2 else 50_000)
+    elif mode == "parse":
+        bench_parse(int(sys.argv[2]) if len(sys.argv) > 2 else 4000)
+    elif mode == "regex":
+        bench_regex(int(sys.argv[2]) if len(sys.argv) > 2 else 4000)
+    else:
+        print(__doc__)
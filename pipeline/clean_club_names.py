@@ -9,6 +9,8 @@ import re
 import requests
 from dotenv import load_dotenv
 
+from quiz_payloads import refresh_quiz_payloads
+
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL", "https://tjxdbdueayzlxgywigth.supabase.co")
@@ -51,7 +53,7 @@ def fix_malformed_clubs():
     print("Fetching career entries with malformed club names...")
 
     # Get entries where club contains "|" (indicating malformed data)
-    resp = supabase_request("GET", "career_entries?club=like.*|*&select=id,club&limit=1000")
+    resp = supabase_request("GET", "career_entries?club=like.*|*&select=id,player_id,club&limit=1000")
 
     if resp.status_code != 200:
         print(f"Error fetching entries: {resp.status_code} {resp.text}")
@@ -67,6 +69,7 @@ def fix_malformed_clubs():
     # Process and update each entry
     updated = 0
     errors = 0
+    touched_players = set()
 
     for entry in entries:
         old_club = entry["club"]
@@ -84,12 +87,15 @@ def fix_malformed_clubs():
 
         if resp.status_code in (200, 204):
             updated += 1
+            touched_players.add(entry["player_id"])
             if updated <= 10:  # Show first 10 examples
                 print(f"  Fixed: '{old_club[:50]}...' -> '{new_club}'")
         else:
             errors += 1
             print(f"  Error updating {entry['id']}: {resp.status_code}")
 
+    refresh_quiz_payloads(touched_players)
+
     print(f"\n=== Results ===")
     print(f"Updated: {updated} entries")
     print(f"Errors: {errors}")
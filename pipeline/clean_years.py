@@ -8,6 +8,8 @@ import os
 import requests
 from dotenv import load_dotenv
 
+from quiz_payloads import refresh_quiz_payloads
+
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL", "https://tjxdbdueayzlxgywigth.supabase.co")
@@ -50,7 +52,7 @@ def fix_malformed_years():
     print("Fetching career entries with malformed years...")
 
     # Get entries where years contains "|" (indicating malformed data)
-    resp = supabase_request("GET", "career_entries?years=like.*|*&select=id,years&limit=1000")
+    resp = supabase_request("GET", "career_entries?years=like.*|*&select=id,player_id,years&limit=1000")
 
     if resp.status_code != 200:
         print(f"Error fetching entries: {resp.status_code} {resp.text}")
@@ -66,6 +68,7 @@ def fix_malformed_years():
     # Process and update each entry
     updated = 0
     errors = 0
+    touched_players = set()
 
     for entry in entries:
         old_years = entry["years"]
@@ -83,12 +86,15 @@ def fix_malformed_years():
 
         if resp.status_code in (200, 204):
             updated += 1
+            touched_players.add(entry["player_id"])
             if updated <= 15:  # Show first 15 examples
                 print(f"  Fixed: '{old_years[:60]}...' -> '{new_years}'")
         else:
             errors += 1
             print(f"  Error updating {entry['id']}: {resp.status_code}")
 
+    refresh_quiz_payloads(touched_players)
+
     print(f"\n=== Results ===")
     print(f"Updated: {updated} entries")
     print(f"Errors: {errors}")
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Rule-based data-quality pass over career_entries and players.
+
+Replaces clean_club_names.py, clean_years.py, remove_prefix.py,
+fix_countries.py, fix_nigeria.py and fix_nationality_codes.py. Each rule is a
+(filter, transform) pair reusing those scripts' functions. Both tables are
+scanned once with keyset paging, all rules run on every row, and changed rows
+are grouped by their new values and written back with bulk
+`id=in.(...)` PATCHes: one request per distinct new value and 100 rows,
+instead of one request per row.
+
+Rules that only need string functions also exist as a Postgres function
+(supabase/add_cleanup_rules.sql). `sql` mode runs those server-side, one RPC
+call per rule, and the rest of the rules through the scan above.
+
+Usage:
+  python cleanup_engine.py          # Apply all rules
+  python cleanup_engine.py dry      # Count hits per rule and show samples
+  python cleanup_engine.py sql      # Apply SQL rules server-side, then the rest
+  python cleanup_engine.py sql dry  # Server-side counts and samples for SQL rules
+"""
+
+import os
+import logging
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Callable
+
+import requests
+from dotenv import load_dotenv
+
+from clean_club_names import clean_club_name
+from clean_years import clean_years
+from remove_prefix import strip_number_prefix
+from fix_countries import guess_country
+from fix_nationality_codes import NATIONALITY_FIXES, COUNTRY_FLAGS as NATIONALITY_FLAGS
+from quiz_payloads import refresh_quiz_payloads
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+log = logging.getLogger(__name__)
+
+SUPABASE_URL = os.getenv("SUPABASE_URL", "https://tjxdbdueayzlxgywigth.supabase.co")
+SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
+
+SCAN_PAGE_SIZE = 1000
+PATCH_BATCH_SIZE = 100  # ids per id=in.(...) filter, keeps URLs short
+
+
+@dataclass
+class Rule:
+    name: str
+    table: str
+    applies: Callable[[dict], bool]
+    transform: Callable[[dict], dict]  # returns the columns to change
+
+
+def _country_fix(row):
+    code, flag = guess_country(row["club"])
+    return {"country_code": code, "country_flag": flag} if code else {}
+
+
+def _nationality_code_fix(row):
+    code = NATIONALITY_FIXES[row["nationality"]]
+    return {"nationality_code": code, "nationality_flag": NATIONALITY_FLAGS.get(code, "🏳️")}
+
+
+# Rules run in order on the same row, so later rules see earlier fixes
+# (e.g. the country is guessed from the cleaned club name).
+CAREER_RULES = [
+    Rule("club_pipe_tail", "career_entries",
+         lambda r: "|" in r["club"], lambda r: {"club": clean_club_name(r["club"])}),
+    Rule("years_pipe_tail", "career_entries",
+         lambda r: "|" in (r["years"] or ""), lambda r: {"years": clean_years(r["years"])}),
+    Rule("club_number_prefix", "career_entries",
+         lambda r: r["club"].startswith("1. "), lambda r: {"club": strip_number_prefix(r["club"])}),
+    Rule("missing_country", "career_entries",
+         lambda r: not r["country_code"], _country_fix),
+]
+
+PLAYER_RULES = [
+    # Nigerian players were coded NE (Niger) by the nationality import
+    Rule("niger_to_nigeria", "players",
+         lambda r: r["nationality_code"] == "NE",
+         lambda r: {"nationality": "Nigeria", "nationality_code": "NG", "nationality_flag": "🇳🇬"}),
+    Rule("missing_nationality_code", "players",
+         lambda r: not r["nationality_code"] and r["nationality"] in NATIONALITY_FIXES,
+         _nationality_code_fix),
+]
+
+# Rules run_cleanup_rule() implements in SQL (same names as above)
+SQL_RULES = ["club_pipe_tail", "years_pipe_tail", "club_number_prefix", "niger_to_nigeria"]
+
+# Columns each table scan needs (rules read these, player_id feeds the payload refresh)
+SCAN_COLUMNS = {
+    "career_entries": "id,player_id,club,years,country_code",
+    "players": "id,nationality,nationality_code",
+}
+
+
+def _headers(**extra):
+    return {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Content-Type": "application/json",
+        **extra,
+    }
+
+
+def scan_table(table):
+    """Yield every row of a table, paging on id (stable under concurrent updates)."""
+    last_id = None
+    while True:
+        url = f"{SUPABASE_URL}/rest/v1/{table}?select={SCAN_COLUMNS[table]}&order=id&limit={SCAN_PAGE_SIZE}"
+        if last_id:
+            url += f"&id=gt.{last_id}"
+        resp = requests.get(url, headers=_headers())
+        if resp.status_code != 200:
+            raise RuntimeError(f"Failed to scan {table}: {resp.status_code} {resp.text}")
+
+        batch = resp.json()
+        yield from batch
+        if len(batch) < SCAN_PAGE_SIZE:
+            break
+        last_id = batch[-1]["id"]
+
+
+def apply_rules(row, rules, hits):
+    """Run every matching rule on a copy of row; return {column: new value} for what changed."""
+    fixed = dict(row)
+    for rule in rules:
+        if rule.applies(fixed):
+            change = rule.transform(fixed)
+            if any(fixed.get(k) != v for k, v in change.items()):
+                hits[rule.name] += 1
+                fixed.update(change)
+    return {k: v for k, v in fixed.items() if row.get(k) != v}
+
+
+def plan_changes(table, rules, hits, samples):
+    """Scan a table once. Returns ({frozen changes: [ids]}, touched player ids)."""
+    groups = defaultdict(list)
+    touched_players = set()
+    for row in scan_table(table):
+        changes = apply_rules(row, rules, hits)
+        if not changes:
+            continue
+        groups[tuple(sorted(changes.items()))].append(row["id"])
+        touched_players.add(row.get("player_id", row["id"]))
+        if len(samples) < 20:
+            samples.append((table, {k: row.get(k) for k in changes}, changes))
+    return groups, touched_players
+
+
+def write_changes(table, groups):
+    """PATCH each group of rows sharing the same new values, 100 ids per request."""
+    updated = 0
+    errors = 0
+    for changes, ids in groups.items():
+        for i in range(0, len(ids), PATCH_BATCH_SIZE):
+            batch_ids = ids[i:i + PATCH_BATCH_SIZE]
+            resp = requests.patch(
+                f"{SUPABASE_URL}/rest/v1/{table}?id=in.({','.join(batch_ids)})",
+                headers=_headers(Prefer="return=minimal"),
+                json=dict(changes),
+            )
+            if resp.status_code in (200, 204):
+                updated += len(batch_ids)
+            else:
+                errors += len(batch_ids)
+                log.warning(f"  Error updating {len(batch_ids)} {table} rows: {resp.status_code} {resp.text}")
+    return updated, errors
+
+
+def run_sql_rule(rule, dry_run=False):
+    """Run one rule server-side. Returns {rule, affected, dry_run, samples}."""
+    resp = requests.post(f"{SUPABASE_URL}/rest/v1/rpc/run_cleanup_rule", headers=_headers(),
+                         json={"p_rule": rule, "p_dry_run": dry_run})
+    if resp.status_code != 200:
+        raise RuntimeError(f"Cleanup rule {rule} failed: {resp.status_code} {resp.text}")
+    return resp.json()
+
+
+def run_sql_cleanup(dry_run=False):
+    """Run SQL_RULES server-side; unless dry, follow with the remaining rules in Python."""
+    log.info("=== Running Cleanup Rules in SQL ===")
+    for rule in SQL_RULES:
+        result = run_sql_rule(rule, dry_run)
+        log.info(f"  {rule:26} {result['affected']}")
+        for sample in result["samples"][:3]:
+            log.info(f"    {sample['before']!r} -> {sample['after']!r}")
+
+    if not dry_run:
+        run_cleanup(skip=SQL_RULES)
+
+
+def run_cleanup(dry_run=False, skip=()):
+    log.info("=== Running Cleanup Rules ===")
+    hits = Counter()
+    samples = []
+    touched_players = set()
+
+    for table, rules in (("career_entries", CAREER_RULES), ("players", PLAYER_RULES)):
+        rules = [r for r in rules if r.name not in skip]
+        groups, touched = plan_changes(table, rules, hits, samples)
+        rows = sum(len(ids) for ids in groups.values())
+        log.info(f"{table}: {rows} rows to fix in {len(groups)} distinct updates")
+        if not dry_run:
+            updated, errors = write_changes(table, groups)
+            log.info(f"{table}: updated {updated}, errors {errors}")
+            touched_players |= touched
+
+    log.info("Hits per rule:")
+    for rule in CAREER_RULES + PLAYER_RULES:
+        if rule.name in skip:
+            continue
+        log.info(f"  {rule.name:26} {hits[rule.name]}")
+    for table, before, after in samples[:10]:
+        log.info(f"  {table}: {before} -> {after}")
+
+    if not dry_run:
+        refresh_quiz_payloads(touched_players)
+    log.info("=== Done ===")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if not SUPABASE_KEY:
+        log.error("SUPABASE_SERVICE_KEY not set in environment")
+        sys.exit(1)
+
+    if len(sys.argv) > 1 and sys.argv[1] == "sql":
+        run_sql_cleanup(dry_run=len(sys.argv) > 2 and sys.argv[2] == "dry")
+    else:
+        run_cleanup(dry_run=len(sys.argv) > 1 and sys.argv[1] == "dry")
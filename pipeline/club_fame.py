@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Precompute club fame (club_fame table) and reorder careers with it.
+
+A club's fame (0-10) combines how many players in the database played there
+(log-scaled against the busiest club), the tier of its country's league and,
+optionally, its English Wikipedia pageviews over the last 12 months. Pageviews
+are fetched once per article and cached in cache/club_pageviews.json.
+
+The scores are written to club_fame and cached in cache/club_fame.json, keyed
+by club_key and by every infobox label of the club, so the scraper's
+compute_reveal_order looks each entry up in a dict. recompute_sort_orders()
+then rewrites sort_order of every existing career in one server-side update.
+
+Run after large scrapes, e.g. monthly:
+  python club_fame.py && python club_fame.py reorder
+
+Requires supabase/add_club_fame.sql.
+
+Usage:
+  python club_fame.py               # Recompute fame (cached pageviews only)
+  python club_fame.py pageviews     # Same, fetching pageviews of clubs not cached yet
+  python club_fame.py reorder       # Rewrite sort_order of all career entries
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import logging
+from datetime import date
+from typing import Optional
+from urllib.parse import quote
+
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+log = logging.getLogger(__name__)
+
+SUPABASE_URL = os.getenv("SUPABASE_URL", "https://tjxdbdueayzlxgywigth.supabase.co")
+SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+FAME_CACHE = os.path.join(CACHE_DIR, "club_fame.json")
+PAGEVIEWS_CACHE = os.path.join(CACHE_DIR, "club_pageviews.json")
+
+PAGEVIEWS_URL = "https://wikimedia.org/api/rest_v1/metrics/pageviews/per-article/en.wikipedia/all-access/user"
+
+# League tier per country: 1 = top five leagues, 2 = strong leagues, anything else 3
+LEAGUE_TIERS = {
+    "EN": 1, "ES": 1, "IT": 1, "DE": 1, "FR": 1,
+    "PT": 2, "NL": 2, "BE": 2, "TR": 2, "SC": 2, "BR": 2, "AR": 2, "RU": 2,
+}
+TIER_SCORES = {1: 1.0, 2: 0.6, 3: 0.25}
+
+# Weights of (players, tier, pageviews); without pageviews the first two are rescaled
+FAME_WEIGHTS = (0.6, 0.2, 0.2)
+
+UPSERT_BATCH_SIZE = 1000
+
+
+def _headers(**extra):
+    return {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Content-Type": "application/json",
+        **extra,
+    }
+
+
+def compute_fame(players: int, tier: int, pageviews: Optional[int],
+                 max_players: int, max_pageviews: int) -> float:
+    """Fame score 0-10 of one club."""
+    w_players, w_tier, w_views = FAME_WEIGHTS
+    score = w_players * math.log1p(players) / math.log1p(max(max_players, 1)) + w_tier * TIER_SCORES[tier]
+    if max_pageviews:
+        score += w_views * math.log1p(pageviews or 0) / math.log1p(max_pageviews)
+    else:
+        score /= w_players + w_tier
+    return round(10 * score, 3)
+
+
+class FameTable:
+    """club_key -> fame and infobox label -> fame (the highest fame among clubs using that label)."""
+
+    def __init__(self, keys: dict[str, float], names: dict[str, float]):
+        self.keys = keys
+        self.names = names
+
+    def lookup(self, club: str, key: str = "") -> float:
+        """Fame of a club by club_key when known, else by its infobox label (0 if unknown)."""
+        return self.keys[key] if key in self.keys else self.names.get(club, 0.0)
+
+    @classmethod
+    def from_clubs(cls, clubs: list[dict], fame: dict[str, float]) -> "FameTable":
+        keys, names = {}, {}
+        for club in clubs:
+            score = fame.get(club["id"], 0.0)
+            keys[club["club_key"]] = score
+            for label in club.get("aliases") or [club["name"]]:
+                names[label] = max(score, names.get(label, 0.0))
+        return cls(keys, names)
+
+    def save(self, path: str = FAME_CACHE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"keys": self.keys, "names": self.names}, f, ensure_ascii=False)
+
+
+_fame_table = None
+
+
+def fame_table() -> FameTable:
+    """The cached fame table; fetched from club_fame when no cache exists yet (empty without a key)."""
+    global _fame_table
+    if _fame_table is None:
+        if os.path.exists(FAME_CACHE):
+            with open(FAME_CACHE, encoding="utf-8") as f:
+                data = json.load(f)
+            _fame_table = FameTable(data["keys"], data["names"])
+        else:
+            clubs = fetch_clubs() if SUPABASE_KEY else None
+            rows = fetch_rows("club_fame?select=club_id,fame", "club_id") if clubs is not None else None
+            if rows:
+                _fame_table = FameTable.from_clubs(clubs, {r["club_id"]: r["fame"] for r in rows})
+                _fame_table.save()
+            else:
+                log.warning("No club fame yet (run club_fame.py): reveal order falls back to appearances")
+                _fame_table = FameTable({}, {})
+    return _fame_table
+
+
+def fetch_rows(endpoint: str, key: str) -> Optional[list[dict]]:
+    """Every row of a PostgREST query, keyset-paged on `key`. None on error."""
+    rows = []
+    last = None
+    limit = 1000
+    while True:
+        after = f"&{key}=gt.{last}" if last else ""
+        resp = requests.get(f"{SUPABASE_URL}/rest/v1/{endpoint}{after}&order={key}&limit={limit}",
+                            headers=_headers())
+        if resp.status_code != 200:
+            log.error(f"Failed to fetch {endpoint.split('?')[0]}: {resp.status_code} {resp.text}")
+            return None
+        batch = resp.json()
+        rows.extend(batch)
+        if len(batch) < limit:
+            return rows
+        last = batch[-1][key]
+
+
+def fetch_clubs() -> Optional[list[dict]]:
+    return fetch_rows("clubs?select=id,club_key,name,aliases,country_code,wikidata_id", "id")
+
+
+def fetch_player_counts() -> Optional[dict[str, int]]:
+    """{club_id: distinct players}. The RPC returns a set, capped at max-rows per call: page it."""
+    rows = fetch_rows("rpc/club_player_counts?select=club_id,players", "club_id")
+    return None if rows is None else {row["club_id"]: row["players"] for row in rows}
+
+
+def fetch_pageviews(title: str, session: requests.Session) -> Optional[int]:
+    """English Wikipedia views of an article over the last 12 full months (None on error)."""
+    today = date.today()
+    end = date(today.year, today.month, 1)
+    start = date(end.year - 1, end.month, 1)
+    url = f"{PAGEVIEWS_URL}/{quote(title.replace(' ', '_'), safe='')}/monthly/" \
+          f"{start:%Y%m%d}00/{end:%Y%m%d}00"
+    try:
+        resp = session.get(url, timeout=30)
+    except requests.RequestException as e:
+        log.warning(f"Pageviews failed for {title}: {e}")
+        return None
+    if resp.status_code == 404:
+        return 0
+    if resp.status_code != 200:
+        log.warning(f"Pageviews failed for {title}: {resp.status_code}")
+        return None
+    return sum(item["views"] for item in resp.json().get("items", []))
+
+
+def load_pageviews(titles: list[str], fetch_missing: bool) -> dict[str, int]:
+    """{article: views} from the local cache, fetching uncached articles if asked."""
+    cache = {}
+    if os.path.exists(PAGEVIEWS_CACHE):
+        with open(PAGEVIEWS_CACHE, encoding="utf-8") as f:
+            cache = json.load(f)
+
+    missing = [t for t in titles if t not in cache]
+    if fetch_missing and missing:
+        log.info(f"Fetching pageviews of {len(missing)} club articles")
+        session = requests.Session()
+        session.headers["User-Agent"] = "CareerQuizBot/1.0 (https://github.com/adroual/career-quiz; adroual@gmail.com)"
+        for i, title in enumerate(missing):
+            views = fetch_pageviews(title, session)
+            if views is not None:
+                cache[title] = views
+            if i % 200 == 199:
+                log.info(f"  {i + 1}/{len(missing)}")
+            time.sleep(0.05)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(PAGEVIEWS_CACHE, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False)
+
+    return {t: cache[t] for t in titles if t in cache}
+
+
+def run_fame(fetch_pageviews_missing: bool = False):
+    log.info("=== Computing Club Fame ===")
+    clubs = fetch_clubs()
+    counts = fetch_player_counts()
+    if clubs is None or counts is None:
+        return
+
+    # Clubs with a Wikidata item are named after their Wikipedia article
+    titles = [c["name"] for c in clubs if c.get("wikidata_id")]
+    pageviews = load_pageviews(titles, fetch_pageviews_missing)
+    max_players = max(counts.values(), default=1)
+    max_pageviews = max(pageviews.values(), default=0)
+    log.info(f"{len(clubs)} clubs, busiest has {max_players} players, "
+             f"pageviews for {len(pageviews)}/{len(titles)} articles")
+
+    rows = []
+    for club in clubs:
+        tier = LEAGUE_TIERS.get(club.get("country_code") or "", 3)
+        views = pageviews.get(club["name"]) if club.get("wikidata_id") else None
+        players = counts.get(club["id"], 0)
+        rows.append({
+            "club_id": club["id"], "players": players, "tier": tier, "pageviews": views,
+            "fame": compute_fame(players, tier, views, max_players, max_pageviews),
+        })
+
+    for i in range(0, len(rows), UPSERT_BATCH_SIZE):
+        resp = requests.post(
+            f"{SUPABASE_URL}/rest/v1/club_fame?on_conflict=club_id",
+            headers=_headers(Prefer="resolution=merge-duplicates,return=minimal"),
+            json=rows[i:i + UPSERT_BATCH_SIZE],
+        )
+        if resp.status_code not in (200, 201):
+            return log.error(f"Failed to write club fame: {resp.status_code} {resp.text}")
+
+    FameTable.from_clubs(clubs, {r["club_id"]: r["fame"] for r in rows}).save()
+    top = sorted(zip(clubs, rows), key=lambda cr: cr[1]["fame"], reverse=True)[:10]
+    for club, row in top:
+        log.info(f"  {row['fame']:5.2f}  {club['name']} ({row['players']} players)")
+    log.info(f"Done! Wrote fame of {len(rows)} clubs to club_fame and {FAME_CACHE}")
+
+
+def run_reorder():
+    log.info("=== Recomputing Reveal Order ===")
+    resp = requests.post(f"{SUPABASE_URL}/rest/v1/rpc/recompute_sort_orders", headers=_headers(), json={})
+    if resp.status_code != 200:
+        return log.error(f"Failed to recompute sort orders: {resp.status_code} {resp.text}")
+    log.info(f"Done! Reordered the careers of {resp.json()} players")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if not SUPABASE_KEY:
+        log.error("SUPABASE_SERVICE_KEY not set in environment")
+        sys.exit(1)
+
+    mode = sys.argv[1] if len(sys.argv) > 1 else ""
+    if mode == "reorder":
+        run_reorder()
+    else:
+        run_fame(fetch_pageviews_missing=mode == "pageviews")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Fuzzy club-name index, used by fix_countries.guess_country (and through it the
+scraper and cleanup_engine) when a club is not an exact CLUB_COUNTRIES key.
+
+Names are normalized (accents folded, punctuation dropped, stopwords such as
+FC/AC/SC/CF and reserve markers such as "B"/"II" removed) and split into
+tokens. An inverted index maps each token to the known clubs containing it, so
+a lookup only scores clubs sharing a token with the query. The score is an
+IDF-weighted token-set Dice coefficient: common tokens ("united", "real")
+count little, and tokens unknown to the table count as much as the rarest ones,
+so "Inter Turku" does not match "Inter Milan".
+
+A match needs a score >= threshold and no club from another country within
+`margin` of it. That includes exact hits: clubs from two countries with the
+same tokens ("Wrexham", "Guarani") are a tie. Otherwise the name is
+unresolved, and near ties are recorded in `ambiguous` for the report.
+
+Usage:
+  python club_index.py "Olympique de Marseille" "FC Barcelona B"
+"""
+
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Optional
+
+from text_normalization import normalize_key
+
+# Legal-form prefixes and suffixes, articles, and reserve/youth team markers
+STOPWORDS = {
+    "fc", "ac", "sc", "cf", "afc", "cfc", "fk", "sk", "sv", "cd", "as", "ss", "us", "ca",
+    "football", "de", "del", "la", "le", "of", "the",
+    "b", "ii", "reserves", "youth", "u19", "u21", "u23",
+}
+
+MATCH_THRESHOLD = 0.75
+AMBIGUITY_MARGIN = 0.1
+
+
+@dataclass
+class ClubMatch:
+    club: str
+    code: str
+    score: float
+
+
+def club_tokens(name: str) -> frozenset[str]:
+    """Significant tokens of a club name (all tokens if every one is a stopword)."""
+    tokens = normalize_key(name).split()
+    return frozenset(t for t in tokens if t not in STOPWORDS) or frozenset(tokens)
+
+
+class ClubIndex:
+    def __init__(self, clubs: dict[str, str], threshold: float = MATCH_THRESHOLD,
+                 margin: float = AMBIGUITY_MARGIN):
+        self.threshold = threshold
+        self.margin = margin
+        self.ambiguous: dict[str, list[ClubMatch]] = {}
+
+        self.names = list(clubs)
+        self.codes = [clubs[name] for name in self.names]
+        self.tokens = [club_tokens(name) for name in self.names]
+        # Clubs from different countries can share a token set (Wrexham, Nacional):
+        # keep one club per country so a lookup sees the tie
+        self.exact = defaultdict(dict)
+        for i, tokens in enumerate(self.tokens):
+            self.exact[tokens].setdefault(self.codes[i], i)
+
+        self.postings = defaultdict(list)
+        for i, tokens in enumerate(self.tokens):
+            for token in tokens:
+                self.postings[token].append(i)
+
+        n = len(self.names)
+        self.idf = {token: math.log(n / len(ids)) + 1 for token, ids in self.postings.items()}
+        self.unknown_weight = math.log(n) + 1
+        self.weights = [sum(self.idf[t] for t in tokens) for tokens in self.tokens]
+
+    def _weight(self, token: str) -> float:
+        return self.idf.get(token, self.unknown_weight)
+
+    def candidates(self, name: str, limit: int = 5) -> list[ClubMatch]:
+        """Best-scoring known clubs for a name, best first."""
+        query = club_tokens(name)
+        if not query:
+            return []
+        if query in self.exact:
+            return [ClubMatch(self.names[i], self.codes[i], 1.0) for i in self.exact[query].values()]
+
+        shared = defaultdict(float)
+        for token in query:
+            for i in self.postings.get(token, ()):
+                shared[i] += self.idf[token]
+
+        query_weight = sum(self._weight(t) for t in query)
+        scored = sorted(((2 * w / (query_weight + self.weights[i]), i) for i, w in shared.items()),
+                        reverse=True)[:limit]
+        return [ClubMatch(self.names[i], self.codes[i], round(score, 3)) for score, i in scored]
+
+    def lookup(self, name: str) -> Optional[ClubMatch]:
+        """Confident match for a name, or None (near ties go to self.ambiguous)."""
+        matches = self.candidates(name)
+        if not matches or matches[0].score < self.threshold:
+            return None
+        best = matches[0]
+        rivals = [m for m in matches[1:] if m.code != best.code and m.score >= best.score - self.margin]
+        if rivals:
+            self.ambiguous[name] = [best, *rivals]
+            return None
+        return best
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from fix_countries import CLUB_COUNTRIES
+
+    start = time.perf_counter()
+    index = ClubIndex(CLUB_COUNTRIES)
+    print(f"Indexed {len(index.names)} clubs in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    for name in sys.argv[1:]:
+        start = time.perf_counter()
+        match = index.lookup(name)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"\n{name} -> {match.club + ' (' + match.code + ')' if match else 'no match'} [{elapsed:.2f} ms]")
+        for candidate in index.candidates(name):
+            print(f"  {candidate.score:.3f}  {candidate.code}  {candidate.club}")
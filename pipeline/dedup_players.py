@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Merge duplicate players sharing the same wikidata_id.
+
+Earlier pipeline runs inserted a new row every time a QID was fetched again
+(e.g. `nationality` after the default league run). For each duplicated QID this
+keeps the copy with the longest career (oldest on ties), merges the aliases of
+all copies into it, points daily_rounds and solo_daily_rounds at it, and deletes
+the other copies (their career_entries cascade).
+
+Run once before supabase/add_player_upsert.sql.
+
+Usage:
+  python dedup_players.py           # Merge duplicates
+  python dedup_players.py dry       # Report duplicates without changing anything
+"""
+
+import os
+import logging
+from collections import defaultdict
+
+import requests
+from dotenv import load_dotenv
+
+from quiz_payloads import refresh_quiz_payloads
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+log = logging.getLogger(__name__)
+
+SUPABASE_URL = os.getenv("SUPABASE_URL", "https://tjxdbdueayzlxgywigth.supabase.co")
+SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
+
+# Tables whose player_id must be repointed before duplicates are deleted
+ROUND_TABLES = ["daily_rounds", "solo_daily_rounds"]
+
+
+def supabase_request(method, endpoint, data=None):
+    """Make a request to Supabase REST API."""
+    headers = {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Content-Type": "application/json",
+        "Prefer": "return=minimal"
+    }
+    url = f"{SUPABASE_URL}/rest/v1/{endpoint}"
+
+    if method == "GET":
+        resp = requests.get(url, headers=headers)
+    elif method == "PATCH":
+        resp = requests.patch(url, headers=headers, json=data)
+    elif method == "DELETE":
+        resp = requests.delete(url, headers=headers)
+
+    return resp
+
+
+def fetch_all_players():
+    """Fetch id, wikidata_id, aliases and career size of every player."""
+    players = []
+    offset = 0
+    limit = 1000
+
+    while True:
+        resp = supabase_request(
+            "GET",
+            f"players?select=id,name,wikidata_id,aliases,career_club_count,created_at"
+            f"&wikidata_id=not.is.null&order=id&offset={offset}&limit={limit}"
+        )
+        if resp.status_code != 200:
+            log.error(f"Failed to fetch players: {resp.status_code} {resp.text}")
+            break
+
+        batch = resp.json()
+        players.extend(batch)
+        if len(batch) < limit:
+            break
+        offset += limit
+
+    return players
+
+
+def find_duplicates(players):
+    """Return {wikidata_id: [keeper, *duplicates]} for QIDs with several rows."""
+    by_qid = defaultdict(list)
+    for p in players:
+        by_qid[p["wikidata_id"]].append(p)
+
+    groups = {}
+    for qid, copies in by_qid.items():
+        if len(copies) > 1:
+            copies.sort(key=lambda p: (-(p.get("career_club_count") or 0), p["created_at"]))
+            groups[qid] = copies
+    return groups
+
+
+def merge_group(keeper, duplicates):
+    """Fold duplicates into keeper. Returns True if every step succeeded."""
+    dup_filter = ",".join(d["id"] for d in duplicates)
+
+    aliases = list(dict.fromkeys(a for p in [keeper, *duplicates] for a in (p.get("aliases") or [])))
+    if aliases != (keeper.get("aliases") or []):
+        resp = supabase_request("PATCH", f"players?id=eq.{keeper['id']}", {"aliases": aliases})
+        if resp.status_code not in (200, 204):
+            log.warning(f"  Failed to merge aliases for {keeper['name']}: {resp.status_code}")
+            return False
+
+    for table in ROUND_TABLES:
+        resp = supabase_request("PATCH", f"{table}?player_id=in.({dup_filter})", {"player_id": keeper["id"]})
+        if resp.status_code not in (200, 204):
+            log.warning(f"  Failed to repoint {table} for {keeper['name']}: {resp.status_code}")
+            return False
+
+    resp = supabase_request("DELETE", f"players?id=in.({dup_filter})")
+    if resp.status_code not in (200, 204):
+        log.warning(f"  Failed to delete duplicates of {keeper['name']}: {resp.status_code}")
+        return False
+    return True
+
+
+def run_dedup(dry_run=False):
+    log.info("=== Merging Duplicate Players ===")
+
+    players = fetch_all_players()
+    groups = find_duplicates(players)
+    extra_rows = sum(len(copies) - 1 for copies in groups.values())
+    log.info(f"Found {len(groups)} duplicated QIDs ({extra_rows} extra rows) among {len(players)} players")
+
+    merged = 0
+    failed = 0
+    keepers = []
+    for qid, (keeper, *duplicates) in groups.items():
+        if dry_run:
+            log.info(f"  Would merge {len(duplicates)} copies of {keeper['name']} ({qid}) into {keeper['id']}")
+            continue
+        if merge_group(keeper, duplicates):
+            merged += 1
+            keepers.append(keeper["id"])
+        else:
+            failed += 1
+
+    refresh_quiz_payloads(keepers)
+
+    log.info(f"=== Done ===")
+    log.info(f"Merged: {merged}, Failed: {failed}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if not SUPABASE_KEY:
+        log.error("SUPABASE_SERVICE_KEY not set in environment")
+        sys.exit(1)
+
+    run_dedup(dry_run=len(sys.argv) > 1 and sys.argv[1] == "dry")
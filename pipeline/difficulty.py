@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Difficulty engine: score every player at once and calibrate against real answers.
+
+Features come from the quiz payloads, one column per feature over all players:
+career appearances and goals (log-scaled), number of top-club spells (resolved
+through a ClubIndex, so "Barcelona B" and "FC Barcelona" are the same club),
+era (career start year) and whether the player has a familiar nationality.
+
+The features predict the chance that a round with the player is solved. The
+model is a logistic regression on standardized features, fitted by damped
+Newton steps on per-player answer counts from scores (player_answer_counts()),
+with an L2 pull towards PRIOR_WEIGHTS so a few answers cannot swing it.
+With too few answers the prior weights are used as they are. Each player's
+predicted solve rate is then blended with its own observed rate (PRIOR_ANSWERS
+pseudo-answers), and players are ranked into levels 1-5 keeping the current
+number of players per level, so party difficulty filters select pools of the
+same size as before. Changed difficulties are written in one RPC call.
+
+scrape_players.py uses base_difficulty() for new players until the next run.
+Run after scraping or refreshing, and on a schedule, e.g. weekly:
+  0 4 * * 1 cd pipeline && python difficulty.py
+
+Requires supabase/add_difficulty_calibration.sql.
+
+Usage:
+  python difficulty.py          # Calibrate and write difficulties
+  python difficulty.py dry      # Print the model and level changes without writing
+"""
+
+import os
+import sys
+import math
+import logging
+from collections import Counter
+from functools import lru_cache
+from typing import Optional
+
+import requests
+from dotenv import load_dotenv
+
+from club_index import ClubIndex
+
+load_dotenv()
+
+log = logging.getLogger(__name__)
+
+SUPABASE_URL = os.getenv("SUPABASE_URL", "https://tjxdbdueayzlxgywigth.supabase.co")
+SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
+
+TOP_CLUBS = ["Real Madrid", "Barcelona", "Manchester United", "Liverpool", "Chelsea",
+             "Arsenal", "Bayern Munich", "Juventus", "AC Milan", "Inter Milan", "Paris Saint-Germain"]
+
+# Nationalities the audience knows best (the pipeline's nationality runs, plus the big football nations)
+FAMILIAR_NATIONALITIES = {"FR", "IT", "EN", "ES", "DE", "PT", "NL", "BR", "AR"}
+
+FEATURES = ["intercept", "apps", "goals", "top_clubs", "era", "familiar_nationality"]
+
+# Log-odds of a solve per standard deviation of each feature, before any answers
+PRIOR_WEIGHTS = [0.0, 0.8, 0.3, 0.6, 0.3, 0.4]
+PRIOR_STRENGTH = 20.0      # L2 penalty pulling fitted weights towards the prior
+MIN_CALIBRATION_ANSWERS = 200
+PRIOR_ANSWERS = 10         # Weight of the model's prediction against a player's own answers
+NEWTON_ITERATIONS = 25
+
+
+@lru_cache(maxsize=1)
+def _top_club_index() -> ClubIndex:
+    # Every top club gets the same code: only "is it a top club" matters here
+    return ClubIndex({club: "TOP" for club in TOP_CLUBS})
+
+
+@lru_cache(maxsize=None)
+def is_top_club(club: str) -> bool:
+    return _top_club_index().lookup(club) is not None
+
+
+def base_difficulty(total_apps: int, top_count: int) -> int:
+    """Level from career size alone, for players the calibration has not seen yet."""
+    if total_apps > 400 and top_count >= 2:
+        return 1
+    elif total_apps > 250 and top_count >= 1:
+        return 2
+    elif total_apps > 150:
+        return 3
+    elif total_apps > 80:
+        return 4
+    return 5
+
+
+def feature_columns(players: list[dict]) -> list[list[float]]:
+    """One raw column per entry of FEATURES (intercept included) over the payload rows."""
+    careers = [p.get("career") or [] for p in players]
+    years = [p.get("career_start_year") for p in players]
+    known_years = [y for y in years if y]
+    default_year = sorted(known_years)[len(known_years) // 2] if known_years else 2000
+    return [
+        [1.0] * len(players),
+        [math.log1p(sum(e.get("matches") or 0 for e in career)) for career in careers],
+        [math.log1p(sum(e.get("goals") or 0 for e in career)) for career in careers],
+        [float(sum(is_top_club(e.get("club") or "") for e in career)) for career in careers],
+        [float(y or default_year) for y in years],
+        [float(p.get("nationality_code") in FAMILIAR_NATIONALITIES) for p in players],
+    ]
+
+
+def standardize(columns: list[list[float]]) -> list[list[float]]:
+    """Columns scaled to mean 0 and standard deviation 1 (the intercept is left alone)."""
+    scaled = [columns[0]]
+    for column in columns[1:]:
+        mean = sum(column) / len(column)
+        std = math.sqrt(sum((x - mean) ** 2 for x in column) / len(column)) or 1.0
+        scaled.append([(x - mean) / std for x in column])
+    return scaled
+
+
+def _solve(matrix: list[list[float]], vector: list[float]) -> list[float]:
+    """Solve matrix @ x = vector by Gaussian elimination (small, positive definite systems)."""
+    n = len(vector)
+    a = [row[:] + [vector[i]] for i, row in enumerate(matrix)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(a[r][col]))
+        a[col], a[pivot] = a[pivot], a[col]
+        for r in range(col + 1, n):
+            factor = a[r][col] / a[col][col]
+            for c in range(col, n + 1):
+                a[r][c] -= factor * a[col][c]
+    x = [0.0] * n
+    for r in reversed(range(n)):
+        x[r] = (a[r][n] - sum(a[r][c] * x[c] for c in range(r + 1, n))) / a[r][r]
+    return x
+
+
+def _sigmoid(z: float) -> float:
+    return 1 / (1 + math.exp(-max(-30.0, min(30.0, z))))
+
+
+def predict(columns: list[list[float]], weights: list[float]) -> list[float]:
+    """Predicted solve rate of every player."""
+    return [_sigmoid(sum(w * x for w, x in zip(weights, row))) for row in zip(*columns)]
+
+
+def fit_weights(columns: list[list[float]], attempts: list[int], correct: list[int],
+                prior: list[float] = PRIOR_WEIGHTS) -> list[float]:
+    """
+    Logistic regression on per-player (attempts, correct) counts, L2-regularized towards `prior`.
+
+    The prior's intercept is replaced by the overall log-odds of a solve.
+    """
+    total, solved = sum(attempts), sum(correct)
+    rate = min(max(solved / total, 0.01), 0.99)
+    prior = [math.log(rate / (1 - rate)), *prior[1:]]
+    weights = prior[:]
+    rows = [(row, n, k) for row, n, k in zip(zip(*columns), attempts, correct) if n]
+    size = len(weights)
+
+    def objective(w):
+        """Penalized log-likelihood (maximized)."""
+        total = -PRIOR_STRENGTH / 2 * sum((a - b) ** 2 for a, b in zip(w, prior))
+        for row, n, k in rows:
+            z = sum(a * x for a, x in zip(w, row))
+            total += k * z - n * (max(z, 0) + math.log1p(math.exp(-abs(z))))
+        return total
+
+    current = objective(weights)
+    for _ in range(NEWTON_ITERATIONS):
+        gradient = [-PRIOR_STRENGTH * (w - p) for w, p in zip(weights, prior)]
+        hessian = [[PRIOR_STRENGTH * (i == j) for j in range(size)] for i in range(size)]
+        for row, n, k in rows:
+            p = _sigmoid(sum(w * x for w, x in zip(weights, row)))
+            residual, curvature = k - n * p, n * p * (1 - p)
+            for i in range(size):
+                gradient[i] += residual * row[i]
+                for j in range(i + 1):
+                    hessian[i][j] += curvature * row[i] * row[j]
+        for i in range(size):
+            for j in range(i + 1, size):
+                hessian[i][j] = hessian[j][i]
+        step = _solve(hessian, gradient)
+        # Plain Newton steps overshoot when some players are near-certain solves: halve until better
+        for _ in range(20):
+            candidate = [w + s for w, s in zip(weights, step)]
+            value = objective(candidate)
+            if value >= current:
+                break
+            step = [s / 2 for s in step]
+        else:
+            break
+        weights, current = candidate, value
+        if max(abs(s) for s in step) < 1e-6:
+            break
+    return weights
+
+
+def assign_levels(solve_rates: list[float], level_counts: Counter) -> list[int]:
+    """Rank players from most to least solved into levels 1-5 with the given number of players each."""
+    order = sorted(range(len(solve_rates)), key=lambda i: solve_rates[i], reverse=True)
+    levels = [0] * len(solve_rates)
+    position = 0
+    for level in range(1, 6):
+        count = level_counts.get(level, 0) if level < 5 else len(order) - position
+        for i in order[position:position + count]:
+            levels[i] = level
+        position += count
+    return levels
+
+
+def calibrate(players: list[dict], answers: dict[str, tuple[int, int]]) -> tuple[list[int], Optional[list[float]]]:
+    """(new difficulty per player, fitted weights or None when the prior was used)."""
+    columns = standardize(feature_columns(players))
+    attempts = [answers.get(p["player_id"], (0, 0))[0] for p in players]
+    correct = [answers.get(p["player_id"], (0, 0))[1] for p in players]
+
+    weights = None
+    if sum(attempts) >= MIN_CALIBRATION_ANSWERS:
+        weights = fit_weights(columns, attempts, correct)
+    predicted = predict(columns, weights or PRIOR_WEIGHTS)
+
+    blended = [(k + PRIOR_ANSWERS * p) / (n + PRIOR_ANSWERS) for p, n, k in zip(predicted, attempts, correct)]
+    return assign_levels(blended, Counter(p["difficulty"] for p in players)), weights
+
+
+def _headers(**extra):
+    return {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Content-Type": "application/json",
+        **extra,
+    }
+
+
+def fetch_payload_features() -> Optional[list[dict]]:
+    """Feature columns of every quiz payload, or None on error."""
+    players = []
+    last_id = None
+    limit = 1000
+    while True:
+        after = f"&player_id=gt.{last_id}" if last_id else ""
+        resp = requests.get(
+            f"{SUPABASE_URL}/rest/v1/player_quiz_payloads"
+            f"?select=player_id,name,difficulty,career,career_start_year,nationality_code"
+            f"{after}&order=player_id&limit={limit}",
+            headers=_headers(),
+        )
+        if resp.status_code != 200:
+            log.error(f"Failed to fetch players: {resp.status_code} {resp.text}")
+            return None
+        batch = resp.json()
+        players.extend(batch)
+        if len(batch) < limit:
+            break
+        last_id = batch[-1]["player_id"]
+    return players
+
+
+def fetch_answer_counts() -> Optional[dict[str, tuple[int, int]]]:
+    """
+    {player_id: (attempts, correct)} over all scores, or None on error.
+
+    player_answer_counts() returns a set, which PostgREST caps at max-rows
+    without an error: keyset-page it on player_id like the payloads.
+    """
+    counts = {}
+    last_id = None
+    limit = 1000
+    while True:
+        after = f"&player_id=gt.{last_id}" if last_id else ""
+        resp = requests.get(
+            f"{SUPABASE_URL}/rest/v1/rpc/player_answer_counts"
+            f"?select=player_id,attempts,correct{after}&order=player_id&limit={limit}",
+            headers=_headers(),
+        )
+        if resp.status_code != 200:
+            log.error(f"Failed to fetch answer counts: {resp.status_code} {resp.text}")
+            return None
+        batch = resp.json()
+        counts.update((row["player_id"], (row["attempts"], row["correct"])) for row in batch)
+        if len(batch) < limit:
+            break
+        last_id = batch[-1]["player_id"]
+    return counts
+
+
+def run_calibration(dry_run: bool = False):
+    log.info("=== Calibrating Difficulty ===")
+    players = fetch_payload_features()
+    answers = fetch_answer_counts()
+    if players is None or answers is None:
+        return
+    log.info(f"{len(players)} players, {sum(n for n, _ in answers.values())} answers "
+             f"for {len(answers)} players")
+
+    levels, weights = calibrate(players, answers)
+    if weights is None:
+        log.info(f"Fewer than {MIN_CALIBRATION_ANSWERS} answers: using the prior weights")
+    else:
+        log.info("Fitted weights: " + ", ".join(f"{name}={w:+.2f}" for name, w in zip(FEATURES, weights)))
+
+    changes = [{"player_id": p["player_id"], "difficulty": level}
+               for p, level in zip(players, levels) if level != p["difficulty"]]
+    moves = Counter((p["difficulty"], level) for p, level in zip(players, levels) if level != p["difficulty"])
+    log.info(f"{len(changes)} players change level")
+    for (old, new), count in sorted(moves.items()):
+        log.info(f"  {old} -> {new}: {count}")
+
+    if dry_run or not changes:
+        return
+    resp = requests.post(f"{SUPABASE_URL}/rest/v1/rpc/set_player_difficulties",
+                         headers=_headers(), json={"p_difficulties": changes})
+    if resp.status_code != 200:
+        return log.error(f"Failed to write difficulties: {resp.status_code} {resp.text}")
+    log.info(f"Updated {resp.json()} players")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if not SUPABASE_KEY:
+        log.error("SUPABASE_SERVICE_KEY not set in environment")
+        sys.exit(1)
+    run_calibration(dry_run=len(sys.argv) > 1 and sys.argv[1] == "dry")
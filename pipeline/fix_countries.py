@@ -2,17 +2,38 @@
 """
 Fix missing country_code and country_flag in career_entries table.
 Matches club names to countries and updates Supabase.
+
+Requires supabase/add_country_backfill.sql.
+
+Clubs are resolved once per distinct name and cached in
+cache/club_countries.json (dropped whenever CLUB_COUNTRIES changes), so
+reruns only resolve new names. Unmatched clubs are ranked by how many entries
+they affect: add the top ones to CLUB_COUNTRIES first.
+
+Usage:
+  python fix_countries.py                     # Backfill countries
+  python fix_countries.py report [out.csv]    # Only write the unmatched report
 """
 
 import os
+import csv
+import json
+import hashlib
+from collections import Counter
+
 import requests
 from dotenv import load_dotenv
 
+from club_index import ClubIndex, STOPWORDS
+
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL", "https://tjxdbdueayzlxgywigth.supabase.co")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
 
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "club_countries.json")
+UNMATCHED_REPORT = "unmatched_clubs.csv"
+
 # Expanded club -> country mapping
 CLUB_COUNTRIES = {
     # ENGLAND (EN)
@@ -1830,6 +1851,17 @@ def supabase_request(method, endpoint, data=None):
     return resp
 
 
+_club_index = None
+
+
+def club_index() -> ClubIndex:
+    """Fuzzy index over CLUB_COUNTRIES, built on first use."""
+    global _club_index
+    if _club_index is None:
+        _club_index = ClubIndex(CLUB_COUNTRIES)
+    return _club_index
+
+
 def guess_country(club_name: str) -> tuple[str, str]:
     """Return (country_code, country_flag) for a club name."""
     # Exact match
@@ -1837,78 +1869,127 @@ def guess_country(club_name: str) -> tuple[str, str]:
         code = CLUB_COUNTRIES[club_name]
         return code, COUNTRY_FLAGS.get(code, "")
 
-    # Partial match
-    club_lower = club_name.lower()
-    for known_club, code in CLUB_COUNTRIES.items():
-        if known_club.lower() in club_lower or club_lower in known_club.lower():
-            return code, COUNTRY_FLAGS.get(code, "")
+    # Fuzzy match (accents, FC/AC prefixes, reserve teams)
+    match = club_index().lookup(club_name)
+    if match:
+        return match.code, COUNTRY_FLAGS.get(match.code, "")
 
     return "", ""
 
 
-def fix_missing_countries():
-    """Fetch entries with missing country data and update them."""
+def fetch_missing_country_clubs():
+    """Return the club name of every entry without a country (all pages)."""
+    clubs = []
+    last_id = None
+    while True:
+        endpoint = "career_entries?or=(country_code.is.null,country_code.eq.)&select=id,club&order=id&limit=1000"
+        if last_id:
+            endpoint += f"&id=gt.{last_id}"
+        resp = supabase_request("GET", endpoint)
+        if resp.status_code != 200:
+            print(f"Error fetching entries: {resp.status_code} {resp.text}")
+            return None
+
+        batch = resp.json()
+        clubs.extend(entry["club"] for entry in batch)
+        if len(batch) < 1000:
+            break
+        last_id = batch[-1]["id"]
+    return clubs
+
+
+def _table_version() -> str:
+    """Fingerprint of CLUB_COUNTRIES and the matcher, so cached misses are retried after edits."""
+    matcher = [club_index().threshold, club_index().margin, sorted(STOPWORDS)]
+    return hashlib.sha1(json.dumps([CLUB_COUNTRIES, matcher], sort_keys=True).encode()).hexdigest()
+
+
+def resolve_clubs(clubs) -> dict[str, tuple[str, str]]:
+    """Return {club: (code, flag)} for distinct club names, "" when unmatched, via the cache."""
+    cache = {}
+    if os.path.exists(CACHE_PATH):
+        with open(CACHE_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == _table_version():
+            cache = {club: tuple(value) for club, value in data["clubs"].items()}
+
+    new = [club for club in clubs if club not in cache]
+    for club in new:
+        cache[club] = guess_country(club)
+
+    if new:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        with open(CACHE_PATH, "w", encoding="utf-8") as f:
+            json.dump({"version": _table_version(), "clubs": cache}, f, ensure_ascii=False)
+    print(f"Resolved {len(new)} new club names ({len(clubs) - len(new)} cached)")
+    return {club: cache[club] for club in clubs}
+
+
+def write_unmatched_report(unmatched: Counter, path: str = UNMATCHED_REPORT):
+    """Write unmatched clubs as CSV, most affected entries first."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["club", "entries"])
+        writer.writerows(unmatched.most_common())
+    print(f"Wrote {len(unmatched)} unmatched clubs to {path}")
+
+
+def fix_missing_countries(report_only: bool = False, report_path: str = UNMATCHED_REPORT):
+    """Resolve each distinct club once, then backfill every entry in one RPC call."""
     print("Fetching career entries with missing country codes...")
-
-    # Get entries with empty country_code
-    resp = supabase_request("GET", "career_entries?country_code=eq.&select=id,club")
-
-    if resp.status_code != 200:
-        print(f"Error fetching entries: {resp.status_code} {resp.text}")
+    clubs = fetch_missing_country_clubs()
+    if clubs is None:
         return
+    club_counts = Counter(clubs)
+    print(f"Found {len(clubs)} entries with missing country codes ({len(club_counts)} distinct clubs)")
 
-    entries = resp.json()
-    print(f"Found {len(entries)} entries with missing country codes")
-
-    if not entries:
+    if not clubs:
         print("No entries to fix!")
         return
 
-    # Group by country for batch updates
-    updates_by_country = {}
-    unmatched = []
-
-    for entry in entries:
-        club = entry["club"]
-        code, flag = guess_country(club)
-
+    mapping = []
+    unmatched = Counter()
+    for club, (code, flag) in resolve_clubs(club_counts).items():
         if code:
-            key = (code, flag)
-            if key not in updates_by_country:
-                updates_by_country[key] = []
-            updates_by_country[key].append(entry["id"])
+            mapping.append({"club": club, "country_code": code, "country_flag": flag})
         else:
-            unmatched.append(club)
-
-    # Perform updates
-    total_updated = 0
-    for (code, flag), ids in updates_by_country.items():
-        print(f"Updating {len(ids)} entries with country {code} {flag}...")
-
-        # Update in batches of 100
-        for i in range(0, len(ids), 100):
-            batch_ids = ids[i:i+100]
-            id_filter = ",".join(batch_ids)
-
-            resp = supabase_request(
-                "PATCH",
-                f"career_entries?id=in.({id_filter})",
-                {"country_code": code, "country_flag": flag}
-            )
-
-            if resp.status_code in (200, 204):
-                total_updated += len(batch_ids)
-            else:
-                print(f"Error updating batch: {resp.status_code} {resp.text}")
-
-    print(f"\n=== Results ===")
-    print(f"Updated: {total_updated} entries")
-    print(f"Unmatched clubs: {len(set(unmatched))}")
-
+            unmatched[club] = club_counts[club]
+    write_unmatched_report(unmatched, report_path)
+
+    if report_only:
+        resolved = sum(club_counts[m["club"]] for m in mapping)
+        print(f"Would update: {resolved} entries")
+    else:
+        # backfill_career_countries() joins on club and refreshes the affected quiz payloads
+        print(f"Backfilling {len(mapping)} resolved clubs...")
+        resp = requests.post(
+            f"{SUPABASE_URL}/rest/v1/rpc/backfill_career_countries",
+            headers={
+                "apikey": SUPABASE_KEY,
+                "Authorization": f"Bearer {SUPABASE_KEY}",
+                "Content-Type": "application/json",
+            },
+            json={"p_mapping": mapping},
+        )
+        if resp.status_code != 200:
+            print(f"Error backfilling countries: {resp.status_code} {resp.text}")
+            return
+        print(f"\n=== Results ===")
+        print(f"Updated: {resp.json()} entries")
+
+    print(f"Unmatched clubs: {len(unmatched)} ({sum(unmatched.values())} entries)")
+    # Cached misses skipped the index, so look them up again (cheap) to collect near ties
+    for club in unmatched:
+        club_index().lookup(club)
+    ambiguous = {club: m for club, m in club_index().ambiguous.items() if club in unmatched}
+    if ambiguous:
+        print("\nAmbiguous clubs (close matches in several countries):")
+        for club, matches in sorted(ambiguous.items(), key=lambda item: -unmatched[item[0]])[:30]:
+            print(f"  {unmatched[club]:5}  {club}: " + ", ".join(f"{m.club} ({m.code} {m.score})" for m in matches))
     if unmatched:
-        print("\nSample unmatched clubs (add these to CLUB_COUNTRIES):")
-        for club in sorted(set(unmatched))[:30]:
-            print(f"  - {club}")
+        print("\nTop unmatched clubs by entries (add these to CLUB_COUNTRIES):")
+        for club, count in unmatched.most_common(30):
+            print(f"  {count:5}  {club}")
 
 
 if __name__ == "__main__":
@@ -1916,4 +1997,10 @@ if __name__ == "__main__":
         print("Error: SUPABASE_SERVICE_KEY not set in .env")
         exit(1)
 
-    fix_missing_countries()
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "report":
+        fix_missing_countries(report_only=True,
+                              report_path=sys.argv[2] if len(sys.argv) > 2 else UNMATCHED_REPORT)
+    else:
+        fix_missing_countries()
@@ -9,6 +9,8 @@ import logging
 import requests
 from dotenv import load_dotenv
 
+from quiz_payloads import refresh_quiz_payloads
+
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
@@ -106,6 +108,7 @@ def run_fix():
     # Apply fixes
     updated = 0
     skipped = 0
+    touched_players = []
 
     for player in players:
         nationality = player.get("nationality", "")
@@ -116,6 +119,7 @@ def run_fix():
 
             if update_player_nationality(player["id"], code, flag):
                 updated += 1
+                touched_players.append(player["id"])
                 log.info(f"  Fixed: {player['name']} -> {flag} {nationality} ({code})")
             else:
                 log.warning(f"  Failed to update: {player['name']}")
@@ -124,6 +128,8 @@ def run_fix():
             if nationality:
                 log.warning(f"  No mapping for: {player['name']} ({nationality})")
 
+    refresh_quiz_payloads(touched_players)
+
     log.info(f"=== Done ===")
     log.info(f"Updated: {updated}, Skipped: {skipped}")
 
@@ -7,6 +7,8 @@ import os
 import requests
 from dotenv import load_dotenv
 
+from quiz_payloads import refresh_quiz_payloads
+
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL", "https://tjxdbdueayzlxgywigth.supabase.co")
@@ -37,6 +39,7 @@ update_headers = {
 }
 
 updated = 0
+touched_players = []
 for player in players:
     data = {
         "nationality": "Nigeria",
@@ -50,8 +53,11 @@ for player in players:
     )
     if resp.status_code in (200, 204):
         updated += 1
+        touched_players.append(player["id"])
         print(f"  Fixed: {player['name']} -> 🇳🇬 Nigeria (NG)")
     else:
         print(f"  Error updating {player['name']}: {resp.status_code}")
 
+refresh_quiz_payloads(touched_players)
+
 print(f"\nDone! Updated {updated} players from NE (Niger) to NG (Nigeria)")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Check and repair the leaderboard rollups (leaderboard_totals, leaderboard_daily).
+
+The rollups are maintained by a trigger on scores (supabase/add_leaderboard_rollups.sql)
+and read by the app through v_leaderboard_rollup / v_daily_leaderboard_rollup.
+verify fetches both the rollup views and the original aggregating views for
+PARTIES_PER_SNAPSHOT parties at a time, from one database snapshot per call, and
+reports every member row that differs. rebuild recomputes the rollups from scores.
+
+Usage:
+  python leaderboards.py              # Verify rollups against the views (exit 1 on mismatch)
+  python leaderboards.py rebuild      # Recompute all rollups from scores
+"""
+
+import os
+import sys
+import logging
+
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+log = logging.getLogger(__name__)
+
+SUPABASE_URL = os.getenv("SUPABASE_URL", "https://tjxdbdueayzlxgywigth.supabase.co")
+SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
+
+PARTIES_PER_SNAPSHOT = 50
+
+TOTALS_FIELDS = ["total_points", "correct_answers", "total_answers", "avg_time_ms", "last_played"]
+DAILY_FIELDS = ["day_points", "day_correct", "day_answers"]
+
+# avg_time_ms is numeric on both sides but computed differently (avg vs sum / count)
+AVG_TOLERANCE_MS = 0.01
+
+
+def _headers():
+    return {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Content-Type": "application/json",
+    }
+
+
+def fetch_party_ids() -> list[str]:
+    ids = []
+    offset, limit = 0, 1000
+    while True:
+        resp = requests.get(f"{SUPABASE_URL}/rest/v1/parties?select=id&order=id&offset={offset}&limit={limit}",
+                            headers=_headers())
+        if resp.status_code != 200:
+            raise RuntimeError(f"Failed to fetch parties: {resp.status_code} {resp.text}")
+        batch = resp.json()
+        ids.extend(row["id"] for row in batch)
+        if len(batch) < limit:
+            return ids
+        offset += limit
+
+
+def _same(field: str, expected, actual) -> bool:
+    if field == "avg_time_ms":
+        return abs(float(expected or 0) - float(actual or 0)) <= AVG_TOLERANCE_MS
+    return expected == actual
+
+
+def diff_rows(expected: list[dict], actual: list[dict], key_fields: list[str], fields: list[str]) -> list[str]:
+    """Human-readable differences between view rows and rollup rows, matched on key_fields."""
+    def keyed(rows):
+        return {tuple(row[k] for k in key_fields): row for row in rows}
+
+    expected, actual = keyed(expected), keyed(actual)
+    problems = []
+    for key in expected.keys() - actual.keys():
+        problems.append(f"{key}: missing from rollup")
+    for key in actual.keys() - expected.keys():
+        problems.append(f"{key}: only in rollup")
+    for key in expected.keys() & actual.keys():
+        for field in fields:
+            if not _same(field, expected[key][field], actual[key][field]):
+                problems.append(f"{key}: {field} view={expected[key][field]} rollup={actual[key][field]}")
+    return problems
+
+
+def verify_leaderboards() -> bool:
+    log.info("=== Verifying Leaderboard Rollups ===")
+    party_ids = fetch_party_ids()
+    problems = []
+    members = days = 0
+
+    for i in range(0, len(party_ids), PARTIES_PER_SNAPSHOT):
+        resp = requests.post(f"{SUPABASE_URL}/rest/v1/rpc/leaderboard_snapshot", headers=_headers(),
+                             json={"p_party_ids": party_ids[i:i + PARTIES_PER_SNAPSHOT]})
+        if resp.status_code != 200:
+            raise RuntimeError(f"Failed to fetch snapshot: {resp.status_code} {resp.text}")
+        snapshot = resp.json()
+        members += len(snapshot["totals_view"])
+        days += len(snapshot["daily_view"])
+        problems += diff_rows(snapshot["totals_view"], snapshot["totals_rollup"], ["member_id"], TOTALS_FIELDS)
+        problems += diff_rows(snapshot["daily_view"], snapshot["daily_rollup"],
+                              ["member_id", "round_date"], DAILY_FIELDS)
+
+    log.info(f"Checked {len(party_ids)} parties: {members} member totals, {days} member days")
+    for problem in problems[:50]:
+        log.warning(f"  {problem}")
+    if problems:
+        log.error(f"{len(problems)} differences (run 'python leaderboards.py rebuild' to repair)")
+        return False
+    log.info("Rollups match the views")
+    return True
+
+
+def rebuild_leaderboards():
+    log.info("=== Rebuilding Leaderboard Rollups ===")
+    resp = requests.post(f"{SUPABASE_URL}/rest/v1/rpc/rebuild_leaderboards", headers=_headers(), json={})
+    if resp.status_code not in (200, 204):
+        raise RuntimeError(f"Failed to rebuild leaderboards: {resp.status_code} {resp.text}")
+    log.info("Done!")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if not SUPABASE_KEY:
+        log.error("SUPABASE_SERVICE_KEY not set in environment")
+        sys.exit(1)
+
+    if len(sys.argv) > 1 and sys.argv[1] == "rebuild":
+        rebuild_leaderboards()
+    else:
+        sys.exit(0 if verify_leaderboards() else 1)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Rebuild the pre-shuffled infinite-mode pools (player_pool).
+
+Players are shuffled once and get a row in every filter bucket they belong
+to: start decade x {nationality, any} x {each league, any}. Within a bucket,
+shuffle_rank numbers the rows 0..n-1 in shuffled order, so a draw can start at
+a uniformly random rank of the bucket.
+Rows are staged in chunks, then swapped in by swap_player_pool() in a single
+transaction so draws never see a half-built pool.
+
+Run after uploads (scrape_players.py does this) and on a schedule, e.g. nightly:
+  0 3 * * * cd pipeline && python player_pools.py
+
+Usage:
+  python player_pools.py            # Rebuild pools
+  python player_pools.py dry        # Print bucket sizes without writing
+"""
+
+import os
+import random
+import logging
+from collections import Counter
+
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+log = logging.getLogger(__name__)
+
+SUPABASE_URL = os.getenv("SUPABASE_URL", "https://tjxdbdueayzlxgywigth.supabase.co")
+SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
+
+# Same eligibility the app always enforces in infinite mode
+MIN_CLUB_COUNT = 3
+MIN_START_YEAR = 1980
+
+STAGING_CHUNK_SIZE = 1000
+
+
+def _headers(**extra):
+    return {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Content-Type": "application/json",
+        **extra,
+    }
+
+
+def fetch_eligible_players():
+    """Fetch filter columns of every player playable in infinite mode."""
+    players = []
+    offset = 0
+    limit = 1000
+
+    while True:
+        resp = requests.get(
+            f"{SUPABASE_URL}/rest/v1/player_quiz_payloads"
+            f"?select=player_id,career_start_year,nationality_code,leagues_played"
+            f"&is_active=eq.true&career_club_count=gte.{MIN_CLUB_COUNT}"
+            f"&career_start_year=gte.{MIN_START_YEAR}"
+            f"&order=player_id&offset={offset}&limit={limit}",
+            headers=_headers(),
+        )
+        if resp.status_code != 200:
+            log.error(f"Failed to fetch players: {resp.status_code} {resp.text}")
+            return None
+
+        batch = resp.json()
+        players.extend(batch)
+        if len(batch) < limit:
+            break
+        offset += limit
+
+    return players
+
+
+def build_pool_rows(players, rng=random):
+    """Return player_pool rows: one row per bucket per player, ranked 0..n-1 within each bucket."""
+    shuffled = list(players)
+    rng.shuffle(shuffled)
+    sizes = Counter()
+    rows = []
+    for p in shuffled:
+        start_year = p["career_start_year"]
+        decade = start_year // 10 * 10
+        nationalities = {"", p.get("nationality_code") or ""}
+        leagues = {"", *(p.get("leagues_played") or [])}
+        for nationality in nationalities:
+            for league in leagues:
+                bucket = (decade, nationality, league)
+                rows.append({
+                    "start_decade": decade, "nationality_code": nationality, "league": league,
+                    "shuffle_rank": sizes[bucket], "player_id": p["player_id"],
+                    "career_start_year": start_year,
+                })
+                sizes[bucket] += 1
+    return rows
+
+
+def rebuild_player_pools(dry_run=False) -> int:
+    """Reshuffle and replace the live pool. Returns rows swapped in."""
+    if not SUPABASE_KEY:
+        log.warning("No Supabase key. Skipping player pool rebuild.")
+        return 0
+
+    players = fetch_eligible_players()
+    if players is None:
+        return 0
+    rows = build_pool_rows(players)
+    log.info(f"Player pools: {len(players)} eligible players, {len(rows)} bucket rows")
+
+    if not rows:
+        log.warning("No eligible players: keeping the live pool")
+        return 0
+
+    if dry_run:
+        buckets = Counter((r["start_decade"], r["nationality_code"], r["league"]) for r in rows)
+        for (decade, nationality, league), count in buckets.most_common(30):
+            log.info(f"  {decade}s {nationality or '*':3} {league or '*':3} : {count}")
+        return 0
+
+    # Clear leftovers from an interrupted rebuild, then stage in chunks
+    requests.delete(f"{SUPABASE_URL}/rest/v1/player_pool_staging?start_decade=gte.0", headers=_headers())
+    for i in range(0, len(rows), STAGING_CHUNK_SIZE):
+        resp = requests.post(f"{SUPABASE_URL}/rest/v1/player_pool_staging",
+                             headers=_headers(Prefer="return=minimal"),
+                             json=rows[i:i + STAGING_CHUNK_SIZE])
+        if resp.status_code not in (200, 201):
+            log.error(f"Staging player pool failed: {resp.status_code} {resp.text}")
+            return 0
+
+    resp = requests.post(f"{SUPABASE_URL}/rest/v1/rpc/swap_player_pool", headers=_headers(), json={})
+    if resp.status_code != 200:
+        log.error(f"Swapping player pool failed: {resp.status_code} {resp.text}")
+        return 0
+    swapped = resp.json() or 0
+    log.info(f"Player pools rebuilt: {swapped} rows live")
+    return swapped
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if not SUPABASE_KEY:
+        log.error("SUPABASE_SERVICE_KEY not set in environment")
+        sys.exit(1)
+
+    rebuild_player_pools(dry_run=len(sys.argv) > 1 and sys.argv[1] == "dry")
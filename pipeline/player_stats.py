@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Aggregate observed difficulty per player (player_stats) from scores.
+
+refresh_player_stats() only recomputes players answered since the last run
+(watermark on scores.answered_at), so a run costs one RPC call however many
+scores exist. schedule_rounds.py reads the solve rates to order each party
+day from the most to the least solved player.
+
+Run before scheduling rounds, e.g. nightly:
+  30 0 * * * cd pipeline && python player_stats.py
+
+Requires supabase/add_player_stats.sql.
+
+Usage:
+  python player_stats.py            # Players answered since the last run
+  python player_stats.py full       # Recompute every player
+"""
+
+import os
+import sys
+import logging
+
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+log = logging.getLogger(__name__)
+
+SUPABASE_URL = os.getenv("SUPABASE_URL", "https://tjxdbdueayzlxgywigth.supabase.co")
+SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
+
+
+def refresh_player_stats(full: bool = False) -> int:
+    """Recompute stats of players answered since the watermark (all with full). Returns players updated."""
+    if not SUPABASE_KEY:
+        log.warning("No Supabase key. Skipping player stats refresh.")
+        return 0
+
+    resp = requests.post(
+        f"{SUPABASE_URL}/rest/v1/rpc/refresh_player_stats",
+        headers={
+            "apikey": SUPABASE_KEY,
+            "Authorization": f"Bearer {SUPABASE_KEY}",
+            "Content-Type": "application/json",
+        },
+        json={"p_full": full},
+    )
+    if resp.status_code != 200:
+        log.error(f"Player stats refresh failed: {resp.status_code} {resp.text}")
+        return 0
+
+    result = resp.json()
+    log.info(f"Player stats: {result['players']} players updated, watermark {result['watermark']}")
+    return result["players"]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    refresh_player_stats(full=len(sys.argv) > 1 and sys.argv[1] == "full")
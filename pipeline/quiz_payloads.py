@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Rebuild the precomputed quiz payloads (player_quiz_payloads) the app reads from.
+
+The pipeline and every fix script call refresh_quiz_payloads() with the ids of
+the players they touched; running this file rebuilds every payload.
+
+Usage:
+  python quiz_payloads.py           # Rebuild all payloads
+"""
+
+import os
+import logging
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+log = logging.getLogger(__name__)
+
+SUPABASE_URL = os.getenv("SUPABASE_URL", "https://tjxdbdueayzlxgywigth.supabase.co")
+SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
+
+# Player ids per RPC call (keeps request bodies small)
+REFRESH_BATCH_SIZE = 500
+
+
+def refresh_quiz_payloads(player_ids=None) -> int:
+    """Rebuild payloads for the given player ids (None = all players). Returns rows written."""
+    if not SUPABASE_KEY:
+        log.warning("No Supabase key. Skipping quiz payload refresh.")
+        return 0
+
+    headers = {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Content-Type": "application/json",
+    }
+    url = f"{SUPABASE_URL}/rest/v1/rpc/refresh_quiz_payloads"
+
+    if player_ids is None:
+        batches = [None]
+    else:
+        ids = list(dict.fromkeys(player_ids))
+        batches = [ids[i:i + REFRESH_BATCH_SIZE] for i in range(0, len(ids), REFRESH_BATCH_SIZE)]
+
+    refreshed = 0
+    for batch in batches:
+        resp = requests.post(url, headers=headers, json={"p_player_ids": batch})
+        if resp.status_code == 200:
+            refreshed += resp.json() or 0
+        else:
+            log.error(f"Quiz payload refresh failed: {resp.status_code} {resp.text}")
+    return refreshed
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if not SUPABASE_KEY:
+        log.error("SUPABASE_SERVICE_KEY not set in environment")
+        sys.exit(1)
+
+    log.info(f"Refreshed {refresh_quiz_payloads()} quiz payloads")
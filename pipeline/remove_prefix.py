@@ -7,6 +7,8 @@ import os
 import requests
 from dotenv import load_dotenv
 
+from quiz_payloads import refresh_quiz_payloads
+
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL", "https://tjxdbdueayzlxgywigth.supabase.co")
@@ -32,12 +34,19 @@ def supabase_request(method, endpoint, data=None):
     return resp
 
 
+def strip_number_prefix(club: str) -> str:
+    """Remove a leading "1. " from a club name."""
+    if club.startswith("1. "):
+        return club[3:]  # Remove first 3 characters "1. "
+    return club
+
+
 def remove_prefix():
     """Remove '1. ' prefix from club names."""
     print("Fetching career entries with '1. ' prefix...")
 
     # Get entries where club starts with "1. "
-    resp = supabase_request("GET", "career_entries?club=like.1.%20*&select=id,club&limit=1000")
+    resp = supabase_request("GET", "career_entries?club=like.1.%20*&select=id,player_id,club&limit=1000")
 
     if resp.status_code != 200:
         print(f"Error fetching entries: {resp.status_code} {resp.text}")
@@ -53,14 +62,14 @@ def remove_prefix():
     # Process and update each entry
     updated = 0
     errors = 0
+    touched_players = set()
 
     for entry in entries:
         old_club = entry["club"]
 
         # Remove "1. " prefix
-        if old_club.startswith("1. "):
-            new_club = old_club[3:]  # Remove first 3 characters "1. "
-        else:
+        new_club = strip_number_prefix(old_club)
+        if new_club == old_club:
             continue
 
         # Update the entry
@@ -72,12 +81,15 @@ def remove_prefix():
 
         if resp.status_code in (200, 204):
             updated += 1
+            touched_players.add(entry["player_id"])
             if updated <= 15:  # Show first 15 examples
                 print(f"  Fixed: '{old_club}' -> '{new_club}'")
         else:
             errors += 1
             print(f"  Error updating {entry['id']}: {resp.status_code}")
 
+    refresh_quiz_payloads(touched_players)
+
     print(f"\n=== Results ===")
     print(f"Updated: {updated} entries")
     print(f"Errors: {errors}")
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Pre-generate solo daily challenges (solo_daily_rounds) and party rounds
+(daily_rounds) for the next N days.
+
+Selection happens in memory, with the same rules as the SQL generators:
+no repeats within 14 days (solo) or 30 days (per party), party difficulty and
+year/league filters with the same fallbacks. Solo days also get a fixed
+difficulty mix, and party days are ordered from the most to the least solved
+player (player_stats). Each day is seeded from its date (and party id), so reruns
+pick the same players. Days that already have rounds are left alone, and all
+new rows are written in one bulk insert per table. The app then only reads
+rounds and never has to generate them.
+
+Run daily, ahead of time, e.g.:
+  0 1 * * * cd pipeline && python schedule_rounds.py 7
+
+Usage:
+  python schedule_rounds.py         # Next 7 days
+  python schedule_rounds.py 30      # Next 30 days
+  python schedule_rounds.py dry     # Show what would be scheduled for 7 days
+"""
+
+import os
+import random
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+log = logging.getLogger(__name__)
+
+SUPABASE_URL = os.getenv("SUPABASE_URL", "https://tjxdbdueayzlxgywigth.supabase.co")
+SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
+
+SOLO_NO_REPEAT_DAYS = 14
+PARTY_NO_REPEAT_DAYS = 30
+
+# Solo challenge: difficulty range per round, easy openers to a hard finish
+SOLO_DIFFICULTY_MIX = [(1, 2), (1, 2), (2, 3), (3, 4), (4, 5)]
+
+# Party days run from the most to the least solved player (player_stats.py).
+# Players with fewer answers are ranked by difficulty level instead.
+MIN_STATS_ATTEMPTS = 5
+
+
+def _headers(**extra):
+    return {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Content-Type": "application/json",
+        **extra,
+    }
+
+
+def fetch_all(endpoint):
+    """GET every row of a PostgREST query, 1000 at a time."""
+    rows = []
+    offset = 0
+    limit = 1000
+
+    while True:
+        resp = requests.get(f"{SUPABASE_URL}/rest/v1/{endpoint}&offset={offset}&limit={limit}",
+                            headers=_headers())
+        if resp.status_code != 200:
+            raise RuntimeError(f"Failed to fetch {endpoint.split('?')[0]}: {resp.status_code} {resp.text}")
+
+        batch = resp.json()
+        rows.extend(batch)
+        if len(batch) < limit:
+            break
+        offset += limit
+
+    return rows
+
+
+def bulk_insert(table, rows, on_conflict):
+    """Insert all rows in one request, skipping any that already exist."""
+    if not rows:
+        return True
+    resp = requests.post(
+        f"{SUPABASE_URL}/rest/v1/{table}?on_conflict={on_conflict}",
+        headers=_headers(Prefer="resolution=ignore-duplicates,return=minimal"),
+        json=rows,
+    )
+    if resp.status_code in (200, 201):
+        return True
+    log.error(f"Bulk insert into {table} failed: {resp.status_code} {resp.text}")
+    return False
+
+
+def pick_players(candidates, count, rng, recent, difficulty_mix=None):
+    """
+    Pick `count` distinct players not in `recent`.
+
+    With a difficulty mix, slot i prefers players within difficulty_mix[i]
+    and falls back to any remaining candidate.
+    """
+    pool = [p for p in candidates if p["player_id"] not in recent]
+    rng.shuffle(pool)
+    picked = []
+    for slot in range(count):
+        low, high = difficulty_mix[slot] if difficulty_mix else (1, 5)
+        choice = next((p for p in pool if low <= p["difficulty"] <= high), None) \
+            or next(iter(pool), None)
+        if choice is None:
+            break
+        pool.remove(choice)
+        picked.append(choice["player_id"])
+    return picked
+
+
+def order_by_solve_rate(picked, players_by_id):
+    """Easiest first: observed solve rate when known, else the difficulty level."""
+    def ease(pid):
+        player = players_by_id[pid]
+        rate = player.get("solve_rate")
+        return rate if rate is not None else 1 - player["difficulty"] / 5
+    return sorted(picked, key=ease, reverse=True)
+
+
+def recent_players(used_by_date, day, window):
+    """Players used in the `window` days before `day`."""
+    recent = set()
+    for offset in range(1, window):
+        recent.update(used_by_date.get(day - timedelta(days=offset), ()))
+    return recent
+
+
+def schedule_solo(players, days):
+    """Return solo_daily_rounds rows for days that have none yet."""
+    since = days[0] - timedelta(days=SOLO_NO_REPEAT_DAYS)
+    existing = fetch_all(f"solo_daily_rounds?select=round_date,player_id&round_date=gte.{since}&order=round_date")
+    used_by_date = defaultdict(set)
+    for row in existing:
+        used_by_date[date.fromisoformat(row["round_date"])].add(row["player_id"])
+
+    eligible = [p for p in players if p["career_club_count"] >= 2]
+    rows = []
+    for day in days:
+        if day in used_by_date:
+            continue
+        rng = random.Random(f"solo-{day.isoformat()}")
+        recent = recent_players(used_by_date, day, SOLO_NO_REPEAT_DAYS)
+        picked = pick_players(eligible, len(SOLO_DIFFICULTY_MIX), rng, recent, SOLO_DIFFICULTY_MIX)
+        if len(picked) < len(SOLO_DIFFICULTY_MIX):
+            # Fallback if not enough players (use any player)
+            picked += pick_players(eligible, len(SOLO_DIFFICULTY_MIX) - len(picked), rng, set(picked))
+        used_by_date[day] = set(picked)
+        rows += [{"round_date": day.isoformat(), "round_number": i + 1, "player_id": pid}
+                 for i, pid in enumerate(picked)]
+    return rows
+
+
+def party_candidates(players, party, use_leagues=True, use_difficulty=True):
+    """Players matching a party's filters (mirrors generate_daily_rounds)."""
+    year_min = party.get("filter_start_year_min")
+    year_max = party.get("filter_start_year_max")
+    leagues = set(party.get("filter_leagues") or []) if use_leagues else set()
+    result = []
+    for p in players:
+        if p["career_club_count"] < 2:
+            continue
+        if use_difficulty and not party["difficulty_min"] <= p["difficulty"] <= party["difficulty_max"]:
+            continue
+        start = p.get("career_start_year")
+        if year_min is not None and (start is None or start < year_min):
+            continue
+        if year_max is not None and (start is None or start > year_max):
+            continue
+        if leagues and not leagues.intersection(p.get("leagues_played") or []):
+            continue
+        result.append(p)
+    return result
+
+
+def schedule_parties(players, days):
+    """Return daily_rounds rows for every active party and day that has none yet."""
+    parties = fetch_all(
+        "parties?select=id,rounds_per_day,difficulty_min,difficulty_max,"
+        "filter_start_year_min,filter_start_year_max,filter_leagues&is_active=eq.true&order=id"
+    )
+    since = days[0] - timedelta(days=PARTY_NO_REPEAT_DAYS)
+    existing = fetch_all(f"daily_rounds?select=party_id,round_date,player_id&round_date=gte.{since}&order=id")
+    used = defaultdict(lambda: defaultdict(set))
+    for row in existing:
+        used[row["party_id"]][date.fromisoformat(row["round_date"])].add(row["player_id"])
+
+    players_by_id = {p["player_id"]: p for p in players}
+    rows = []
+    for party in parties:
+        used_by_date = used[party["id"]]
+        filtered = party_candidates(players, party)
+        for day in days:
+            if day in used_by_date:
+                continue
+            rng = random.Random(f"{party['id']}-{day.isoformat()}")
+            count = party["rounds_per_day"]
+            picked = pick_players(filtered, count, rng, recent_players(used_by_date, day, PARTY_NO_REPEAT_DAYS))
+            if not picked:
+                # Fallback: just the year filter, then any player
+                picked = pick_players(party_candidates(players, party, use_leagues=False, use_difficulty=False),
+                                      count, rng, set()) \
+                    or pick_players(party_candidates(players, {}, False, False), count, rng, set())
+            picked = order_by_solve_rate(picked, players_by_id)
+            used_by_date[day] = set(picked)
+            rows += [{"party_id": party["id"], "round_date": day.isoformat(), "round_number": i + 1,
+                      "player_id": pid} for i, pid in enumerate(picked)]
+    return rows
+
+
+def run_schedule(days_ahead=7, dry_run=False):
+    log.info(f"=== Scheduling Rounds for the Next {days_ahead} Days ===")
+    # The app looks rounds up by UTC date (new Date().toISOString())
+    today = datetime.now(timezone.utc).date()
+    days = [today + timedelta(days=i) for i in range(days_ahead)]
+
+    players = fetch_all(
+        "player_quiz_payloads?select=player_id,difficulty,career_club_count,career_start_year,leagues_played"
+        "&is_active=eq.true&order=player_id"
+    )
+    solve_rates = {row["player_id"]: row["solve_rate"] for row in fetch_all(
+        f"player_stats?select=player_id,solve_rate&attempts=gte.{MIN_STATS_ATTEMPTS}&order=player_id"
+    )}
+    for p in players:
+        p["solve_rate"] = solve_rates.get(p["player_id"])
+    log.info(f"Loaded {len(players)} active players ({len(solve_rates)} with observed solve rates)")
+
+    solo_rows = schedule_solo(players, days)
+    party_rows = schedule_parties(players, days)
+    log.info(f"New solo rounds: {len(solo_rows)}, new party rounds: {len(party_rows)}")
+
+    if dry_run:
+        for row in solo_rows:
+            log.info(f"  Solo {row['round_date']} #{row['round_number']}: {row['player_id']}")
+        return
+
+    if bulk_insert("solo_daily_rounds", solo_rows, "round_date,round_number") and \
+            bulk_insert("daily_rounds", party_rows, "party_id,round_date,round_number"):
+        log.info("=== Done ===")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if not SUPABASE_KEY:
+        log.error("SUPABASE_SERVICE_KEY not set in environment")
+        sys.exit(1)
+
+    if len(sys.argv) > 1 and sys.argv[1] == "dry":
+        run_schedule(dry_run=True)
+    else:
+        run_schedule(days_ahead=int(sys.argv[1]) if len(sys.argv) > 1 else 7)
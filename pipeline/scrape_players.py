@@ -16,19 +16,53 @@ Usage:
   python scrape_players.py nationality 400  # Same with custom limit per country
   python scrape_players.py nationality-dry  # Dry run for nationality mode
   python scrape_players.py fr-boost       # Fetch more FR players (born >= 1970) for 2000s era
+  python scrape_players.py refresh        # Re-parse only players whose Wikipedia page changed
+  python scrape_players.py aliases        # Add Wikidata nicknames to existing players' aliases
+
+Uploading runs keep a checkpoint journal in checkpoints/<run>.jsonl. Rerunning the
+same command resumes where it stopped: QIDs already in players.wikidata_id or
+marked rejected/uploaded are skipped, parsed-but-not-uploaded players are replayed
+from the journal without re-fetching. Delete the journal file to start over.
+
+Set PARSE_WORKERS=<n> to parse pages in n worker processes.
+
+Club countries come from each club article's Wikidata item (P17), cached once
+per club in cache/club_wikidata.json; the CLUB_COUNTRIES table in
+fix_countries.py only covers clubs without a linked article or country.
+Aliases include each player's Wikidata nicknames (altLabel, P1449, P1559),
+cached once per player in cache/player_nicknames.json.
 """
 
-import re
 import json
 import time
 import logging
+import multiprocessing
 import os
-from typing import Optional
-from dataclasses import dataclass, field
+import queue
+import sys
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Iterable, Iterator, Optional
+from urllib.parse import unquote
+from dataclasses import dataclass, field, asdict
 
 import requests
 from dotenv import load_dotenv
 
+from alias_engine import generate_aliases
+from cleanup_engine import CAREER_RULES, apply_rules
+from club_fame import fame_table
+from difficulty import base_difficulty, is_top_club
+from fix_countries import COUNTRY_FLAGS
+from quiz_payloads import refresh_quiz_payloads
+from text_normalization import (
+    infobox_fields, clean_club_label, clean_years_text, link_target, first_number,
+)
+from update_nationalities import WIKIDATA_COUNTRY_MAP, COUNTRY_FLAGS as NATIONALITY_FLAGS
+from player_pools import rebuild_player_pools
+from answer_index import export_answer_index
+
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
@@ -40,6 +74,32 @@ SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
 WIKIDATA_SPARQL_URL = "https://query.wikidata.org/sparql"
 WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
 
+CHECKPOINT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "checkpoints")
+
+# Wikidata Query Service etiquette: a few parallel queries per client, small pages
+SPARQL_CONCURRENCY = 2
+SPARQL_PAGE_SIZE = 200
+SPARQL_RETRIES = 3
+SPARQL_BACKOFF_SECONDS = 5
+
+# Wikipedia API accepts at most 50 titles per query for regular clients
+WIKIPEDIA_TITLES_PER_QUERY = 50
+
+# Streaming pipeline: parsed players waiting for the writer (backpressure on fetching)
+PIPELINE_QUEUE_SIZE = 50
+UPLOAD_BATCH_SIZE = 25
+
+# Optional process pool for parsing (regex/Unicode work is GIL-bound). 0 parses
+# in the fetch thread, which is the right default: a page parses in ~0.1 ms
+# while fetching waits 0.5 s per page, and spawning and pickling make the pool
+# slower than inline parsing at that rate. Each worker gets PARSE_CHUNK_SIZE
+# pages per task, enough to amortize pickling the wikitexts in and the careers out.
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "0"))
+PARSE_CHUNK_SIZE = 50
+
+# Hits per cleanup rule applied at ingest (see validate_career), logged per run
+INGEST_RULE_HITS = Counter()
+
 LEAGUES = {
     "Q13394": "Ligue 1", "Q82595": "Bundesliga", "Q15804": "Serie A",
     "Q324867": "La Liga", "Q9448": "Premier League",
@@ -62,49 +122,35 @@ NATIONAL_TEAM_QIDS = {
     "ES": "Q46989",   # Spain national football team
 }
 
-COUNTRY_FLAGS = {
-    "FR": "🇫🇷", "DE": "🇩🇪", "IT": "🇮🇹", "ES": "🇪🇸", "EN": "🏴󠁧󠁢󠁥󠁮󠁧󠁿",
-    "PT": "🇵🇹", "NL": "🇳🇱", "BE": "🇧🇪", "BR": "🇧🇷", "AR": "🇦🇷",
-    "US": "🇺🇸", "TR": "🇹🇷", "RU": "🇷🇺", "UA": "🇺🇦", "PL": "🇵🇱",
-    "SE": "🇸🇪", "CH": "🇨🇭", "GR": "🇬🇷", "HR": "🇭🇷", "RS": "🇷🇸",
-    "SA": "🇸🇦", "CN": "🇨🇳", "CA": "🇨🇦", "SC": "🏴󠁧󠁢󠁳󠁣󠁴󠁿",
-}
+# Constituent countries of the UK: clubs there have P17 = UK (Q145), but the
+# game shows England/Scotland/Wales/Northern Ireland, found via P131
+UK_NATION_QIDS = ["Q21", "Q22", "Q25", "Q26"]
 
-KNOWN_CLUBS_COUNTRY = {
-    "AS Cannes": "FR", "Girondins de Bordeaux": "FR", "Paris Saint-Germain": "FR",
-    "Marseille": "FR", "Monaco": "FR", "Lyon": "FR", "Lille": "FR", "Nice": "FR",
-    "Le Mans": "FR", "Guingamp": "FR", "Auxerre": "FR", "Strasbourg": "FR",
-    "Manchester United": "EN", "Arsenal": "EN", "Chelsea": "EN", "Liverpool": "EN",
-    "Manchester City": "EN", "Tottenham": "EN", "Everton": "EN", "Newcastle United": "EN",
-    "Juventus": "IT", "AC Milan": "IT", "Inter Milan": "IT", "Inter": "IT",
-    "Roma": "IT", "Lazio": "IT", "Napoli": "IT", "Fiorentina": "IT",
-    "Real Madrid": "ES", "Barcelona": "ES", "Atlético Madrid": "ES", "Sevilla": "ES",
-    "Valencia": "ES", "Villarreal": "ES", "Espanyol": "ES", "Mallorca": "ES",
-    "Bayern Munich": "DE", "Borussia Dortmund": "DE", "Bayer Leverkusen": "DE",
-    "Schalke 04": "DE", "Wolfsburg": "DE", "Werder Bremen": "DE",
-    "Ajax": "NL", "PSV Eindhoven": "NL", "Feyenoord": "NL",
-    "Porto": "PT", "Benfica": "PT", "Sporting CP": "PT",
-    "Galatasaray": "TR", "Celtic": "SC", "Rangers": "SC",
-    "LA Galaxy": "US", "New York Red Bulls": "US", "New York City FC": "US",
-    "Montreal Impact": "CA", "Flamengo": "BR", "Grêmio": "BR", "Atlético Mineiro": "BR",
-    "Al Nassr": "SA", "Shanghai Shenhua": "CN", "Malmö FF": "SE",
-    "Lech Poznań": "PL", "Znicz Pruszków": "PL", "Anzhi Makhachkala": "RU",
-}
+CLUB_WIKIDATA_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "club_wikidata.json")
+PLAYER_NICKNAMES_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "player_nicknames.json")
+
+# Rows per players upsert when rewriting aliases of existing players
+ALIAS_UPDATE_BATCH_SIZE = 500
 
 
-@dataclass
+@dataclass(slots=True)
 class CareerEntry:
     years: str
     club: str
     country_code: str = ""
-    country_flag: str = ""
     matches: int = 0
     goals: int = 0
     chronological_order: int = 0
     sort_order: int = 0
+    club_link: str = ""  # Wikipedia article of the club, from the infobox link
+    club_qid: str = ""   # Wikidata item of that article, set by resolve_club_countries
+
+    @property
+    def country_flag(self) -> str:
+        return COUNTRY_FLAGS.get(self.country_code) or NATIONALITY_FLAGS.get(self.country_code, "")
 
 
-@dataclass
+@dataclass(slots=True)
 class Player:
     name: str
     aliases: list = field(default_factory=list)
@@ -112,6 +158,13 @@ class Player:
     wikidata_id: str = ""
     difficulty: int = 3
     career: list = field(default_factory=list)
+    revid: int = 0
+
+
+def player_from_dict(data: dict) -> Player:
+    # Journals written before the flag was derived still carry country_flag
+    return Player(**{**data, "career": [CareerEntry(**{k: v for k, v in e.items() if k != "country_flag"})
+                                        for e in data.get("career", [])]})
 
 
 def supabase_insert(table: str, data: dict) -> dict:
@@ -128,6 +181,196 @@ def supabase_insert(table: str, data: dict) -> dict:
     return {}
 
 
+def supabase_upsert(table: str, rows: list[dict], on_conflict: str, ignore_duplicates: bool = False) -> list[dict]:
+    """
+    Insert-or-merge several rows in one request; returns the written rows (empty on failure).
+
+    With ignore_duplicates, conflicting rows are left untouched and only new rows are written.
+    """
+    if not rows:
+        return []
+    resolution = "ignore-duplicates" if ignore_duplicates else "merge-duplicates"
+    headers = {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Content-Type": "application/json",
+        "Prefer": f"resolution={resolution},return=representation"
+    }
+    resp = requests.post(f"{SUPABASE_URL}/rest/v1/{table}?on_conflict={on_conflict}",
+                         headers=headers, json=rows)
+    if resp.status_code in (200, 201):
+        return resp.json()
+    log.error(f"Supabase upsert into {table} failed: {resp.status_code} {resp.text}")
+    return []
+
+
+def supabase_rpc(function: str, params: dict) -> bool:
+    headers = {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Content-Type": "application/json",
+    }
+    resp = requests.post(f"{SUPABASE_URL}/rest/v1/rpc/{function}", headers=headers, json=params)
+    if resp.status_code in (200, 204):
+        return True
+    log.error(f"Supabase rpc {function} failed: {resp.status_code} {resp.text}")
+    return False
+
+
+def supabase_update(table: str, query: str, data: dict) -> bool:
+    headers = {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Content-Type": "application/json",
+        "Prefer": "return=minimal"
+    }
+    resp = requests.patch(f"{SUPABASE_URL}/rest/v1/{table}?{query}", headers=headers, json=data)
+    if resp.status_code in (200, 204):
+        return True
+    log.error(f"Supabase update failed: {resp.status_code} {resp.text}")
+    return False
+
+
+def fetch_existing_wikidata_ids() -> set[str]:
+    """Return every wikidata_id already in the players table with its career written."""
+    headers = {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+    }
+    ids = set()
+    offset, limit = 0, 1000
+    while True:
+        resp = requests.get(
+            f"{SUPABASE_URL}/rest/v1/players?select=wikidata_id&wikidata_id=not.is.null"
+            f"&career_club_count=gt.0&order=id&offset={offset}&limit={limit}",
+            headers=headers,
+        )
+        if resp.status_code != 200:
+            log.error(f"Failed to fetch existing players: {resp.status_code} {resp.text}")
+            break
+        batch = resp.json()
+        ids.update(row["wikidata_id"] for row in batch)
+        if len(batch) < limit:
+            break
+        offset += limit
+    return ids
+
+
+class CheckpointJournal:
+    """
+    Append-only JSONL journal recording the state of each QID in a run.
+
+    States: fetched -> parsed (with the enriched player) | rejected -> uploaded.
+    The last state written for a QID wins, so a crashed run can be replayed
+    without re-fetching pages or re-inserting players.
+    """
+
+    def __init__(self, run_name: str):
+        os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+        self.path = os.path.join(CHECKPOINT_DIR, f"{run_name}.jsonl")
+        self.states: dict[str, str] = {}
+        self.parsed: dict[str, Player] = {}
+        if os.path.exists(self.path):
+            self._load()
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()  # Fetcher and writer threads both record
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn last line from a crash
+                qid, state = record["qid"], record["state"]
+                self.states[qid] = state
+                if state == "parsed":
+                    self.parsed[qid] = player_from_dict(record["player"])
+                else:
+                    self.parsed.pop(qid, None)
+        log.info(f"Checkpoint: loaded {len(self.states)} QIDs from {self.path}")
+
+    def record(self, qid: str, state: str, **extra):
+        line = json.dumps({"qid": qid, "state": state, **extra}, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.states[qid] = state
+            self._file.write(line)
+            self._file.flush()
+
+    def is_done(self, qid: str) -> bool:
+        return self.states.get(qid) in ("parsed", "rejected", "uploaded")
+
+    def close(self):
+        self._file.close()
+
+
+def sparql_select(query: str, timeout: int = 60) -> Optional[list[dict]]:
+    """Run a SPARQL query, retrying timeouts and 429/5xx with backoff. None if it fails."""
+    headers = {
+        "Accept": "application/sparql-results+json",
+        "User-Agent": "CareerQuizBot/1.0 (https://github.com/adroual/career-quiz; adroual@gmail.com)"
+    }
+    for attempt in range(1, SPARQL_RETRIES + 1):
+        try:
+            resp = requests.get(WIKIDATA_SPARQL_URL, params={"query": query},
+                                headers=headers, timeout=timeout)
+        except (requests.Timeout, requests.ConnectionError) as e:
+            error = e
+        else:
+            if resp.status_code != 429 and resp.status_code < 500:
+                try:
+                    resp.raise_for_status()
+                    return resp.json().get("results", {}).get("bindings", [])
+                except Exception as e:
+                    # Malformed query or response: retrying would fail the same way
+                    log.warning(f"Wikidata query failed: {e}")
+                    return None
+            error = f"{resp.status_code} from query service"
+        log.warning(f"Wikidata query failed (attempt {attempt}/{SPARQL_RETRIES}): {error}")
+        if attempt < SPARQL_RETRIES:
+            time.sleep(SPARQL_BACKOFF_SECONDS * attempt)
+    return None
+
+
+def fetch_sparql_players(where: str, limit: int, label: str, timeout: int = 60) -> list[dict]:
+    """
+    Page through `SELECT ?player ?playerLabel ?article WHERE { <where> }` up to `limit` rows.
+
+    Results are ordered by ?player and fetched SPARQL_PAGE_SIZE rows at a time,
+    so a large limit never becomes one timeout-prone query and a failed page is
+    retried on its own. A page that still fails after retries ends the paging.
+    """
+    players = []
+    for offset in range(0, limit, SPARQL_PAGE_SIZE):
+        page_size = min(SPARQL_PAGE_SIZE, limit - offset)
+        query = f"""
+        SELECT DISTINCT ?player ?playerLabel ?article WHERE {{
+          {where}
+          ?article schema:about ?player ;
+                   schema:isPartOf <https://en.wikipedia.org/> .
+          SERVICE wikibase:label {{ bd:serviceParam wikibase:language "en". }}
+        }}
+        ORDER BY ?player
+        LIMIT {page_size} OFFSET {offset}
+        """
+        bindings = sparql_select(query, timeout)
+        if bindings is None:
+            log.error(f"Wikidata: giving up on {label} at offset {offset}")
+            break
+
+        for result in bindings:
+            qid = result["player"]["value"].split("/")[-1]
+            name = result.get("playerLabel", {}).get("value", "")
+            article_url = result.get("article", {}).get("value", "")
+            wiki_title = article_url.split("/wiki/")[-1] if "/wiki/" in article_url else ""
+            if name and wiki_title:
+                players.append({"qid": qid, "name": name, "wikipedia_title": wiki_title})
+        if len(bindings) < page_size:
+            break
+        time.sleep(1)
+    return players
+
+
 def fetch_players_from_wikidata(league_qid: str, limit: int = 500, national_team_only: bool = True) -> list[dict]:
     """
     Fetch football players from Wikidata.
@@ -135,60 +378,22 @@ def fetch_players_from_wikidata(league_qid: str, limit: int = 500, national_team
     If national_team_only=True (default), only returns players who have played
     for a national team at least once - this significantly improves player recognition.
     """
+    where = f"""
+          ?player wdt:P106 wd:Q937857 .
+          ?player wdt:P118 wd:{league_qid} .
+    """
     if national_team_only:
         # Only players who have been part of a national football team
         # wdt:P54 = member of sports team
         # wd:Q6979593 = national association football team (class)
-        query = f"""
-        SELECT DISTINCT ?player ?playerLabel ?article WHERE {{
-          ?player wdt:P106 wd:Q937857 .
-          ?player wdt:P118 wd:{league_qid} .
-
-          # Must have played for a national team
+        where += """
           ?player wdt:P54 ?nationalTeam .
           ?nationalTeam wdt:P31 wd:Q6979593 .
-
-          ?article schema:about ?player ;
-                   schema:isPartOf <https://en.wikipedia.org/> .
-          SERVICE wikibase:label {{ bd:serviceParam wikibase:language "en". }}
-        }}
-        LIMIT {limit}
-        """
-    else:
-        # Original query - all players from the league
-        query = f"""
-        SELECT DISTINCT ?player ?playerLabel ?article WHERE {{
-          ?player wdt:P106 wd:Q937857 .
-          ?player wdt:P118 wd:{league_qid} .
-          ?article schema:about ?player ;
-                   schema:isPartOf <https://en.wikipedia.org/> .
-          SERVICE wikibase:label {{ bd:serviceParam wikibase:language "en". }}
-        }}
-        LIMIT {limit}
         """
-    headers = {
-        "Accept": "application/sparql-results+json",
-        "User-Agent": "CareerQuizBot/1.0 (https://github.com/adroual/career-quiz; adroual@gmail.com)"
-    }
-    try:
-        resp = requests.get(WIKIDATA_SPARQL_URL, params={"query": query},
-                          headers=headers, timeout=60)
-        resp.raise_for_status()
-        data = resp.json()
-    except Exception as e:
-        log.error(f"Wikidata query failed: {e}")
-        return []
 
-    players = []
-    for result in data.get("results", {}).get("bindings", []):
-        qid = result["player"]["value"].split("/")[-1]
-        name = result.get("playerLabel", {}).get("value", "")
-        article_url = result.get("article", {}).get("value", "")
-        wiki_title = article_url.split("/wiki/")[-1] if "/wiki/" in article_url else ""
-        if name and wiki_title:
-            players.append({"qid": qid, "name": name, "wikipedia_title": wiki_title})
-
-    log.info(f"Wikidata: Found {len(players)} players for {LEAGUES.get(league_qid, league_qid)}")
+    league_name = LEAGUES.get(league_qid, league_qid)
+    players = fetch_sparql_players(where, limit, league_name, timeout=60)
+    log.info(f"Wikidata: Found {len(players)} players for {league_name}")
     return players
 
 
@@ -203,101 +408,70 @@ def fetch_players_by_nationality(country_code: str, limit: int = 400, min_birth_
 
     country_qid, country_name = NATIONALITY_QIDS[country_code]
 
-    # For England, use specific national team filter (since UK citizenship is shared)
-    # For others, use general national team class filter
-    if country_code == "EN":
-        national_team_qid = NATIONAL_TEAM_QIDS["EN"]
-        query = f"""
-        SELECT DISTINCT ?player ?playerLabel ?article WHERE {{
+    where = f"""
           ?player wdt:P106 wd:Q937857 .
           ?player wdt:P27 wd:{country_qid} .
           ?player wdt:P569 ?birthDate .
           FILTER(YEAR(?birthDate) >= {min_birth_year})
-
-          # Must have played for England national team specifically
-          ?player wdt:P54 wd:{national_team_qid} .
-
-          ?article schema:about ?player ;
-                   schema:isPartOf <https://en.wikipedia.org/> .
-          SERVICE wikibase:label {{ bd:serviceParam wikibase:language "en". }}
-        }}
-        LIMIT {limit}
+    """
+    # For England, use specific national team filter (since UK citizenship is shared)
+    # For others, use general national team class filter
+    if country_code == "EN":
+        where += f"""
+          ?player wdt:P54 wd:{NATIONAL_TEAM_QIDS["EN"]} .
         """
     else:
-        # For FR, IT, ES - use citizenship + any national team
-        query = f"""
-        SELECT DISTINCT ?player ?playerLabel ?article WHERE {{
-          ?player wdt:P106 wd:Q937857 .
-          ?player wdt:P27 wd:{country_qid} .
-          ?player wdt:P569 ?birthDate .
-          FILTER(YEAR(?birthDate) >= {min_birth_year})
-
-          # Must have played for a national team
+        where += """
           ?player wdt:P54 ?nationalTeam .
           ?nationalTeam wdt:P31 wd:Q6979593 .
-
-          ?article schema:about ?player ;
-                   schema:isPartOf <https://en.wikipedia.org/> .
-          SERVICE wikibase:label {{ bd:serviceParam wikibase:language "en". }}
-        }}
-        LIMIT {limit}
         """
 
-    headers = {
-        "Accept": "application/sparql-results+json",
-        "User-Agent": "CareerQuizBot/1.0 (https://github.com/adroual/career-quiz; adroual@gmail.com)"
-    }
-    try:
-        resp = requests.get(WIKIDATA_SPARQL_URL, params={"query": query},
-                           headers=headers, timeout=120)
-        resp.raise_for_status()
-        data = resp.json()
-    except Exception as e:
-        log.error(f"Wikidata query failed for {country_name}: {e}")
-        return []
-
-    players = []
-    for result in data.get("results", {}).get("bindings", []):
-        qid = result["player"]["value"].split("/")[-1]
-        name = result.get("playerLabel", {}).get("value", "")
-        article_url = result.get("article", {}).get("value", "")
-        wiki_title = article_url.split("/wiki/")[-1] if "/wiki/" in article_url else ""
-        if name and wiki_title:
-            players.append({"qid": qid, "name": name, "wikipedia_title": wiki_title})
-
+    players = fetch_sparql_players(where, limit, country_name, timeout=120)
     log.info(f"Wikidata: Found {len(players)} {country_name} players (born >= {min_birth_year})")
     return players
 
 
+def iter_concurrently(fetch, args_list: list[tuple]) -> Iterator[dict]:
+    """Run fetch(*args) for each args tuple, SPARQL_CONCURRENCY at a time; yield unique players as queries finish."""
+    seen = set()
+    with ThreadPoolExecutor(max_workers=SPARQL_CONCURRENCY) as pool:
+        futures = [pool.submit(fetch, *args) for args in args_list]
+        for future in as_completed(futures):
+            for p in future.result():
+                if p["qid"] not in seen:
+                    seen.add(p["qid"])
+                    yield p
+    log.info(f"Total unique players: {len(seen)}")
+
+
+def iter_players_by_nationalities(country_codes: list[str], limit_per_country: int = 400,
+                                  min_birth_year: int = 1985) -> Iterator[dict]:
+    """Yield unique players from multiple nationalities as each country query completes."""
+    log.info(f"Fetching {', '.join(country_codes)} players (born >= {min_birth_year})...")
+    yield from iter_concurrently(fetch_players_by_nationality,
+                                 [(code, limit_per_country, min_birth_year) for code in country_codes])
+
+
 def fetch_players_by_nationalities(country_codes: list[str], limit_per_country: int = 400, min_birth_year: int = 1985) -> dict:
     """Fetch players from multiple nationalities."""
-    all_players = {}
-    for code in country_codes:
-        country_name = NATIONALITY_QIDS.get(code, (None, code))[1]
-        log.info(f"Fetching {country_name} players (born >= {min_birth_year})...")
-        for p in fetch_players_by_nationality(code, limit_per_country, min_birth_year):
-            if p["qid"] not in all_players:
-                all_players[p["qid"]] = p
-        time.sleep(3)  # Longer delay between country queries
-    log.info(f"Total unique players from nationalities: {len(all_players)}")
-    return all_players
+    return {p["qid"]: p for p in iter_players_by_nationalities(country_codes, limit_per_country, min_birth_year)}
+
+
+def iter_all_league_players(limit_per_league: int = 500, national_team_only: bool = True) -> Iterator[dict]:
+    """Yield unique players from every league as each league query completes."""
+    log.info(f"Fetching {', '.join(LEAGUES.values())} players (national team filter: {national_team_only})...")
+    yield from iter_concurrently(fetch_players_from_wikidata,
+                                 [(qid, limit_per_league, national_team_only) for qid in LEAGUES])
 
 
 def fetch_all_league_players(limit_per_league: int = 500, national_team_only: bool = True) -> dict:
-    all_players = {}
-    for qid, name in LEAGUES.items():
-        log.info(f"Fetching {name} players (national team filter: {national_team_only})...")
-        for p in fetch_players_from_wikidata(qid, limit_per_league, national_team_only):
-            if p["qid"] not in all_players:
-                all_players[p["qid"]] = p
-        time.sleep(2)
-    log.info(f"Total unique players: {len(all_players)}")
-    return all_players
+    return {p["qid"]: p for p in iter_all_league_players(limit_per_league, national_team_only)}
 
 
-def fetch_wikipedia_wikitext(title: str) -> Optional[str]:
-    params = {"action": "query", "titles": title, "prop": "revisions",
-              "rvprop": "content", "format": "json", "formatversion": "2"}
+def fetch_wikipedia_revision(title: str) -> tuple[Optional[str], int]:
+    """Return (wikitext, revid) of the current revision of a page, following redirects."""
+    params = {"action": "query", "titles": title, "prop": "revisions", "redirects": "1",
+              "rvprop": "ids|content", "format": "json", "formatversion": "2"}
     headers = {
         "User-Agent": "CareerQuizBot/1.0 (https://github.com/adroual/career-quiz; adroual@gmail.com)"
     }
@@ -307,117 +481,311 @@ def fetch_wikipedia_wikitext(title: str) -> Optional[str]:
         data = resp.json()
         pages = data.get("query", {}).get("pages", [])
         if pages and "revisions" in pages[0]:
-            return pages[0]["revisions"][0].get("content", "")
+            revision = pages[0]["revisions"][0]
+            return revision.get("content", ""), revision.get("revid", 0)
     except Exception as e:
         log.warning(f"Wikipedia API failed for {title}: {e}")
-    return None
+    return None, 0
+
+
+def fetch_wikipedia_wikitext(title: str) -> Optional[str]:
+    return fetch_wikipedia_revision(title)[0]
+
+
+def query_wikipedia_titles(titles: list[str], params: dict) -> Iterator[tuple[str, dict]]:
+    """
+    Run a prop query over many pages, 50 titles per API call. Yields (title, page).
+
+    Titles are mapped back through the API's normalization and redirects so the
+    yielded titles are exactly the titles passed in. Missing and invalid pages
+    are yielded too (flagged "missing"/"invalid"); titles of failed calls are not.
+    """
+    headers = {
+        "User-Agent": "CareerQuizBot/1.0 (https://github.com/adroual/career-quiz; adroual@gmail.com)"
+    }
+    for i in range(0, len(titles), WIKIPEDIA_TITLES_PER_QUERY):
+        batch = titles[i:i + WIKIPEDIA_TITLES_PER_QUERY]
+        try:
+            resp = requests.get(WIKIPEDIA_API_URL, headers=headers, timeout=30, params={
+                "action": "query", "titles": "|".join(unquote(t) for t in batch), "redirects": "1",
+                "format": "json", "formatversion": "2", **params,
+            })
+            resp.raise_for_status()
+            query = resp.json().get("query", {})
+        except Exception as e:
+            log.warning(f"Wikipedia {params.get('prop')} lookup failed for batch at {i}: {e}")
+            continue
+
+        renames = {r["from"]: r["to"] for r in query.get("normalized", []) + query.get("redirects", [])}
+        pages = {p["title"]: p for p in query.get("pages", []) if "title" in p}
+        for title in batch:
+            resolved = unquote(title)
+            while resolved in renames:
+                resolved = renames[resolved]
+            if resolved in pages:
+                yield title, pages[resolved]
+        time.sleep(0.5)
+
+
+def fetch_current_revids(titles: list[str]) -> dict[str, int]:
+    """Return {title: current revid} for many pages."""
+    return {title: page["revisions"][0]["revid"]
+            for title, page in query_wikipedia_titles(titles, {"prop": "revisions", "rvprop": "ids"})
+            if "revisions" in page}
+
+
+def fetch_wikidata_items(titles: list[str]) -> dict[str, str]:
+    """Return {title: Wikidata QID, or "" if the article is missing or has none} for many articles."""
+    return {title: page.get("pageprops", {}).get("wikibase_item", "")
+            for title, page in query_wikipedia_titles(titles, {"prop": "pageprops", "ppprop": "wikibase_item"})}
+
+
+def fetch_club_countries(qids: list[str]) -> dict[str, str]:
+    """
+    Return {club QID: country code} from P17, using the UK nation (via P131) for UK clubs.
+
+    Clubs without a usable country map to "". Clubs from failed queries are left out.
+    """
+    nations = " ".join(f"wd:{q}" for q in UK_NATION_QIDS)
+    countries = {}
+    for i in range(0, len(qids), SPARQL_PAGE_SIZE):
+        values = " ".join(f"wd:{q}" for q in qids[i:i + SPARQL_PAGE_SIZE])
+        rows = sparql_select(f"""
+        SELECT ?club ?country ?nation WHERE {{
+          VALUES ?club {{ {values} }}
+          ?club wdt:P17 ?country .
+          OPTIONAL {{ VALUES ?nation {{ {nations} }} ?club wdt:P131* ?nation . }}
+        }}
+        """)
+        if rows is None:
+            continue
+        countries.update(dict.fromkeys(qids[i:i + SPARQL_PAGE_SIZE], ""))
+        for row in rows:
+            club = row["club"]["value"].split("/")[-1]
+            country = row.get("nation", row["country"])["value"].split("/")[-1]
+            if country in WIKIDATA_COUNTRY_MAP and country != "Q145":
+                countries[club] = WIKIDATA_COUNTRY_MAP[country][1]
+    return countries
+
+
+class ClubWikidataCache:
+    """
+    Local cache of club article -> QID and club QID -> country code.
+
+    Misses (missing articles, articles without an item, clubs without a
+    country) are stored as "" so each club is looked up once ever (failed
+    requests are not cached and retried next run). Delete
+    cache/club_wikidata.json to resolve everything again.
+    """
+
+    def __init__(self, path: str = CLUB_WIKIDATA_CACHE):
+        self.path = path
+        self.titles: dict[str, str] = {}
+        self.countries: dict[str, str] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.titles, self.countries = data["titles"], data["countries"]
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"titles": self.titles, "countries": self.countries}, f, ensure_ascii=False)
+
+    def resolve(self, links: Iterable[str]) -> dict[str, str]:
+        """Return {club article: country code} for the given articles, fetching only unseen ones."""
+        links = set(links)
+        new_titles = [t for t in links if t not in self.titles]
+        if new_titles:
+            self.titles.update(fetch_wikidata_items(new_titles))
+
+        new_qids = list({self.titles.get(t, "") for t in links} - set(self.countries) - {""})
+        if new_qids:
+            self.countries.update(fetch_club_countries(new_qids))
+
+        if new_titles or new_qids:
+            self.save()
+        return {t: self.countries.get(self.titles.get(t, ""), "") for t in links}
+
+
+_club_wikidata = None
+
+
+def resolve_club_countries(career: list[CareerEntry]):
+    """
+    Set the country of career entries from their club's Wikidata item.
+
+    Entries whose club has no linked article or no known country keep the
+    country found by validate_career. Runs in batches (a whole upload batch
+    at a time) so each Wikipedia/SPARQL call covers many clubs.
+    """
+    global _club_wikidata
+    if _club_wikidata is None:
+        _club_wikidata = ClubWikidataCache()
+
+    countries = _club_wikidata.resolve(e.club_link for e in career if e.club_link)
+    for entry in career:
+        entry.club_qid = sys.intern(_club_wikidata.titles.get(entry.club_link, ""))
+        code = countries.get(entry.club_link)
+        if code and code != entry.country_code:
+            INGEST_RULE_HITS["wikidata_country"] += 1
+            entry.country_code = sys.intern(code)
+
+
+def fetch_player_nicknames(qids: list[str]) -> dict[str, list[str]]:
+    """
+    Return {player QID: other names} from English altLabels, P1449 (nickname) and
+    P1559 (name in native language), SPARQL_PAGE_SIZE players per query.
+
+    Players without other names map to []. Players from failed queries are left out.
+    """
+    nicknames = {}
+    for i in range(0, len(qids), SPARQL_PAGE_SIZE):
+        values = " ".join(f"wd:{q}" for q in qids[i:i + SPARQL_PAGE_SIZE])
+        rows = sparql_select(f"""
+        SELECT ?player ?name WHERE {{
+          VALUES ?player {{ {values} }}
+          {{ ?player skos:altLabel ?name . FILTER(LANG(?name) = "en") }}
+          UNION {{ ?player wdt:P1449 ?name . }}
+          UNION {{ ?player wdt:P1559 ?name . }}
+        }}
+        """)
+        if rows is None:
+            continue
+        for qid in qids[i:i + SPARQL_PAGE_SIZE]:
+            nicknames[qid] = []
+        for row in rows:
+            qid = row["player"]["value"].split("/")[-1]
+            name = row["name"]["value"]
+            if name not in nicknames[qid]:
+                nicknames[qid].append(name)
+    return nicknames
+
+
+class PlayerNicknameCache:
+    """
+    Local cache of player QID -> Wikidata nicknames, like ClubWikidataCache.
+
+    Players without nicknames are stored as [] so each one is queried once
+    ever. Delete cache/player_nicknames.json to fetch everything again.
+    """
+
+    def __init__(self, path: str = PLAYER_NICKNAMES_CACHE):
+        self.path = path
+        self.nicknames: dict[str, list[str]] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.nicknames = json.load(f)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.nicknames, f, ensure_ascii=False)
+
+    def resolve(self, qids: Iterable[str]) -> dict[str, list[str]]:
+        """Return {QID: nicknames} for the given players, fetching only unseen ones."""
+        qids = set(qids) - {""}
+        new_qids = sorted(qids - set(self.nicknames))
+        if new_qids:
+            self.nicknames.update(fetch_player_nicknames(new_qids))
+            self.save()
+        return {q: self.nicknames.get(q, []) for q in qids}
+
+
+_player_nicknames = None
+
+
+def enrich_aliases(players: list[Player]):
+    """
+    Regenerate aliases of players with their Wikidata nicknames.
+
+    Runs on a whole batch at a time so one SPARQL query covers many players.
+    Aliases the players already have are kept.
+    """
+    global _player_nicknames
+    if _player_nicknames is None:
+        _player_nicknames = PlayerNicknameCache()
+
+    nicknames = _player_nicknames.resolve(p.wikidata_id for p in players)
+    for player in players:
+        extra = nicknames.get(player.wikidata_id, [])
+        if extra:
+            INGEST_RULE_HITS["wikidata_nicknames"] += 1
+        player.aliases = generate_aliases(player.name, [*extra, *player.aliases])
 
 
 def parse_career_from_wikitext(wikitext: str) -> list[CareerEntry]:
+    fields = infobox_fields(wikitext)
     entries = []
     for i in range(1, 30):
-        years = _extract_field(wikitext, f"years{i}")
-        clubs = _extract_field(wikitext, f"clubs{i}")
-        caps = _extract_field(wikitext, f"caps{i}")
-        goals = _extract_field(wikitext, f"goals{i}")
-
+        clubs = fields.get(("clubs", i))
         if not clubs:
             break
-        club_name = _clean_club_name(clubs)
+        club_name = clean_club_label(clubs)
         if not club_name:
             continue
 
-        country_code = _guess_country(club_name)
+        years = fields.get(("years", i))
         entries.append(CareerEntry(
-            years=_clean_years(years) if years else "",
+            years=clean_years_text(years) if years else "",
             club=club_name,
-            country_code=country_code,
-            country_flag=COUNTRY_FLAGS.get(country_code, ""),
-            matches=_parse_int(caps),
-            goals=_parse_int(goals),
+            club_link=sys.intern(link_target(clubs)),
+            matches=_parse_int(fields.get(("caps", i))),
+            goals=_parse_int(fields.get(("goals", i))),
             chronological_order=i,
         ))
     return entries
 
 
-def _extract_field(wikitext: str, field_name: str) -> Optional[str]:
-    match = re.search(rf'\|\s*{re.escape(field_name)}\s*=\s*(.*?)(?=\n\s*\||\n\s*\}})', wikitext, re.DOTALL)
-    return match.group(1).strip() if match else None
-
-
-def _clean_club_name(raw: str) -> str:
-    raw = re.sub(r'→\s*', '', raw)
-    raw = re.sub(r'\[\[([^\]|]*)\|([^\]]*)\]\]', r'\2', raw)
-    raw = re.sub(r'\[\[([^\]]*)\]\]', r'\1', raw)
-    raw = re.sub(r"<[^>]+>|\{\{[^}]*\}\}|'''?|\(loan\)", "", raw, flags=re.IGNORECASE)
-    return raw.strip()
-
-
-def _clean_years(raw: str) -> str:
-    raw = re.sub(r'\[\[([^\]]*)\]\]|\{\{[^}]*\}\}', r'\1', raw)
-    return re.sub(r'[–—]', '–', raw).strip()
-
-
 def _parse_int(raw: Optional[str]) -> int:
-    if not raw:
+    # Just the first number (avoid concatenating multiple numbers)
+    value = first_number(raw) if raw else None
+    if value is None:
         return 0
-    # Extract just the first number (avoid concatenating multiple numbers)
-    match = re.search(r'\d+', raw)
-    if not match:
-        return 0
-    value = int(match.group())
     # Sanity check: cap at reasonable max (no player has 2000+ apps/goals per club)
     return min(value, 2000)
 
 
-def _guess_country(club_name: str) -> str:
-    if club_name in KNOWN_CLUBS_COUNTRY:
-        return KNOWN_CLUBS_COUNTRY[club_name]
-    for known, code in KNOWN_CLUBS_COUNTRY.items():
-        if known.lower() in club_name.lower() or club_name.lower() in known.lower():
-            return code
-    return ""
+def validate_career(career: list[CareerEntry]) -> list[CareerEntry]:
+    """
+    Run the cleanup_engine career rules on freshly parsed entries before upload.
 
+    Strips `| caps3 = 13` tails and `1. ` prefixes, then resolves the country
+    from the cleaned club name with the full fix_countries table, so these rows
+    never need the post-hoc cleanup passes. Entries left without a club are dropped.
+    Club names and codes are interned: big runs repeat the same few thousand clubs.
+    """
+    for entry in career:
+        row = {"club": entry.club, "years": entry.years, "country_code": entry.country_code}
+        changes = apply_rules(row, CAREER_RULES, INGEST_RULE_HITS)
+        entry.club = sys.intern(changes.get("club", entry.club))
+        entry.years = changes.get("years", entry.years)
+        entry.country_code = sys.intern(changes.get("country_code", entry.country_code))
+    return [e for e in career if e.club]
 
-def generate_aliases(name: str) -> list[str]:
-    import unicodedata
-    aliases = [name.lower()]
-    parts = name.split()
-    if len(parts) > 1:
-        aliases.append(parts[-1].lower())
-    if len(parts) > 2:
-        aliases.append(f"{parts[0]} {parts[-1]}".lower())
-    for alias in list(aliases):
-        ascii_ver = unicodedata.normalize('NFD', alias).encode('ascii', 'ignore').decode('ascii')
-        if ascii_ver != alias:
-            aliases.append(ascii_ver)
-    return list(set(aliases))
+
+def log_ingest_rule_hits():
+    if INGEST_RULE_HITS:
+        log.info("Ingest cleanup hits: " + ", ".join(f"{name}={count}" for name, count in INGEST_RULE_HITS.items()))
 
 
 def compute_difficulty(career: list[CareerEntry]) -> int:
-    total_apps = sum(e.matches for e in career)
-    top_clubs = {"Real Madrid", "Barcelona", "Manchester United", "Liverpool", "Chelsea",
-                 "Arsenal", "Bayern Munich", "Juventus", "AC Milan", "Inter Milan", "Paris Saint-Germain"}
-    top_count = sum(1 for e in career if any(tc.lower() in e.club.lower() for tc in top_clubs))
-    if total_apps > 400 and top_count >= 2:
-        return 1
-    elif total_apps > 250 and top_count >= 1:
-        return 2
-    elif total_apps > 150:
-        return 3
-    elif total_apps > 80:
-        return 4
-    return 5
+    """Initial level of a new player; difficulty.py recalibrates every player from real answers."""
+    return base_difficulty(sum(e.matches for e in career), sum(is_top_club(e.club) for e in career))
 
 
 def compute_reveal_order(career: list[CareerEntry]) -> list[CareerEntry]:
-    top_rank = {"Real Madrid": 10, "Barcelona": 10, "Manchester United": 9, "Liverpool": 9,
-                "Bayern Munich": 9, "Juventus": 9, "Chelsea": 8, "AC Milan": 8, "Inter Milan": 8,
-                "Arsenal": 8, "Paris Saint-Germain": 8, "Manchester City": 8}
+    """
+    Least famous club first (club_fame.py), ties broken by appearances then chronology.
+
+    Run after resolve_club_countries: fame is looked up by club_key like
+    recompute_sort_orders() does, and only falls back to the label (the most
+    famous club using it) for clubs not in the table yet.
+    """
+    table = fame_table()
 
     def fame(e):
-        f = max((rank for club, rank in top_rank.items() if club.lower() in e.club.lower()), default=0)
-        return f + e.matches / 100
+        return table.lookup(e.club, club_key(e)) + e.matches / 100
 
     sorted_career = sorted(career, key=fame)
     for i, entry in enumerate(sorted_career):
@@ -425,33 +793,94 @@ def compute_reveal_order(career: list[CareerEntry]) -> list[CareerEntry]:
     return sorted_career
 
 
-def upload_to_supabase(players: list[Player]):
+def club_key(entry: CareerEntry) -> str:
+    """clubs.club_key of an entry's club: its Wikidata QID, else its name."""
+    return entry.club_qid or f"name:{entry.club}"
+
+
+def upsert_clubs(career: list[CareerEntry]) -> dict[str, str]:
+    """Upsert the clubs of many career entries in one call. Returns {club_key: club id}."""
+    clubs = {}
+    for entry in career:
+        club = clubs.setdefault(club_key(entry), {
+            "club_key": club_key(entry), "name": entry.club_link if entry.club_qid else entry.club,
+            "aliases": [], "country_code": entry.country_code, "country_flag": entry.country_flag,
+            "wikidata_id": entry.club_qid or None,
+        })
+        if entry.club not in club["aliases"]:
+            club["aliases"].append(entry.club)
+    if not clubs:
+        return {}
+
+    headers = {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Content-Type": "application/json",
+    }
+    resp = requests.post(f"{SUPABASE_URL}/rest/v1/rpc/upsert_clubs", headers=headers,
+                         json={"p_clubs": list(clubs.values())})
+    if resp.status_code != 200:
+        log.error(f"Supabase upsert_clubs failed: {resp.status_code} {resp.text}")
+        return {}
+    return {row["club_key"]: row["id"] for row in resp.json()}
+
+
+def career_row(entry: CareerEntry, club_ids: dict[str, str]) -> dict:
+    return {
+        "sort_order": entry.sort_order, "chronological_order": entry.chronological_order,
+        "years": entry.years, "club": entry.club, "club_id": club_ids.get(club_key(entry)),
+        "country_code": entry.country_code, "country_flag": entry.country_flag,
+        "matches": entry.matches, "goals": entry.goals,
+    }
+
+
+def upload_batch(players: list[Player], journal: Optional[CheckpointJournal] = None) -> int:
+    """
+    Upsert a batch of players keyed on wikidata_id, then replace their careers.
+
+    Re-uploading a QID updates the existing row instead of duplicating it, except
+    for difficulty: only new players get the initial level, so a level written by
+    difficulty.py is never reset. Clubs are upserted first (upsert_clubs) so
+    entries can reference them. New rows keep career_club_count = 0 (not
+    playable, not "existing" for resume) until replace_career_entries_bulk()
+    has written their career.
+    """
+    supabase_upsert("players", [{
+        "name": p.name, "aliases": p.aliases, "wikipedia_title": p.wikipedia_title,
+        "wikidata_id": p.wikidata_id, "difficulty": p.difficulty,
+        "wikipedia_revid": p.revid or None,
+    } for p in players], on_conflict="wikidata_id", ignore_duplicates=True)
+    rows = supabase_upsert("players", [{
+        "name": p.name, "aliases": p.aliases, "wikipedia_title": p.wikipedia_title,
+        "wikidata_id": p.wikidata_id, "wikipedia_revid": p.revid or None,
+    } for p in players], on_conflict="wikidata_id")
+    ids = {row["wikidata_id"]: row["id"] for row in rows}
+    if not ids:
+        return 0
+
+    club_ids = upsert_clubs([entry for p in players for entry in p.career])
+    career_rows = [{"player_id": ids[p.wikidata_id], **career_row(entry, club_ids)}
+                   for p in players if p.wikidata_id in ids for entry in p.career]
+    if not supabase_rpc("replace_career_entries_bulk", {"p_entries": career_rows}):
+        return 0
+    refresh_quiz_payloads(ids.values())
+
+    if journal:
+        for qid in ids:
+            journal.record(qid, "uploaded")
+    return len(ids)
+
+
+def upload_to_supabase(players: list[Player], journal: Optional[CheckpointJournal] = None):
     if not SUPABASE_KEY:
         log.warning("No Supabase key. Saving to JSON.")
         save_to_json(players)
         return
 
     uploaded = 0
-    for player in players:
-        result = supabase_insert("players", {
-            "name": player.name, "aliases": player.aliases, "wikipedia_title": player.wikipedia_title,
-            "wikidata_id": player.wikidata_id, "difficulty": player.difficulty,
-            "career_club_count": len(player.career),
-        })
-        if not result or not result.get("id"):
-            continue
-
-        for entry in player.career:
-            supabase_insert("career_entries", {
-                "player_id": result["id"], "sort_order": entry.sort_order,
-                "chronological_order": entry.chronological_order, "years": entry.years,
-                "club": entry.club, "country_code": entry.country_code,
-                "country_flag": entry.country_flag, "matches": entry.matches, "goals": entry.goals,
-            })
-
-        uploaded += 1
-        if uploaded % 20 == 0:
-            log.info(f"Uploaded: {uploaded}/{len(players)}")
+    for i in range(0, len(players), UPLOAD_BATCH_SIZE):
+        uploaded += upload_batch(players[i:i + UPLOAD_BATCH_SIZE], journal)
+        log.info(f"Uploaded: {uploaded}/{len(players)}")
 
     log.info(f"Done! Uploaded {uploaded} players")
 
@@ -466,68 +895,357 @@ def save_to_json(players: list[Player], filename: str = "players_data.json"):
     log.info(f"Saved {len(data)} players to {filename}")
 
 
-def run_nationality_pipeline(country_codes: list[str], limit_per_country: int = 400,
-                             min_birth_year: int = 1985, upload: bool = True):
-    """Pipeline to fetch players by nationality."""
-    log.info("=== Starting Nationality-Based Pipeline ===")
-    log.info(f"Countries: {country_codes}")
-    log.info(f"Min birth year: {min_birth_year}, Limit per country: {limit_per_country}")
+def parse_page(name: str, wikitext: str) -> tuple[list[CareerEntry], list[str], int]:
+    """CPU-bound part of enrichment: (career, aliases, difficulty). Reveal order comes later."""
+    career = validate_career(parse_career_from_wikitext(wikitext))
+    return career, generate_aliases(name), compute_difficulty(career)
 
-    raw_players = fetch_players_by_nationalities(country_codes, limit_per_country, min_birth_year)
 
-    enriched = []
-    for i, (qid, info) in enumerate(raw_players.items()):
-        if i % 100 == 0:
-            log.info(f"Progress: {i}/{len(raw_players)}")
+def _parse_pages_chunk(pages: list[tuple[str, str]]) -> tuple[list[tuple], dict]:
+    """Process-pool task: parse (name, wikitext) pairs, careers returned as plain tuples."""
+    INGEST_RULE_HITS.clear()
+    results = []
+    for name, wikitext in pages:
+        career, aliases, difficulty = parse_page(name, wikitext)
+        entries = [tuple(getattr(e, f) for f in CareerEntry.__slots__) for e in career]
+        results.append((entries, aliases, difficulty))
+    return results, dict(INGEST_RULE_HITS)
 
-        wikitext = fetch_wikipedia_wikitext(info["wikipedia_title"])
-        if not wikitext:
-            continue
 
-        career = parse_career_from_wikitext(wikitext)
+def _entry_from_tuple(values: tuple) -> CareerEntry:
+    entry = CareerEntry(*values)
+    # Interning does not survive pickling
+    entry.club, entry.country_code = sys.intern(entry.club), sys.intern(entry.country_code)
+    entry.club_link, entry.club_qid = sys.intern(entry.club_link), sys.intern(entry.club_qid)
+    return entry
+
+
+def iter_parsed_pages(pages: Iterable[tuple], workers: int = PARSE_WORKERS) -> Iterator[tuple]:
+    """
+    Parse fetched (info, wikitext, revid) pages. Yields (info, revid, career, aliases, difficulty).
+
+    With workers > 0, pages are buffered workers * PARSE_CHUNK_SIZE at a time and
+    parsed in a process pool, one chunk per task; results keep the input order.
+    Workers are spawned rather than forked: this runs in the fetch thread, and
+    forking a multithreaded process can deadlock the child on inherited locks.
+    """
+    if workers <= 0:
+        for info, wikitext, revid in pages:
+            yield info, revid, *parse_page(info["name"], wikitext)
+        return
+
+    def parse_buffer(pool, buffer):
+        chunks = [buffer[i:i + PARSE_CHUNK_SIZE] for i in range(0, len(buffer), PARSE_CHUNK_SIZE)]
+        tasks = [[(info["name"], wikitext) for info, wikitext, _ in chunk] for chunk in chunks]
+        for chunk, (results, hits) in zip(chunks, pool.map(_parse_pages_chunk, tasks)):
+            INGEST_RULE_HITS.update(hits)
+            for (info, _, revid), (entries, aliases, difficulty) in zip(chunk, results):
+                yield info, revid, [_entry_from_tuple(t) for t in entries], aliases, difficulty
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        buffer = []
+        for page in pages:
+            buffer.append(page)
+            if len(buffer) >= workers * PARSE_CHUNK_SIZE:
+                yield from parse_buffer(pool, buffer)
+                buffer = []
+        if buffer:
+            yield from parse_buffer(pool, buffer)
+
+
+def iter_enriched_players(raw_players: Iterable[dict],
+                          journal: Optional[CheckpointJournal] = None) -> Iterator[Player]:
+    """
+    Fetch and parse Wikipedia careers for raw Wikidata results, one player at a time.
+
+    With a journal, QIDs already in the database or already handled by a previous
+    run are skipped, and players parsed before a crash are replayed from the journal.
+    Parsing runs in a process pool when PARSE_WORKERS is set.
+    """
+    existing = set()
+    if journal:
+        existing = fetch_existing_wikidata_ids() if SUPABASE_KEY else set()
+        pending = [p for qid, p in journal.parsed.items() if qid not in existing]
+        log.info(f"Resuming: {len(journal.states)} QIDs in journal, "
+                 f"{len(pending)} parsed players pending upload")
+        yield from pending
+
+    enriched = 0
+
+    def fetch_pages():
+        for i, info in enumerate(raw_players):
+            qid = info["qid"]
+            if i % 100 == 0:
+                log.info(f"Progress: {i} players read, {enriched} enriched")
+            if qid in existing or (journal and journal.is_done(qid)):
+                continue
+
+            wikitext, revid = fetch_wikipedia_revision(info["wikipedia_title"])
+            if not wikitext:
+                continue
+            if journal:
+                journal.record(qid, "fetched")
+            yield info, wikitext, revid
+            time.sleep(0.5)
+
+    for info, revid, career, aliases, difficulty in iter_parsed_pages(fetch_pages()):
+        qid = info["qid"]
         if len(career) < 2 or len(career) > 15:
+            if journal:
+                journal.record(qid, "rejected", reason=f"{len(career)} clubs")
             continue
 
-        career = compute_reveal_order(career)
-        enriched.append(Player(
-            name=info["name"], aliases=generate_aliases(info["name"]),
+        player = Player(
+            name=info["name"], aliases=aliases,
             wikipedia_title=info["wikipedia_title"], wikidata_id=qid,
-            difficulty=compute_difficulty(career), career=career,
-        ))
-        time.sleep(0.5)
+            difficulty=difficulty, career=career, revid=revid,
+        )
+        if journal:
+            journal.record(qid, "parsed", player=asdict(player))
+        enriched += 1
+        yield player
+
+    log.info(f"Enriched {enriched} players")
+    log_ingest_rule_hits()
+
+
+def prepare_batch(players: list[Player]):
+    """Batched lookups before writing: club countries, then reveal order (needs the clubs), then nicknames."""
+    resolve_club_countries([e for p in players for e in p.career])
+    for player in players:
+        player.career = compute_reveal_order(player.career)
+    enrich_aliases(players)
+
+
+def run_streaming(raw_players: Iterable[dict], journal: Optional[CheckpointJournal] = None,
+                  upload: bool = True, json_filename: str = "players_data.json"):
+    """
+    Run fetch/parse in a producer thread and upload from the main thread.
+
+    The two stages share a bounded queue: when the writer falls behind, the
+    fetcher blocks instead of piling players up in memory; when the writer
+    fails, the fetcher stops at its next player. Players become available in
+    the game one batch at a time rather than at the end of the run.
+    """
+    if upload and not SUPABASE_KEY:
+        log.warning("No Supabase key. Saving to JSON.")
+        upload = False
+
+    players: queue.Queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    failure = []
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        """Queue an item, giving up once the writer has stopped. False if it has."""
+        while not stopped.is_set():
+            try:
+                players.put(item, timeout=1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for player in iter_enriched_players(raw_players, journal):
+                if not put(player):
+                    return
+        except Exception as e:
+            failure.append(e)
+        finally:
+            put(None)
+
+    producer = threading.Thread(target=produce, name="fetch-parse", daemon=True)
+    producer.start()
+
+    batch, kept, uploaded = [], [], 0
+    try:
+        while (player := players.get()) is not None:
+            if not upload:
+                kept.append(player)
+                continue
+            batch.append(player)
+            if len(batch) >= UPLOAD_BATCH_SIZE:
+                prepare_batch(batch)
+                uploaded += upload_batch(batch, journal)
+                log.info(f"Uploaded: {uploaded}")
+                batch = []
+        if batch:
+            prepare_batch(batch)
+            uploaded += upload_batch(batch, journal)
+    finally:
+        # If the writer failed, unblock the producer; wait for it so it stops
+        # writing to the journal before the caller closes it
+        stopped.set()
+        producer.join()
+
+    if upload:
+        log.info(f"Done! Uploaded {uploaded} players")
+        if uploaded:
+            rebuild_player_pools()
+            export_answer_index()
+    else:
+        prepare_batch(kept)
+        save_to_json(kept, json_filename)
+    if failure:
+        raise failure[0]
+
 
-    log.info(f"Enriched {len(enriched)} players")
-    upload_to_supabase(enriched) if upload else save_to_json(enriched, "players_nationality.json")
+def run_nationality_pipeline(country_codes: list[str], limit_per_country: int = 400,
+                             min_birth_year: int = 1985, upload: bool = True):
+    """Pipeline to fetch players by nationality."""
+    log.info("=== Starting Nationality-Based Pipeline ===")
+    log.info(f"Countries: {country_codes}")
+    log.info(f"Min birth year: {min_birth_year}, Limit per country: {limit_per_country}")
+
+    raw_players = iter_players_by_nationalities(country_codes, limit_per_country, min_birth_year)
+
+    journal = CheckpointJournal(f"nationality-{'-'.join(country_codes)}-{min_birth_year}") if upload else None
+    try:
+        run_streaming(raw_players, journal, upload, "players_nationality.json")
+    finally:
+        if journal:
+            journal.close()
 
 
 def run_pipeline(limit_per_league: int = 500, upload: bool = True, national_team_only: bool = True):
     log.info("=== Starting Pipeline ===")
     log.info(f"National team filter: {national_team_only} (only players with international caps)")
-    raw_players = fetch_all_league_players(limit_per_league, national_team_only)
+    raw_players = iter_all_league_players(limit_per_league, national_team_only)
+
+    journal = CheckpointJournal(f"leagues-{'nt' if national_team_only else 'all'}") if upload else None
+    try:
+        run_streaming(raw_players, journal, upload)
+    finally:
+        if journal:
+            journal.close()
+
+
+def fetch_known_pages() -> list[dict]:
+    """Return id, wikipedia_title and stored revid for every player with a Wikipedia page."""
+    headers = {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+    }
+    players = []
+    offset, limit = 0, 1000
+    while True:
+        resp = requests.get(
+            f"{SUPABASE_URL}/rest/v1/players?select=id,name,wikipedia_title,wikipedia_revid"
+            f"&wikipedia_title=not.is.null&order=id&offset={offset}&limit={limit}",
+            headers=headers,
+        )
+        if resp.status_code != 200:
+            log.error(f"Failed to fetch players: {resp.status_code} {resp.text}")
+            break
+        batch = resp.json()
+        players.extend(batch)
+        if len(batch) < limit:
+            break
+        offset += limit
+    return players
+
+
+def run_refresh_pipeline():
+    """
+    Re-parse only players whose Wikipedia page changed since it was scraped.
+
+    Current revids of all known pages are fetched 50 at a time and compared to
+    players.wikipedia_revid; only changed pages are re-fetched, and their career
+    entries are replaced in one transaction via replace_career_entries().
+    Players scraped before revids were stored have none and are refreshed once.
+    """
+    log.info("=== Starting Refresh Pipeline ===")
+    if not SUPABASE_KEY:
+        return log.error("SUPABASE_SERVICE_KEY not set in environment")
 
-    enriched = []
-    for i, (qid, info) in enumerate(raw_players.items()):
-        if i % 100 == 0:
-            log.info(f"Progress: {i}/{len(raw_players)}")
+    known = fetch_known_pages()
+    current = fetch_current_revids([p["wikipedia_title"] for p in known])
+    changed = [p for p in known
+               if p["wikipedia_title"] in current and current[p["wikipedia_title"]] != p.get("wikipedia_revid")]
+    log.info(f"{len(changed)}/{len(known)} pages changed since last scrape")
 
-        wikitext = fetch_wikipedia_wikitext(info["wikipedia_title"])
+    refreshed = []
+    for i, player in enumerate(changed):
+        if i % 50 == 0:
+            log.info(f"Progress: {i}/{len(changed)} (refreshed: {len(refreshed)})")
+
+        wikitext, revid = fetch_wikipedia_revision(player["wikipedia_title"])
         if not wikitext:
             continue
-
-        career = parse_career_from_wikitext(wikitext)
+        career = validate_career(parse_career_from_wikitext(wikitext))
         if len(career) < 2 or len(career) > 15:
+            log.warning(f"  Skipped {player['name']}: {len(career)} clubs after re-parse")
             continue
 
+        resolve_club_countries(career)
         career = compute_reveal_order(career)
-        enriched.append(Player(
-            name=info["name"], aliases=generate_aliases(info["name"]),
-            wikipedia_title=info["wikipedia_title"], wikidata_id=qid,
-            difficulty=compute_difficulty(career), career=career,
-        ))
+        club_ids = upsert_clubs(career)
+        if not supabase_rpc("replace_career_entries", {
+            "p_player_id": player["id"], "p_entries": [career_row(e, club_ids) for e in career],
+        }):
+            continue
+        # Difficulty stays as difficulty.py calibrated it
+        if supabase_update("players", f"id=eq.{player['id']}", {"wikipedia_revid": revid}):
+            refreshed.append(player["id"])
         time.sleep(0.5)
 
-    log.info(f"Enriched {len(enriched)} players")
-    upload_to_supabase(enriched) if upload else save_to_json(enriched)
+    refresh_quiz_payloads(refreshed)
+    if refreshed:
+        rebuild_player_pools()
+    log.info(f"Done! Refreshed {len(refreshed)} players")
+    log_ingest_rule_hits()
+
+
+def run_alias_enrichment():
+    """
+    Add Wikidata nicknames to the aliases of every player already uploaded.
+
+    Nicknames come from the local cache or a few batched SPARQL queries; only
+    players whose aliases change are rewritten, ALIAS_UPDATE_BATCH_SIZE per upsert.
+    """
+    log.info("=== Starting Alias Enrichment ===")
+    if not SUPABASE_KEY:
+        return log.error("SUPABASE_SERVICE_KEY not set in environment")
+
+    headers = {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+    }
+    rows = []
+    offset, limit = 0, 1000
+    while True:
+        resp = requests.get(
+            f"{SUPABASE_URL}/rest/v1/players?select=id,name,aliases,wikidata_id"
+            f"&wikidata_id=not.is.null&order=id&offset={offset}&limit={limit}",
+            headers=headers,
+        )
+        if resp.status_code != 200:
+            return log.error(f"Failed to fetch players: {resp.status_code} {resp.text}")
+        batch = resp.json()
+        rows.extend(batch)
+        if len(batch) < limit:
+            break
+        offset += limit
+
+    players = [Player(name=r["name"], aliases=r.get("aliases") or [], wikidata_id=r["wikidata_id"]) for r in rows]
+    enrich_aliases(players)
+    changed = [p for row, p in zip(rows, players) if p.aliases != (row.get("aliases") or [])]
+    log.info(f"{len(changed)}/{len(rows)} players get new aliases")
+
+    updated = []
+    for i in range(0, len(changed), ALIAS_UPDATE_BATCH_SIZE):
+        written = supabase_upsert("players", [
+            {"wikidata_id": p.wikidata_id, "name": p.name, "aliases": p.aliases}
+            for p in changed[i:i + ALIAS_UPDATE_BATCH_SIZE]
+        ], on_conflict="wikidata_id")
+        updated.extend(row["id"] for row in written)
+
+    refresh_quiz_payloads(updated)
+    if updated:
+        export_answer_index()
+    log.info(f"Done! Updated aliases of {len(updated)} players")
+    log_ingest_rule_hits()
 
 
 def test_single_player(title: str = "Zinédine_Zidane"):
@@ -535,14 +1253,15 @@ def test_single_player(title: str = "Zinédine_Zidane"):
     if not wikitext:
         return log.error("Failed to fetch")
 
-    career = compute_reveal_order(parse_career_from_wikitext(wikitext))
+    career = validate_career(parse_career_from_wikitext(wikitext))
+    resolve_club_countries(career)
+    career = compute_reveal_order(career)
     print(f"\n{title.replace('_', ' ')} - {len(career)} clubs")
     for e in career:
         print(f"  {e.sort_order}. {e.country_flag} {e.club:<25} {e.years:<12} {e.matches}({e.goals})")
 
 
 if __name__ == "__main__":
-    import sys
     if len(sys.argv) > 1 and sys.argv[1] == "test":
         test_single_player(sys.argv[2] if len(sys.argv) > 2 else "Zinédine_Zidane")
     elif len(sys.argv) > 1 and sys.argv[1] == "dry":
@@ -577,6 +1296,11 @@ if __name__ == "__main__":
             min_birth_year=1960,
             upload=True
         )
+    elif len(sys.argv) > 1 and sys.argv[1] == "refresh":
+        # Transfer-window refresh: only pages edited since the last scrape
+        run_refresh_pipeline()
+    elif len(sys.argv) > 1 and sys.argv[1] == "aliases":
+        run_alias_enrichment()
     else:
         # Default: only players with national team caps
         run_pipeline(upload=True, national_team_only=True)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Wikitext and name normalization shared by the pipeline scripts.
+
+Every pattern is compiled once here. The infobox parser reads all
+yearsN/clubsN/capsN/goalsN fields in one scan with a fixed pattern instead of
+one search per field name, and club labels are cleaned in a single pass.
+"""
+
+import re
+import unicodedata
+from typing import Optional
+
+# "| clubs3 = value" up to the next "\n|" or "\n}}". The value is captured in a
+# lookahead so that a field written inline ("| years2 = 1992 | caps2 = 13")
+# does not hide the next one, exactly like one search per field did.
+INFOBOX_FIELD_RE = re.compile(
+    r'\|\s*(?P<field>years|clubs|caps|goals)(?P<index>\d+)\s*=\s*(?=(?P<value>.*?)(?:\n\s*\||\n\s*\}\}))',
+    re.DOTALL,
+)
+
+LINK_TARGET_RE = re.compile(r'\[\[([^\]|#]+)')
+
+# Club labels: arrows, links (keep the label), tags, templates, bold/italic, "(loan)"
+CLUB_NOISE_RE = re.compile(r"<[^>]+>|\{\{[^}]*\}\}|'''?|\(loan\)", re.IGNORECASE)
+CLUB_MARKUP_RE = re.compile(
+    r"→\s*|\[\[(?:[^\]|]*\|)?(?P<label>[^\]]*)\]\]|<[^>]+>|\{\{[^}]*\}\}|'''?|\(loan\)",
+    re.IGNORECASE,
+)
+
+YEARS_MARKUP_RE = re.compile(r'\[\[([^\]]*)\]\]|\{\{[^}]*\}\}')
+NUMBER_RE = re.compile(r'\d+')
+YEAR_RE = re.compile(r'\b(19\d{2}|20\d{2})\b')
+NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+
+
+def infobox_fields(wikitext: str) -> dict[tuple[str, int], str]:
+    """{(field, index): stripped value} of the career fields, first occurrence wins."""
+    fields = {}
+    for match in INFOBOX_FIELD_RE.finditer(wikitext):
+        fields.setdefault((match["field"], int(match["index"])), match["value"].strip())
+    return fields
+
+
+def link_target(raw: str) -> str:
+    """Target of the first wiki link in a value ("" if unlinked)."""
+    match = LINK_TARGET_RE.search(raw)
+    return match.group(1).strip() if match else ""
+
+
+def _club_markup(match: re.Match) -> str:
+    label = match["label"]
+    # A link label can itself hold bold or "(loan)"
+    return CLUB_NOISE_RE.sub("", label) if label is not None else ""
+
+
+def clean_club_label(raw: str) -> str:
+    """Displayed club name of a clubsN value."""
+    return CLUB_MARKUP_RE.sub(_club_markup, raw).strip()
+
+
+def clean_years_text(raw: str) -> str:
+    """yearsN value without links or templates, em dashes as en dashes."""
+    return YEARS_MARKUP_RE.sub(r'\1', raw).replace('—', '–').strip()
+
+
+def first_number(raw: str) -> Optional[int]:
+    """First run of digits in a value, or None."""
+    match = NUMBER_RE.search(raw)
+    return int(match.group()) if match else None
+
+
+def year_numbers(raw: str) -> list[int]:
+    """Every 19xx/20xx year in a string."""
+    return [int(y) for y in YEAR_RE.findall(raw)]
+
+
+def fold_accents(text: str) -> str:
+    """ASCII form of a string with accents dropped ("Zinédine" -> "Zinedine")."""
+    return unicodedata.normalize('NFD', text).encode('ascii', 'ignore').decode('ascii')
+
+
+def normalize_key(text: str) -> str:
+    """Lowercase, accent-folded, punctuation-free form used for fuzzy matching."""
+    folded = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return NON_ALNUM_RE.sub(' ', folded.lower()).strip()
@@ -14,6 +14,8 @@ import logging
 import requests
 from dotenv import load_dotenv
 
+from quiz_payloads import refresh_quiz_payloads
+
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
@@ -350,6 +352,7 @@ def run_update(dry_run=False, limit=None):
     updated = 0
     skipped = 0
     failed = 0
+    touched_players = []
 
     for i, player in enumerate(players):
         if i % 50 == 0:
@@ -369,6 +372,7 @@ def run_update(dry_run=False, limit=None):
             else:
                 if update_player_nationality(player["id"], nationality, code, flag):
                     updated += 1
+                    touched_players.append(player["id"])
                     log.info(f"  Updated: {player['name']} -> {flag} {nationality}")
                 else:
                     failed += 1
@@ -380,6 +384,8 @@ def run_update(dry_run=False, limit=None):
         # Rate limiting
         time.sleep(0.3)
 
+    refresh_quiz_payloads(touched_players)
+
     # Show final stats
     total, with_nationality = get_nationality_stats()
     coverage = (with_nationality / total * 100) if total > 0 else 0
@@ -28,6 +28,7 @@ import {
   updateInfiniteStats,
 } from "./lib/supabase";
 import { getClubFlag } from "./lib/clubCountries";
+import { loadAnswerIndex, isIndexedAnswer, normalizeAnswer } from "./lib/answerIndex";
 
 const REVEAL_INTERVAL = 2000; // Faster reveal (was 3200)
 const AVATARS = ["⚽", "🥅", "🏟️", "🧤", "👟", "🎯", "🏆", "⭐", "🦁", "🐉", "🦅", "🐺"];
@@ -79,9 +80,8 @@ const YEAR_OPTIONS = [
   { label: "Classics (pre-1990)", min: null, max: 1989 },
 ];
 
-function normalize(str) {
-  return str.toLowerCase().normalize("NFD").replace(/[\u0300-\u036f]/g, "").replace(/[^a-z0-9\s]/g, "").trim();
-}
+// Same normalization as the answer index (pipeline/alias_engine.py)
+const normalize = normalizeAnswer;
 
 function formatTime(ms) {
   const s = Math.floor(ms / 1000);
@@ -182,6 +182,7 @@ export default function CareerQuizApp() {
 
     // Load saved parties from localStorage
     loadSavedParties();
+    loadAnswerIndex();
   }, []);
 
   const loadSavedParties = async () => {
@@ -410,7 +411,7 @@ export default function CareerQuizApp() {
   const checkGuess = async () => {
     if (!guess.trim() || !currentPlayer) return;
     const allAliases = [currentPlayer.name, ...(currentPlayer.aliases || [])];
-    const match = fuzzyMatch(guess, allAliases);
+    const match = isIndexedAnswer(guess, currentPlayer.id) || fuzzyMatch(guess, allAliases);
     if (match) {
       clearInterval(timerRef.current);
       clearInterval(revealRef.current);
@@ -584,7 +585,7 @@ export default function CareerQuizApp() {
     if (!player) return;
 
     const allAliases = [player.name, ...(player.aliases || [])];
-    const match = fuzzyMatch(guess, allAliases);
+    const match = isIndexedAnswer(guess, player.id) || fuzzyMatch(guess, allAliases);
 
     if (match) {
       clearInterval(timerRef.current);
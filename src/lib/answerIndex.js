@@ -0,0 +1,46 @@
+/**
+ * Answer index — prebuilt alias lookup exported by pipeline/answer_index.py
+ *
+ * Guesses are normalized exactly like pipeline/alias_engine.py normalize_alias,
+ * so an exact answer is one map lookup. Until the index has loaded (or when it
+ * is missing) every lookup returns false and the app falls back to fuzzy matching.
+ */
+
+const INDEX_URL = "/answer_index.json";
+
+let index = null;
+let loading = null;
+
+/** Strip accents and other non-ASCII, lowercase, drop apostrophes/dots, collapse the rest to spaces */
+export function normalizeAnswer(str) {
+  return str
+    .normalize("NFD")
+    .replace(/[’`]/g, "'")
+    .replace(/[^\x00-\x7f]/g, "")
+    .toLowerCase()
+    .replace(/['.]/g, "")
+    .replace(/[^a-z0-9]+/g, " ")
+    .trim();
+}
+
+/** Fetch the index once; safe to call repeatedly */
+export function loadAnswerIndex() {
+  if (!loading) {
+    loading = fetch(INDEX_URL)
+      .then((res) => (res.ok ? res.json() : null))
+      .then((data) => {
+        if (data?.version === 1) index = data;
+        return index;
+      })
+      .catch(() => null);
+  }
+  return loading;
+}
+
+/** True if the guess is one of the player's indexed aliases */
+export function isIndexedAnswer(guess, playerId) {
+  if (!index || !playerId) return false;
+  const positions = index.aliases[normalizeAnswer(guess)];
+  return !!positions && positions.some((i) => index.players[i][0] === playerId);
+}
+
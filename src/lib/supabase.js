@@ -121,59 +121,37 @@ export async function getPartyMembers(partyId) {
 // Daily Rounds
 // ============================================================
 
-/** Get today's rounds for a party (generates them if needed) */
+/** Get today's rounds for a party (pre-generated by pipeline/schedule_rounds.py) */
 export async function getTodayRounds(partyId) {
   const today = new Date().toISOString().split("T")[0];
 
-  // Try to generate rounds (ignore errors - 409 means rounds already exist)
-  const { error: rpcError } = await supabase.rpc("generate_daily_rounds", {
-    p_party_id: partyId,
-    p_date: today,
-  });
+  let rounds = await fetchPartyRounds(partyId, today);
 
-  // Log but don't throw - 409 conflict just means rounds exist already
-  if (rpcError) {
-    console.log("generate_daily_rounds:", rpcError.message || "rounds may already exist");
+  // Parties created since the last scheduler run have no rounds yet
+  if (rounds.length === 0) {
+    const { error: rpcError } = await supabase.rpc("generate_daily_rounds", {
+      p_party_id: partyId,
+      p_date: today,
+    });
+    if (rpcError) {
+      console.log("generate_daily_rounds:", rpcError.message || "rounds may already exist");
+    }
+    rounds = await fetchPartyRounds(partyId, today);
   }
 
-  // Fetch rounds with player data and career entries
-  const { data: rounds, error } = await supabase
+  return attachQuizPlayers(rounds);
+}
+
+async function fetchPartyRounds(partyId, date) {
+  const { data, error } = await supabase
     .from("daily_rounds")
-    .select(`
-      id,
-      round_number,
-      round_date,
-      player:players (
-        id,
-        name,
-        aliases,
-        difficulty,
-        career_entries (
-          sort_order,
-          chronological_order,
-          years,
-          club,
-          country_code,
-          country_flag,
-          matches,
-          goals
-        )
-      )
-    `)
+    .select("id, round_number, round_date, player_id")
     .eq("party_id", partyId)
-    .eq("round_date", today)
+    .eq("round_date", date)
     .order("round_number");
 
   if (error) throw error;
-
-  // Sort career entries by chronological_order (actual career timeline)
-  return rounds.map((r) => ({
-    ...r,
-    player: {
-      ...r.player,
-      career: r.player.career_entries.sort((a, b) => a.chronological_order - b.chronological_order),
-    },
-  }));
+  return data;
 }
 
 /** Check which rounds a member has already completed today */
@@ -225,10 +203,10 @@ export async function submitScore(dailyRoundId, memberId, points, timeMs, clubsR
 // Leaderboard
 // ============================================================
 
-/** Get all-time leaderboard for a party */
+/** Get all-time leaderboard for a party (totals kept current by a trigger on scores) */
 export async function getLeaderboard(partyId) {
   const { data, error } = await supabase
-    .from("v_leaderboard")
+    .from("v_leaderboard_rollup")
     .select("*")
     .eq("party_id", partyId)
     .order("total_points", { ascending: false });
@@ -242,7 +220,7 @@ export async function getDailyLeaderboard(partyId, date) {
   const targetDate = date || new Date().toISOString().split("T")[0];
 
   const { data, error } = await supabase
-    .from("v_daily_leaderboard")
+    .from("v_daily_leaderboard_rollup")
     .select("*")
     .eq("party_id", partyId)
     .eq("round_date", targetDate)
@@ -338,6 +316,36 @@ export function shareScore(totalPoints, correct, total, inviteCode) {
   shareViaWhatsApp(text);
 }
 
+// ============================================================
+// Quiz payloads (precomputed by the data pipeline)
+// ============================================================
+
+/** Fetch ready-to-play players (career already ordered) keyed by player id */
+async function getQuizPlayers(playerIds) {
+  if (playerIds.length === 0) return {};
+
+  const { data, error } = await supabase
+    .from("player_quiz_payloads")
+    .select("player_id, name, aliases, difficulty, career, nationality_code, nationality_flag")
+    .in("player_id", playerIds);
+
+  if (error) throw error;
+
+  const players = {};
+  for (const { player_id, ...payload } of data) {
+    players[player_id] = { id: player_id, ...payload };
+  }
+  return players;
+}
+
+/** Replace each round's player_id with its quiz player */
+async function attachQuizPlayers(rounds) {
+  const players = await getQuizPlayers(rounds.map((r) => r.player_id));
+  return rounds
+    .filter((r) => players[r.player_id])
+    .map(({ player_id, ...r }) => ({ ...r, player: players[player_id] }));
+}
+
 // ============================================================
 // Utility
 // ============================================================
@@ -402,108 +410,39 @@ export function removeSession(partyId) {
 // Solo Mode
 // ============================================================
 
-/** Get today's solo daily challenge rounds */
+/** Get today's solo daily challenge rounds (pre-generated by pipeline/schedule_rounds.py) */
 export async function getSoloDailyRounds() {
   const today = new Date().toISOString().split("T")[0];
 
-  // Generate if needed (ignore errors)
-  await supabase.rpc("generate_solo_daily_rounds", { p_date: today });
-
-  // Fetch rounds with player data
+  // Fetch rounds, then their precomputed player payloads
   const { data: rounds, error } = await supabase
     .from("solo_daily_rounds")
-    .select(`
-      id,
-      round_number,
-      round_date,
-      player:players (
-        id,
-        name,
-        aliases,
-        difficulty,
-        career_entries (
-          sort_order,
-          chronological_order,
-          years,
-          club,
-          country_code,
-          country_flag,
-          matches,
-          goals
-        )
-      )
-    `)
+    .select("id, round_number, round_date, player_id")
     .eq("round_date", today)
     .order("round_number");
 
   if (error) throw error;
-
-  return rounds.map((r) => ({
-    ...r,
-    player: {
-      ...r.player,
-      career: r.player.career_entries.sort((a, b) => a.chronological_order - b.chronological_order),
-    },
-  }));
+  return attachQuizPlayers(rounds);
 }
 
 /** Get random players for infinite mode */
 export async function getRandomPlayers(count = 1, excludeIds = [], filters = {}) {
-  // Build query with filters
-  let query = supabase
-    .from("players")
-    .select("*")
-    .gte("career_club_count", 3)
-    .gte("career_start_year", 1980); // Always enforce 1980 minimum
-
-  // Apply additional filters
-  if (filters.startYearMin && filters.startYearMin > 1980) {
-    query = query.gte("career_start_year", filters.startYearMin);
-  }
-  if (filters.startYearMax) {
-    query = query.lte("career_start_year", filters.startYearMax);
-  }
-  if (filters.leagues && filters.leagues.length > 0) {
-    query = query.overlaps("leagues_played", filters.leagues);
-  }
-  if (filters.nationalities && filters.nationalities.length > 0) {
-    query = query.in("nationality_code", filters.nationalities);
-  }
-  // Get random players using limit and order
-  const { data, error } = await query
-    .order("id", { ascending: false })
-    .limit(200); // Get a larger pool for better randomness
+  // Indexed draw from the pre-shuffled pools (1980 minimum is built into the pools)
+  const { data, error } = await supabase.rpc("draw_pool_players", {
+    p_count: count,
+    p_exclude_ids: excludeIds,
+    p_start_year_min: filters.startYearMin > 1980 ? filters.startYearMin : null,
+    p_start_year_max: filters.startYearMax || null,
+    p_leagues: filters.leagues?.length > 0 ? filters.leagues : null,
+    p_nationalities: filters.nationalities?.length > 0 ? filters.nationalities : null,
+  });
 
   if (error) throw error;
   if (!data || data.length === 0) return [];
 
-  // Filter out already played players (more reliable than SQL filter)
-  const excludeSet = new Set(excludeIds);
-  const available = data.filter(p => !excludeSet.has(p.id));
-
-  if (available.length === 0) return [];
-
-  // Shuffle and take requested count
-  const shuffled = available.sort(() => Math.random() - 0.5);
-  const selected = shuffled.slice(0, count);
-
-  // Fetch career entries for each player
-  const playerIds = selected.map((p) => p.id);
-  const { data: careers, error: careerErr } = await supabase
-    .from("career_entries")
-    .select("*")
-    .in("player_id", playerIds)
-    .order("chronological_order");
-
-  if (careerErr) throw careerErr;
-
-  // Map careers to players
-  return selected.map((p) => ({
-    ...p,
-    career: careers
-      .filter((c) => c.player_id === p.id)
-      .sort((a, b) => a.chronological_order - b.chronological_order),
-  }));
+  const selected = data.map((row) => row.player_id);
+  const players = await getQuizPlayers(selected);
+  return selected.map((id) => players[id]).filter(Boolean);
 }
 
 /** Check if user has completed today's solo challenge */
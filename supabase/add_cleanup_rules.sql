@@ -0,0 +1,82 @@
+-- ============================================================
+-- Cleanup Rules: set-based versions of the cleanup_engine rules
+-- Run by `python cleanup_engine.py sql` (one call per rule).
+--
+-- Rules that only need string functions run here as a single
+-- UPDATE ... FROM instead of batched PATCHes from Python. Rules that
+-- need the Python lookup tables (missing_country, missing_nationality_code)
+-- stay in cleanup_engine.py.
+-- ============================================================
+
+-- 1. Apply one rule, or with p_dry_run just count and sample its changes
+CREATE OR REPLACE FUNCTION public.run_cleanup_rule(
+  p_rule text,
+  p_dry_run boolean DEFAULT true
+)
+RETURNS jsonb AS $$
+DECLARE
+  v_count int;
+  v_players uuid[];
+  v_samples jsonb;
+BEGIN
+  CREATE TEMP TABLE cleanup_changes (
+    id uuid,
+    player_id uuid,
+    old_value text,
+    new_value text
+  ) ON COMMIT DROP;
+
+  -- Same transforms as clean_club_name, clean_years and strip_number_prefix
+  IF p_rule = 'club_pipe_tail' THEN
+    INSERT INTO cleanup_changes
+    SELECT id, player_id, club, btrim(split_part(club, '|', 1), E' \t\r\n')
+    FROM public.career_entries WHERE club LIKE '%|%';
+  ELSIF p_rule = 'years_pipe_tail' THEN
+    INSERT INTO cleanup_changes
+    SELECT id, player_id, years, btrim(split_part(years, '|', 1), E' \t\r\n')
+    FROM public.career_entries WHERE years LIKE '%|%';
+  ELSIF p_rule = 'club_number_prefix' THEN
+    INSERT INTO cleanup_changes
+    SELECT id, player_id, club, substr(club, 4)
+    FROM public.career_entries WHERE club LIKE '1. %';
+  ELSIF p_rule = 'niger_to_nigeria' THEN
+    INSERT INTO cleanup_changes
+    SELECT id, id, nationality_code, 'NG'
+    FROM public.players WHERE nationality_code = 'NE';
+  ELSE
+    RAISE EXCEPTION 'Unknown cleanup rule: %', p_rule;
+  END IF;
+
+  SELECT count(*), array_agg(DISTINCT player_id) INTO v_count, v_players FROM cleanup_changes;
+  SELECT COALESCE(jsonb_agg(jsonb_build_object('id', s.id, 'before', s.old_value, 'after', s.new_value)), '[]')
+  INTO v_samples
+  FROM (SELECT * FROM cleanup_changes LIMIT 10) s;
+
+  IF NOT p_dry_run AND v_count > 0 THEN
+    IF p_rule = 'club_pipe_tail' OR p_rule = 'club_number_prefix' THEN
+      UPDATE public.career_entries ce SET club = c.new_value
+      FROM cleanup_changes c WHERE ce.id = c.id;
+    ELSIF p_rule = 'years_pipe_tail' THEN
+      UPDATE public.career_entries ce SET years = c.new_value
+      FROM cleanup_changes c WHERE ce.id = c.id;
+    ELSIF p_rule = 'niger_to_nigeria' THEN
+      UPDATE public.players p
+      SET nationality = 'Nigeria', nationality_code = 'NG', nationality_flag = '🇳🇬'
+      FROM cleanup_changes c WHERE p.id = c.id;
+    END IF;
+
+    PERFORM public.refresh_quiz_payloads(v_players);
+  END IF;
+
+  DROP TABLE cleanup_changes;
+  RETURN jsonb_build_object('rule', p_rule, 'affected', v_count, 'dry_run', p_dry_run, 'samples', v_samples);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- 2. Pipeline only (service key): new functions are executable by PUBLIC by default
+REVOKE EXECUTE ON FUNCTION public.run_cleanup_rule(text, boolean) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.run_cleanup_rule(text, boolean) TO service_role;
+
+-- 3. Verify: dry run every rule
+SELECT public.run_cleanup_rule(r, true)
+FROM unnest(ARRAY['club_pipe_tail', 'years_pipe_tail', 'club_number_prefix', 'niger_to_nigeria']) r;
@@ -0,0 +1,89 @@
+-- ============================================================
+-- Club Fame: precomputed fame per club, used for the reveal order
+-- Maintained by pipeline/club_fame.py; scrape_players.py reads the same
+-- values (cached in pipeline/cache/club_fame.json) when ordering new careers.
+--
+-- Career entries are revealed from the least to the most famous club,
+-- ties broken by appearances (matches / 100) then chronological order.
+-- ============================================================
+
+-- 1. Fame components and score (0-10) per club
+CREATE TABLE IF NOT EXISTS public.club_fame (
+  club_id uuid PRIMARY KEY REFERENCES public.clubs(id) ON DELETE CASCADE,
+  players int NOT NULL DEFAULT 0,   -- distinct players in the database who played there
+  tier smallint,                    -- league tier of the club's country (1 = top five leagues)
+  pageviews int,                    -- English Wikipedia views over the last 12 months, if fetched
+  fame real NOT NULL DEFAULT 0,
+  updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+ALTER TABLE public.club_fame ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Club fame is viewable by everyone" ON public.club_fame FOR SELECT USING (true);
+
+-- 2. Distinct players per club
+CREATE OR REPLACE FUNCTION public.club_player_counts()
+RETURNS TABLE (club_id uuid, players int) AS $$
+  SELECT ce.club_id, COUNT(DISTINCT ce.player_id)::int
+  FROM public.career_entries ce
+  WHERE ce.club_id IS NOT NULL
+  GROUP BY ce.club_id;
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+-- 3. Rewrite sort_order of every career (or the given players) from club fame.
+--    Only players whose order changes are touched. Their entries are first
+--    negated so the new values never collide with old ones on
+--    unique(player_id, sort_order). Returns the number of players reordered.
+CREATE OR REPLACE FUNCTION public.recompute_sort_orders(
+  p_player_ids uuid[] DEFAULT NULL
+)
+RETURNS int AS $$
+DECLARE
+  v_players uuid[];
+BEGIN
+  CREATE TEMP TABLE _new_orders ON COMMIT DROP AS
+  SELECT
+    ce.id,
+    ce.player_id,
+    ce.sort_order,
+    row_number() OVER (
+      PARTITION BY ce.player_id
+      ORDER BY COALESCE(f.fame, 0) + COALESCE(ce.matches, 0) / 100.0, ce.chronological_order
+    )::smallint AS new_order
+  FROM public.career_entries ce
+  LEFT JOIN public.club_fame f ON f.club_id = ce.club_id
+  WHERE p_player_ids IS NULL OR ce.player_id = ANY(p_player_ids);
+
+  SELECT array_agg(DISTINCT player_id) INTO v_players
+  FROM _new_orders
+  WHERE sort_order IS DISTINCT FROM new_order;
+
+  IF v_players IS NULL THEN
+    RETURN 0;
+  END IF;
+
+  UPDATE public.career_entries
+  SET sort_order = -sort_order
+  WHERE player_id = ANY(v_players);
+
+  UPDATE public.career_entries ce
+  SET sort_order = n.new_order
+  FROM _new_orders n
+  WHERE ce.id = n.id AND n.player_id = ANY(v_players);
+
+  PERFORM public.refresh_quiz_payloads(v_players);
+  RETURN array_length(v_players, 1);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- 4. Pipeline only (service key): new functions are executable by PUBLIC by default
+REVOKE EXECUTE ON FUNCTION public.club_player_counts() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.recompute_sort_orders(uuid[]) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.club_player_counts() TO service_role;
+GRANT EXECUTE ON FUNCTION public.recompute_sort_orders(uuid[]) TO service_role;
+
+-- 5. Verify: most famous clubs
+SELECT c.name, f.players, f.tier, f.pageviews, f.fame
+FROM public.club_fame f
+JOIN public.clubs c ON c.id = f.club_id
+ORDER BY f.fame DESC
+LIMIT 20;
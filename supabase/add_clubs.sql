@@ -0,0 +1,258 @@
+-- ============================================================
+-- Clubs: one row per club, referenced by career_entries.club_id
+-- Maintained by pipeline/scrape_players.py (upsert_clubs before careers).
+--
+-- A club is keyed on its Wikidata QID, or 'name:<club>' when the infobox
+-- does not link it. Its country lives here once, so a country fix is a
+-- single-row update. career_entries keeps club (the infobox label) and its
+-- old country columns for now; quiz payloads prefer the club's country.
+-- ============================================================
+
+-- 1. Clubs table
+CREATE TABLE IF NOT EXISTS public.clubs (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  club_key text NOT NULL UNIQUE,        -- wikidata_id, or 'name:' || club
+  name text NOT NULL,                   -- canonical name (Wikipedia article or label)
+  aliases text[] NOT NULL DEFAULT '{}', -- infobox labels seen for this club
+  country_code text,
+  country_flag text,
+  wikidata_id text,
+  created_at timestamptz NOT NULL DEFAULT now()
+);
+
+ALTER TABLE public.clubs ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Clubs are viewable by everyone" ON public.clubs FOR SELECT USING (true);
+
+-- 2. Career entries point at their club
+ALTER TABLE public.career_entries
+ADD COLUMN IF NOT EXISTS club_id uuid REFERENCES public.clubs(id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS idx_career_club ON public.career_entries(club_id);
+
+-- 3. Backfill: one club per distinct club name, keeping a known country
+INSERT INTO public.clubs (club_key, name, aliases, country_code, country_flag)
+SELECT DISTINCT ON (club)
+  'name:' || club, club, ARRAY[club], NULLIF(country_code, ''), NULLIF(country_flag, '')
+FROM public.career_entries
+ORDER BY club, COALESCE(country_code, '') = ''
+ON CONFLICT (club_key) DO NOTHING;
+
+UPDATE public.career_entries ce
+SET club_id = c.id
+FROM public.clubs c
+WHERE c.club_key = 'name:' || ce.club AND ce.club_id IS NULL;
+
+-- 4. Upsert clubs in bulk, merging aliases; returns the id of every club passed.
+--    A stored country is kept (only set_club_country overwrites it), so a
+--    fixed country survives later scrapes.
+--    p_clubs: [{club_key, name, aliases, country_code, country_flag, wikidata_id}, ...]
+CREATE OR REPLACE FUNCTION public.upsert_clubs(
+  p_clubs jsonb
+)
+RETURNS TABLE (club_key text, id uuid) AS $$
+#variable_conflict use_column
+BEGIN
+  RETURN QUERY
+  INSERT INTO public.clubs AS c (club_key, name, aliases, country_code, country_flag, wikidata_id)
+  SELECT n.club_key, n.name, n.aliases, NULLIF(n.country_code, ''), NULLIF(n.country_flag, ''), n.wikidata_id
+  FROM jsonb_to_recordset(p_clubs) AS n(
+    club_key text,
+    name text,
+    aliases text[],
+    country_code text,
+    country_flag text,
+    wikidata_id text
+  )
+  ON CONFLICT ON CONSTRAINT clubs_club_key_key DO UPDATE SET
+    aliases = ARRAY(SELECT DISTINCT unnest(c.aliases || EXCLUDED.aliases)),
+    country_code = COALESCE(c.country_code, EXCLUDED.country_code),
+    country_flag = COALESCE(c.country_flag, EXCLUDED.country_flag)
+  RETURNING c.club_key, c.id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- 5. Fix a club's country: one row, then the quiz payloads of its players
+CREATE OR REPLACE FUNCTION public.set_club_country(
+  p_club_id uuid,
+  p_country_code text,
+  p_country_flag text
+)
+RETURNS int AS $$
+DECLARE
+  v_players uuid[];
+BEGIN
+  UPDATE public.clubs
+  SET country_code = p_country_code, country_flag = p_country_flag
+  WHERE id = p_club_id;
+
+  SELECT array_agg(DISTINCT player_id) INTO v_players
+  FROM public.career_entries WHERE club_id = p_club_id;
+
+  IF v_players IS NULL THEN
+    RETURN 0;
+  END IF;
+  RETURN public.refresh_quiz_payloads(v_players);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- 6. Career writers also store club_id
+CREATE OR REPLACE FUNCTION public.replace_career_entries(
+  p_player_id uuid,
+  p_entries jsonb
+)
+RETURNS void AS $$
+BEGIN
+  DELETE FROM public.career_entries WHERE player_id = p_player_id;
+
+  INSERT INTO public.career_entries (
+    player_id, sort_order, chronological_order, years, club, club_id,
+    country_code, country_flag, matches, goals
+  )
+  SELECT
+    p_player_id, e.sort_order, e.chronological_order, e.years, e.club, e.club_id,
+    e.country_code, e.country_flag, e.matches, e.goals
+  FROM jsonb_to_recordset(p_entries) AS e(
+    sort_order smallint,
+    chronological_order smallint,
+    years text,
+    club text,
+    club_id uuid,
+    country_code text,
+    country_flag text,
+    matches smallint,
+    goals smallint
+  );
+
+  UPDATE public.players
+  SET career_club_count = jsonb_array_length(p_entries)
+  WHERE id = p_player_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION public.replace_career_entries_bulk(
+  p_entries jsonb
+)
+RETURNS void AS $$
+BEGIN
+  CREATE TEMP TABLE _new_entries ON COMMIT DROP AS
+  SELECT *
+  FROM jsonb_to_recordset(p_entries) AS e(
+    player_id uuid,
+    sort_order smallint,
+    chronological_order smallint,
+    years text,
+    club text,
+    club_id uuid,
+    country_code text,
+    country_flag text,
+    matches smallint,
+    goals smallint
+  );
+
+  DELETE FROM public.career_entries ce
+  USING (SELECT DISTINCT player_id FROM _new_entries) n
+  WHERE ce.player_id = n.player_id;
+
+  INSERT INTO public.career_entries (
+    player_id, sort_order, chronological_order, years, club, club_id,
+    country_code, country_flag, matches, goals
+  )
+  SELECT
+    player_id, sort_order, chronological_order, years, club, club_id,
+    country_code, country_flag, matches, goals
+  FROM _new_entries;
+
+  -- Players only count as playable once their career is written
+  UPDATE public.players p
+  SET career_club_count = n.club_count
+  FROM (
+    SELECT player_id, COUNT(*)::smallint as club_count
+    FROM _new_entries
+    GROUP BY player_id
+  ) n
+  WHERE p.id = n.player_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- 7. Quiz payloads take the country from the club when it has one
+CREATE OR REPLACE FUNCTION public.refresh_quiz_payloads(
+  p_player_ids uuid[] DEFAULT NULL
+)
+RETURNS int AS $$
+DECLARE
+  v_count int;
+BEGIN
+  INSERT INTO public.player_quiz_payloads (
+    player_id, name, aliases, difficulty, career, is_active, career_club_count,
+    career_start_year, leagues_played, nationality_code, nationality_flag, updated_at
+  )
+  SELECT
+    p.id,
+    p.name,
+    p.aliases,
+    p.difficulty,
+    COALESCE(c.career, '[]'::jsonb),
+    p.is_active,
+    COALESCE(c.club_count, 0),
+    c.start_year,
+    COALESCE(c.leagues, '{}'),
+    p.nationality_code,
+    p.nationality_flag,
+    now()
+  FROM public.players p
+  LEFT JOIN LATERAL (
+    SELECT
+      jsonb_agg(jsonb_build_object(
+        'sort_order', ce.sort_order,
+        'chronological_order', ce.chronological_order,
+        'years', ce.years,
+        'club', ce.club,
+        'country_code', COALESCE(cl.country_code, ce.country_code),
+        'country_flag', COALESCE(cl.country_flag, ce.country_flag),
+        'matches', ce.matches,
+        'goals', ce.goals
+      ) ORDER BY ce.chronological_order) as career,
+      COUNT(*)::smallint as club_count,
+      -- Same parsing as add_filters.sql
+      MIN(CAST(NULLIF(regexp_replace(split_part(ce.years, '–', 1), '[^0-9]', '', 'g'), '') AS int))::smallint as start_year,
+      array_agg(DISTINCT COALESCE(cl.country_code, ce.country_code))
+        FILTER (WHERE COALESCE(cl.country_code, ce.country_code, '') != '') as leagues
+    FROM public.career_entries ce
+    LEFT JOIN public.clubs cl ON cl.id = ce.club_id
+    WHERE ce.player_id = p.id
+  ) c ON true
+  WHERE p_player_ids IS NULL OR p.id = ANY(p_player_ids)
+  ON CONFLICT (player_id) DO UPDATE SET
+    name = EXCLUDED.name,
+    aliases = EXCLUDED.aliases,
+    difficulty = EXCLUDED.difficulty,
+    career = EXCLUDED.career,
+    is_active = EXCLUDED.is_active,
+    career_club_count = EXCLUDED.career_club_count,
+    career_start_year = EXCLUDED.career_start_year,
+    leagues_played = EXCLUDED.leagues_played,
+    nationality_code = EXCLUDED.nationality_code,
+    nationality_flag = EXCLUDED.nationality_flag,
+    updated_at = EXCLUDED.updated_at;
+
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+  RETURN v_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- 8. Pipeline only (service key): new functions are executable by PUBLIC by default
+REVOKE EXECUTE ON FUNCTION public.upsert_clubs(jsonb) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.set_club_country(uuid, text, text) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.replace_career_entries(uuid, jsonb) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.replace_career_entries_bulk(jsonb) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.refresh_quiz_payloads(uuid[]) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.upsert_clubs(jsonb) TO service_role;
+GRANT EXECUTE ON FUNCTION public.set_club_country(uuid, text, text) TO service_role;
+GRANT EXECUTE ON FUNCTION public.replace_career_entries(uuid, jsonb) TO service_role;
+GRANT EXECUTE ON FUNCTION public.replace_career_entries_bulk(jsonb) TO service_role;
+GRANT EXECUTE ON FUNCTION public.refresh_quiz_payloads(uuid[]) TO service_role;
+
+-- 9. Verify: entries without a club (should be 0)
+SELECT COUNT(*) AS entries_without_club
+FROM public.career_entries
+WHERE club_id IS NULL;
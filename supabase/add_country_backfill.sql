@@ -0,0 +1,43 @@
+-- ============================================================
+-- Country Backfill: one set-based update from a club mapping
+-- Called by pipeline/fix_countries.py with every resolved club.
+-- ============================================================
+
+-- 1. Fill country_code/country_flag of entries missing them, joining on club
+CREATE OR REPLACE FUNCTION public.backfill_career_countries(
+  p_mapping jsonb  -- [{"club": ..., "country_code": ..., "country_flag": ...}]
+)
+RETURNS int AS $$
+DECLARE
+  v_count int;
+  v_players uuid[];
+BEGIN
+  WITH mapping AS (
+    SELECT DISTINCT ON (m.club) m.club, m.country_code, m.country_flag
+    FROM jsonb_to_recordset(p_mapping) AS m(club text, country_code text, country_flag text)
+  ),
+  updated AS (
+    UPDATE public.career_entries ce
+    SET country_code = mapping.country_code, country_flag = mapping.country_flag
+    FROM mapping
+    WHERE ce.club = mapping.club
+      AND COALESCE(ce.country_code, '') = ''
+    RETURNING ce.player_id
+  )
+  SELECT count(*), array_agg(DISTINCT player_id) INTO v_count, v_players FROM updated;
+
+  IF v_count > 0 THEN
+    PERFORM public.refresh_quiz_payloads(v_players);
+  END IF;
+  RETURN v_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- 2. Pipeline only (service key): new functions are executable by PUBLIC by default
+REVOKE EXECUTE ON FUNCTION public.backfill_career_countries(jsonb) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.backfill_career_countries(jsonb) TO service_role;
+
+-- 3. Verify: entries still missing a country
+SELECT COUNT(*) AS missing_country
+FROM public.career_entries
+WHERE COALESCE(country_code, '') = '';
@@ -0,0 +1,51 @@
+-- ============================================================
+-- Difficulty Calibration: observed answers in, difficulties out in bulk
+-- Called by pipeline/difficulty.py.
+-- ============================================================
+
+-- 1. Attempts and correct answers per player, over every party round played
+CREATE OR REPLACE FUNCTION public.player_answer_counts()
+RETURNS TABLE (player_id uuid, attempts int, correct int) AS $$
+  SELECT dr.player_id, COUNT(*)::int, COUNT(*) FILTER (WHERE s.is_correct)::int
+  FROM public.scores s
+  JOIN public.daily_rounds dr ON dr.id = s.daily_round_id
+  GROUP BY dr.player_id;
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+-- 2. Write many difficulties at once, then rebuild the payloads of changed players
+CREATE OR REPLACE FUNCTION public.set_player_difficulties(
+  p_difficulties jsonb  -- [{"player_id": ..., "difficulty": 1-5}]
+)
+RETURNS int AS $$
+DECLARE
+  v_count int;
+  v_players uuid[];
+BEGIN
+  WITH updated AS (
+    UPDATE public.players p
+    SET difficulty = d.difficulty
+    FROM jsonb_to_recordset(p_difficulties) AS d(player_id uuid, difficulty smallint)
+    WHERE p.id = d.player_id
+      AND p.difficulty IS DISTINCT FROM d.difficulty
+    RETURNING p.id
+  )
+  SELECT count(*), array_agg(id) INTO v_count, v_players FROM updated;
+
+  IF v_count > 0 THEN
+    PERFORM public.refresh_quiz_payloads(v_players);
+  END IF;
+  RETURN v_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- 3. Pipeline only (service key): new functions are executable by PUBLIC by default
+REVOKE EXECUTE ON FUNCTION public.player_answer_counts() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.set_player_difficulties(jsonb) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.player_answer_counts() TO service_role;
+GRANT EXECUTE ON FUNCTION public.set_player_difficulties(jsonb) TO service_role;
+
+-- 4. Verify: players per difficulty
+SELECT difficulty, COUNT(*) AS players
+FROM public.players
+GROUP BY difficulty
+ORDER BY difficulty;
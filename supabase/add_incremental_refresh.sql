@@ -0,0 +1,50 @@
+-- ============================================================
+-- Incremental Refresh: Wikipedia revision ids per player
+-- ============================================================
+
+-- 1. Store the Wikipedia revision each player was parsed from
+ALTER TABLE public.players
+ADD COLUMN IF NOT EXISTS wikipedia_revid bigint;
+
+-- 2. Replace a player's career in one transaction (used by `scrape_players.py refresh`)
+CREATE OR REPLACE FUNCTION public.replace_career_entries(
+  p_player_id uuid,
+  p_entries jsonb
+)
+RETURNS void AS $$
+BEGIN
+  DELETE FROM public.career_entries WHERE player_id = p_player_id;
+
+  INSERT INTO public.career_entries (
+    player_id, sort_order, chronological_order, years, club,
+    country_code, country_flag, matches, goals
+  )
+  SELECT
+    p_player_id, e.sort_order, e.chronological_order, e.years, e.club,
+    e.country_code, e.country_flag, e.matches, e.goals
+  FROM jsonb_to_recordset(p_entries) AS e(
+    sort_order smallint,
+    chronological_order smallint,
+    years text,
+    club text,
+    country_code text,
+    country_flag text,
+    matches smallint,
+    goals smallint
+  );
+
+  UPDATE public.players
+  SET career_club_count = jsonb_array_length(p_entries)
+  WHERE id = p_player_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- 3. Pipeline only (service key): new functions are executable by PUBLIC by default
+REVOKE EXECUTE ON FUNCTION public.replace_career_entries(uuid, jsonb) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.replace_career_entries(uuid, jsonb) TO service_role;
+
+-- 4. Verify: players still missing a revid will be re-fetched once by the next refresh
+SELECT
+  COUNT(*) as total_players,
+  COUNT(*) FILTER (WHERE wikipedia_revid IS NOT NULL) as with_revid
+FROM public.players;
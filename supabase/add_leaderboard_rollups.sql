@@ -0,0 +1,191 @@
+-- ============================================================
+-- Leaderboard Rollups: per-member totals maintained on every score
+--
+-- v_leaderboard and v_daily_leaderboard (migration.sql) aggregate every
+-- score of a party on each read. These tables hold the same totals, kept up
+-- to date by a trigger on scores, so a leaderboard read is an indexed lookup.
+-- The app reads v_leaderboard_rollup / v_daily_leaderboard_rollup, which
+-- return the same columns as the original views. The original views stay
+-- as the reference: pipeline/leaderboards.py diffs both on one snapshot.
+-- ============================================================
+
+-- 1. Totals per member (v_leaderboard)
+CREATE TABLE IF NOT EXISTS public.leaderboard_totals (
+  member_id uuid PRIMARY KEY REFERENCES public.party_members(id) ON DELETE CASCADE,
+  party_id uuid NOT NULL REFERENCES public.parties(id) ON DELETE CASCADE,
+  total_points bigint NOT NULL DEFAULT 0,
+  correct_answers int NOT NULL DEFAULT 0,
+  total_answers int NOT NULL DEFAULT 0,
+  correct_time_ms bigint NOT NULL DEFAULT 0,  -- sum of time_ms over correct answers (for the average)
+  last_played timestamptz
+);
+
+CREATE INDEX IF NOT EXISTS idx_leaderboard_totals_party ON public.leaderboard_totals(party_id);
+
+-- 2. Totals per member per round date (v_daily_leaderboard)
+CREATE TABLE IF NOT EXISTS public.leaderboard_daily (
+  member_id uuid NOT NULL REFERENCES public.party_members(id) ON DELETE CASCADE,
+  round_date date NOT NULL,
+  party_id uuid NOT NULL REFERENCES public.parties(id) ON DELETE CASCADE,
+  day_points bigint NOT NULL DEFAULT 0,
+  day_correct int NOT NULL DEFAULT 0,
+  day_answers int NOT NULL DEFAULT 0,
+  PRIMARY KEY (member_id, round_date)
+);
+
+CREATE INDEX IF NOT EXISTS idx_leaderboard_daily_party_date ON public.leaderboard_daily(party_id, round_date);
+
+ALTER TABLE public.leaderboard_totals ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.leaderboard_daily ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Leaderboard totals are viewable by everyone" ON public.leaderboard_totals FOR SELECT USING (true);
+CREATE POLICY "Daily leaderboards are viewable by everyone" ON public.leaderboard_daily FOR SELECT USING (true);
+
+-- 3. Recompute the rollup rows of one member from scores (or every member)
+CREATE OR REPLACE FUNCTION public.rebuild_leaderboards(
+  p_member_id uuid DEFAULT NULL
+)
+RETURNS void AS $$
+BEGIN
+  DELETE FROM public.leaderboard_totals WHERE p_member_id IS NULL OR member_id = p_member_id;
+  DELETE FROM public.leaderboard_daily WHERE p_member_id IS NULL OR member_id = p_member_id;
+
+  -- Same rows as v_leaderboard: every score of the member
+  INSERT INTO public.leaderboard_totals (
+    member_id, party_id, total_points, correct_answers, total_answers, correct_time_ms, last_played
+  )
+  SELECT
+    pm.id, pm.party_id, SUM(s.points), COUNT(*) FILTER (WHERE s.is_correct), COUNT(*),
+    COALESCE(SUM(s.time_ms) FILTER (WHERE s.is_correct), 0), MAX(s.answered_at)
+  FROM public.scores s
+  JOIN public.party_members pm ON pm.id = s.member_id
+  WHERE p_member_id IS NULL OR s.member_id = p_member_id
+  GROUP BY pm.id, pm.party_id;
+
+  -- Same rows as v_daily_leaderboard: scores on rounds of the member's own party
+  INSERT INTO public.leaderboard_daily (
+    member_id, round_date, party_id, day_points, day_correct, day_answers
+  )
+  SELECT pm.id, dr.round_date, dr.party_id, SUM(s.points), COUNT(*) FILTER (WHERE s.is_correct), COUNT(*)
+  FROM public.scores s
+  JOIN public.party_members pm ON pm.id = s.member_id
+  JOIN public.daily_rounds dr ON dr.id = s.daily_round_id AND dr.party_id = pm.party_id
+  WHERE p_member_id IS NULL OR s.member_id = p_member_id
+  GROUP BY pm.id, dr.round_date, dr.party_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- 4. Keep the rollups current: inserts add to the totals; updates and
+--    deletes (rare: cascades from deleted rounds) recompute the member
+CREATE OR REPLACE FUNCTION public.apply_score_to_leaderboards()
+RETURNS trigger AS $$
+DECLARE
+  v_member_party uuid;
+  v_round_party uuid;
+  v_round_date date;
+BEGIN
+  IF TG_OP <> 'INSERT' THEN
+    PERFORM public.rebuild_leaderboards(OLD.member_id);
+    IF TG_OP = 'UPDATE' AND NEW.member_id <> OLD.member_id THEN
+      PERFORM public.rebuild_leaderboards(NEW.member_id);
+    END IF;
+    RETURN NULL;
+  END IF;
+
+  SELECT party_id INTO v_member_party FROM public.party_members WHERE id = NEW.member_id;
+  SELECT party_id, round_date INTO v_round_party, v_round_date
+  FROM public.daily_rounds WHERE id = NEW.daily_round_id;
+
+  INSERT INTO public.leaderboard_totals AS t (
+    member_id, party_id, total_points, correct_answers, total_answers, correct_time_ms, last_played
+  )
+  VALUES (
+    NEW.member_id, v_member_party, NEW.points, NEW.is_correct::int, 1,
+    CASE WHEN NEW.is_correct THEN NEW.time_ms ELSE 0 END, NEW.answered_at
+  )
+  ON CONFLICT (member_id) DO UPDATE SET
+    total_points = t.total_points + EXCLUDED.total_points,
+    correct_answers = t.correct_answers + EXCLUDED.correct_answers,
+    total_answers = t.total_answers + EXCLUDED.total_answers,
+    correct_time_ms = t.correct_time_ms + EXCLUDED.correct_time_ms,
+    last_played = GREATEST(t.last_played, EXCLUDED.last_played);
+
+  IF v_round_party = v_member_party THEN
+    INSERT INTO public.leaderboard_daily AS d (
+      member_id, round_date, party_id, day_points, day_correct, day_answers
+    )
+    VALUES (NEW.member_id, v_round_date, v_round_party, NEW.points, NEW.is_correct::int, 1)
+    ON CONFLICT (member_id, round_date) DO UPDATE SET
+      day_points = d.day_points + EXCLUDED.day_points,
+      day_correct = d.day_correct + EXCLUDED.day_correct,
+      day_answers = d.day_answers + EXCLUDED.day_answers;
+  END IF;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS trg_scores_leaderboards ON public.scores;
+CREATE TRIGGER trg_scores_leaderboards
+AFTER INSERT OR UPDATE OR DELETE ON public.scores
+FOR EACH ROW EXECUTE FUNCTION public.apply_score_to_leaderboards();
+
+-- 5. Read views with the columns of v_leaderboard / v_daily_leaderboard
+CREATE OR REPLACE VIEW public.v_leaderboard_rollup AS
+SELECT
+  pm.party_id,
+  pm.id AS member_id,
+  pm.nickname,
+  pm.avatar_emoji,
+  COALESCE(t.total_points, 0) AS total_points,
+  COALESCE(t.correct_answers, 0)::bigint AS correct_answers,
+  COALESCE(t.total_answers, 0)::bigint AS total_answers,
+  CASE WHEN t.correct_answers > 0 THEN t.correct_time_ms::numeric / t.correct_answers ELSE 0 END AS avg_time_ms,
+  t.last_played
+FROM public.party_members pm
+LEFT JOIN public.leaderboard_totals t ON t.member_id = pm.id;
+
+CREATE OR REPLACE VIEW public.v_daily_leaderboard_rollup AS
+SELECT
+  r.party_id,
+  r.round_date,
+  pm.id AS member_id,
+  pm.nickname,
+  pm.avatar_emoji,
+  COALESCE(d.day_points, 0) AS day_points,
+  COALESCE(d.day_correct, 0)::bigint AS day_correct,
+  COALESCE(d.day_answers, 0)::bigint AS day_answers
+FROM (SELECT DISTINCT party_id, round_date FROM public.daily_rounds) r
+JOIN public.party_members pm ON pm.party_id = r.party_id
+LEFT JOIN public.leaderboard_daily d ON d.member_id = pm.id AND d.round_date = r.round_date;
+
+-- 6. Both versions of the given parties' leaderboards from one snapshot
+CREATE OR REPLACE FUNCTION public.leaderboard_snapshot(
+  p_party_ids uuid[]
+)
+RETURNS jsonb AS $$
+  SELECT jsonb_build_object(
+    'totals_view', (SELECT COALESCE(jsonb_agg(to_jsonb(v)), '[]') FROM public.v_leaderboard v
+                    WHERE v.party_id = ANY(p_party_ids)),
+    'totals_rollup', (SELECT COALESCE(jsonb_agg(to_jsonb(v)), '[]') FROM public.v_leaderboard_rollup v
+                      WHERE v.party_id = ANY(p_party_ids)),
+    'daily_view', (SELECT COALESCE(jsonb_agg(to_jsonb(v)), '[]') FROM public.v_daily_leaderboard v
+                   WHERE v.party_id = ANY(p_party_ids)),
+    'daily_rollup', (SELECT COALESCE(jsonb_agg(to_jsonb(v)), '[]') FROM public.v_daily_leaderboard_rollup v
+                     WHERE v.party_id = ANY(p_party_ids))
+  );
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+-- 7. Pipeline only (service key): new functions are executable by PUBLIC by default
+REVOKE EXECUTE ON FUNCTION public.rebuild_leaderboards(uuid) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.leaderboard_snapshot(uuid[]) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.rebuild_leaderboards(uuid) TO service_role;
+GRANT EXECUTE ON FUNCTION public.leaderboard_snapshot(uuid[]) TO service_role;
+
+-- 8. Backfill from existing scores
+SELECT public.rebuild_leaderboards();
+
+-- 9. Verify: members whose rollup differs from v_leaderboard (should be 0)
+SELECT COUNT(*) AS mismatched_members
+FROM public.v_leaderboard v
+JOIN public.v_leaderboard_rollup r ON r.member_id = v.member_id
+WHERE v.total_points <> r.total_points OR v.total_answers <> r.total_answers;
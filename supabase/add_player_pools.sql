@@ -0,0 +1,155 @@
+-- ============================================================
+-- Player Pools: pre-shuffled infinite-mode draws
+-- Built by pipeline/player_pools.py (after uploads / nightly).
+--
+-- Every eligible player gets one row per filter bucket: start decade x
+-- nationality x league, where '' means "any". Players are shuffled once
+-- and shuffle_rank numbers each bucket's rows 0..n-1 in that order. A
+-- draw picks a uniformly random row of the requested buckets and reads
+-- the bucket from the primary key at that rank instead of sorting the
+-- players table.
+-- ============================================================
+
+-- 1. Pool table (the primary key doubles as the covering draw index)
+CREATE TABLE IF NOT EXISTS public.player_pool (
+  start_decade smallint NOT NULL,
+  nationality_code text NOT NULL,     -- '' = any nationality
+  league text NOT NULL,               -- '' = any league
+  shuffle_rank int NOT NULL,          -- 0..n-1 within the bucket
+  player_id uuid NOT NULL REFERENCES public.players(id) ON DELETE CASCADE,
+  career_start_year smallint NOT NULL,
+
+  PRIMARY KEY (start_decade, nationality_code, league, shuffle_rank, player_id)
+);
+
+-- 2. Staging table filled in chunks by the pipeline, swapped in atomically
+CREATE TABLE IF NOT EXISTS public.player_pool_staging (LIKE public.player_pool);
+
+ALTER TABLE public.player_pool ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Player pool is viewable by everyone" ON public.player_pool FOR SELECT USING (true);
+ALTER TABLE public.player_pool_staging ENABLE ROW LEVEL SECURITY;
+
+-- 3. Replace the live pool with the staged one in one transaction. An empty
+--    staging table (nothing eligible, or a failed upload) keeps the live pool.
+CREATE OR REPLACE FUNCTION public.swap_player_pool()
+RETURNS int AS $$
+DECLARE
+  v_count int;
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM public.player_pool_staging) THEN
+    RAISE EXCEPTION 'player_pool_staging is empty: keeping the live pool';
+  END IF;
+
+  DELETE FROM public.player_pool;
+  INSERT INTO public.player_pool SELECT * FROM public.player_pool_staging;
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+  DELETE FROM public.player_pool_staging;
+  RETURN v_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- 4. Draw random players for infinite mode. Each pick is a uniformly
+--    random row of the requested buckets; when that player is excluded or
+--    outside the year range, the next eligible one in the bucket is taken.
+--    Callable by anon, so at most 20 players are drawn per call.
+CREATE OR REPLACE FUNCTION public.draw_pool_players(
+  p_count int DEFAULT 1,
+  p_exclude_ids uuid[] DEFAULT '{}',
+  p_start_year_min smallint DEFAULT NULL,
+  p_start_year_max smallint DEFAULT NULL,
+  p_leagues text[] DEFAULT NULL,
+  p_nationalities text[] DEFAULT NULL
+)
+RETURNS TABLE (player_id uuid) AS $$
+DECLARE
+  v_decade_min smallint := COALESCE(p_start_year_min, 1980) / 10 * 10;
+  v_decade_max smallint := COALESCE(p_start_year_max, extract(year from current_date)::int) / 10 * 10;
+  v_leagues text[] := CASE WHEN cardinality(p_leagues) > 0 THEN p_leagues ELSE ARRAY[''] END;
+  v_nats text[] := CASE WHEN cardinality(p_nationalities) > 0 THEN p_nationalities ELSE ARRAY[''] END;
+  v_exclude uuid[] := COALESCE(p_exclude_ids, '{}');
+  v_count int := LEAST(GREATEST(COALESCE(p_count, 1), 0), 20);
+  v_decades smallint[];
+  v_codes text[];
+  v_bucket_leagues text[];
+  v_sizes int[];
+  v_total int;
+  v_bucket int;
+  v_rank int;
+  v_player uuid;
+  v_found uuid[] := '{}';
+BEGIN
+  -- Requested buckets and their sizes (highest rank + 1, read from the primary key)
+  SELECT array_agg(b.decade ORDER BY b.decade, b.code, b.league),
+         array_agg(b.code ORDER BY b.decade, b.code, b.league),
+         array_agg(b.league ORDER BY b.decade, b.code, b.league),
+         array_agg(b.size ORDER BY b.decade, b.code, b.league),
+         COALESCE(SUM(b.size), 0)
+  INTO v_decades, v_codes, v_bucket_leagues, v_sizes, v_total
+  FROM (
+    SELECT d.decade::smallint AS decade, n.code, l.league,
+           (SELECT COALESCE(MAX(pp.shuffle_rank) + 1, 0)
+            FROM public.player_pool pp
+            WHERE pp.start_decade = d.decade AND pp.nationality_code = n.code
+              AND pp.league = l.league) AS size
+    FROM unnest(v_nats) n(code)
+    CROSS JOIN unnest(v_leagues) l(league)
+    CROSS JOIN generate_series(v_decade_min, v_decade_max, 10) d(decade)
+  ) b;
+
+  WHILE cardinality(v_found) < v_count AND v_total > 0 LOOP
+    -- Uniform position over all rows of the requested buckets
+    v_rank := floor(random() * v_total)::int;
+    v_bucket := 1;
+    WHILE v_rank >= v_sizes[v_bucket] LOOP
+      v_rank := v_rank - v_sizes[v_bucket];
+      v_bucket := v_bucket + 1;
+    END LOOP;
+
+    -- First eligible player from that rank on, wrapping around to rank 0
+    SELECT c.player_id INTO v_player
+    FROM (
+      (SELECT pp.player_id, 1 AS pass, pp.shuffle_rank
+       FROM public.player_pool pp
+       WHERE pp.start_decade = v_decades[v_bucket]
+         AND pp.nationality_code = v_codes[v_bucket]
+         AND pp.league = v_bucket_leagues[v_bucket]
+         AND pp.shuffle_rank >= v_rank
+         AND (p_start_year_min IS NULL OR pp.career_start_year >= p_start_year_min)
+         AND (p_start_year_max IS NULL OR pp.career_start_year <= p_start_year_max)
+         AND NOT (pp.player_id = ANY(v_exclude || v_found))
+       ORDER BY pp.shuffle_rank
+       LIMIT 1)
+      UNION ALL
+      (SELECT pp.player_id, 2 AS pass, pp.shuffle_rank
+       FROM public.player_pool pp
+       WHERE pp.start_decade = v_decades[v_bucket]
+         AND pp.nationality_code = v_codes[v_bucket]
+         AND pp.league = v_bucket_leagues[v_bucket]
+         AND pp.shuffle_rank < v_rank
+         AND (p_start_year_min IS NULL OR pp.career_start_year >= p_start_year_min)
+         AND (p_start_year_max IS NULL OR pp.career_start_year <= p_start_year_max)
+         AND NOT (pp.player_id = ANY(v_exclude || v_found))
+       ORDER BY pp.shuffle_rank
+       LIMIT 1)
+    ) c
+    ORDER BY c.pass
+    LIMIT 1;
+
+    IF v_player IS NULL THEN
+      -- Nothing eligible left in this bucket: stop drawing from it
+      v_total := v_total - v_sizes[v_bucket];
+      v_sizes[v_bucket] := 0;
+    ELSE
+      v_found := v_found || v_player;
+    END IF;
+  END LOOP;
+
+  RETURN QUERY SELECT unnest(v_found);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- 5. Grant permissions: only draws are public (new functions are executable by PUBLIC by default)
+REVOKE EXECUTE ON FUNCTION public.swap_player_pool() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.swap_player_pool() TO service_role;
+GRANT EXECUTE ON FUNCTION public.draw_pool_players(int, uuid[], smallint, smallint, text[], text[])
+  TO anon, authenticated, service_role;
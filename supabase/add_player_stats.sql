@@ -0,0 +1,118 @@
+-- ============================================================
+-- Player Stats: observed difficulty of each player from scores
+-- Maintained by pipeline/player_stats.py (refresh_player_stats).
+--
+-- Incremental: a watermark on scores.answered_at marks what has been
+-- aggregated. Each run only recomputes the players answered since then
+-- (from all of their scores, so medians stay exact). The window starts a
+-- few minutes before the watermark so scores committed late are not missed;
+-- recomputing a player twice is harmless.
+-- ============================================================
+
+-- 1. One row per player that has been played at least once
+CREATE TABLE IF NOT EXISTS public.player_stats (
+  player_id uuid PRIMARY KEY REFERENCES public.players(id) ON DELETE CASCADE,
+  attempts int NOT NULL DEFAULT 0,
+  correct int NOT NULL DEFAULT 0,
+  solve_rate real,                 -- correct / attempts
+  mean_clubs_revealed real,
+  median_time_ms int,              -- over correct answers only
+  last_answered_at timestamptz,
+  updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_player_stats_solve_rate ON public.player_stats(solve_rate);
+
+ALTER TABLE public.player_stats ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Player stats are viewable by everyone" ON public.player_stats FOR SELECT USING (true);
+
+-- 2. Watermarks of incremental jobs (pipeline only, no policies)
+CREATE TABLE IF NOT EXISTS public.job_watermarks (
+  job text PRIMARY KEY,
+  watermark timestamptz NOT NULL,
+  updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+ALTER TABLE public.job_watermarks ENABLE ROW LEVEL SECURITY;
+
+-- answered_at range scans for the incremental window
+CREATE INDEX IF NOT EXISTS idx_scores_answered_at ON public.scores(answered_at);
+
+-- 3. Recompute stats of players answered since the watermark (p_full: every player)
+CREATE OR REPLACE FUNCTION public.refresh_player_stats(
+  p_full boolean DEFAULT false
+)
+RETURNS jsonb AS $$
+DECLARE
+  v_since timestamptz;
+  v_until timestamptz;
+  v_count int;
+BEGIN
+  SELECT watermark - interval '5 minutes' INTO v_since
+  FROM public.job_watermarks WHERE job = 'player_stats';
+  IF p_full OR v_since IS NULL THEN
+    v_since := '-infinity';
+  END IF;
+
+  SELECT max(answered_at) INTO v_until FROM public.scores WHERE answered_at > v_since;
+  IF v_until IS NULL THEN
+    RETURN jsonb_build_object('players', 0, 'watermark', v_since);
+  END IF;
+
+  WITH touched AS (
+    SELECT DISTINCT dr.player_id
+    FROM public.scores s
+    JOIN public.daily_rounds dr ON dr.id = s.daily_round_id
+    WHERE s.answered_at > v_since
+  ),
+  stats AS (
+    SELECT
+      dr.player_id,
+      COUNT(*)::int AS attempts,
+      COUNT(*) FILTER (WHERE s.is_correct)::int AS correct,
+      AVG(s.clubs_revealed)::real AS mean_clubs_revealed,
+      (percentile_cont(0.5) WITHIN GROUP (ORDER BY s.time_ms) FILTER (WHERE s.is_correct))::int AS median_time_ms,
+      MAX(s.answered_at) AS last_answered_at
+    FROM touched t
+    JOIN public.daily_rounds dr ON dr.player_id = t.player_id
+    JOIN public.scores s ON s.daily_round_id = dr.id
+    GROUP BY dr.player_id
+  )
+  INSERT INTO public.player_stats AS ps (
+    player_id, attempts, correct, solve_rate, mean_clubs_revealed, median_time_ms, last_answered_at, updated_at
+  )
+  SELECT player_id, attempts, correct, correct::real / attempts, mean_clubs_revealed, median_time_ms,
+         last_answered_at, now()
+  FROM stats
+  ON CONFLICT (player_id) DO UPDATE SET
+    attempts = EXCLUDED.attempts,
+    correct = EXCLUDED.correct,
+    solve_rate = EXCLUDED.solve_rate,
+    mean_clubs_revealed = EXCLUDED.mean_clubs_revealed,
+    median_time_ms = EXCLUDED.median_time_ms,
+    last_answered_at = EXCLUDED.last_answered_at,
+    updated_at = EXCLUDED.updated_at;
+
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+
+  INSERT INTO public.job_watermarks (job, watermark, updated_at)
+  VALUES ('player_stats', v_until, now())
+  ON CONFLICT (job) DO UPDATE SET watermark = EXCLUDED.watermark, updated_at = EXCLUDED.updated_at;
+
+  RETURN jsonb_build_object('players', v_count, 'watermark', v_until);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- 4. Pipeline only (service key): new functions are executable by PUBLIC by default
+REVOKE EXECUTE ON FUNCTION public.refresh_player_stats(boolean) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.refresh_player_stats(boolean) TO service_role;
+
+-- 5. First full run, then verify: hardest players with enough answers
+SELECT public.refresh_player_stats(true);
+
+SELECT p.name, ps.attempts, ps.solve_rate, ps.mean_clubs_revealed, ps.median_time_ms
+FROM public.player_stats ps
+JOIN public.players p ON p.id = ps.player_id
+WHERE ps.attempts >= 5
+ORDER BY ps.solve_rate
+LIMIT 20;
@@ -0,0 +1,66 @@
+-- ============================================================
+-- Idempotent Player Upload: one row per Wikidata QID
+-- Run `python pipeline/dedup_players.py` BEFORE this migration,
+-- otherwise the unique constraint cannot be created.
+-- ============================================================
+
+-- 1. Check for remaining duplicates (must return no rows)
+SELECT wikidata_id, COUNT(*) as copies
+FROM public.players
+WHERE wikidata_id IS NOT NULL
+GROUP BY wikidata_id
+HAVING COUNT(*) > 1;
+
+-- 2. One player per QID (target of on_conflict=wikidata_id upserts)
+ALTER TABLE public.players
+ADD CONSTRAINT players_wikidata_id_key UNIQUE (wikidata_id);
+
+-- 3. Replace the careers of several players in one transaction
+--    p_entries: [{player_id, sort_order, chronological_order, years, club, ...}, ...]
+CREATE OR REPLACE FUNCTION public.replace_career_entries_bulk(
+  p_entries jsonb
+)
+RETURNS void AS $$
+BEGIN
+  CREATE TEMP TABLE _new_entries ON COMMIT DROP AS
+  SELECT *
+  FROM jsonb_to_recordset(p_entries) AS e(
+    player_id uuid,
+    sort_order smallint,
+    chronological_order smallint,
+    years text,
+    club text,
+    country_code text,
+    country_flag text,
+    matches smallint,
+    goals smallint
+  );
+
+  DELETE FROM public.career_entries ce
+  USING (SELECT DISTINCT player_id FROM _new_entries) n
+  WHERE ce.player_id = n.player_id;
+
+  INSERT INTO public.career_entries (
+    player_id, sort_order, chronological_order, years, club,
+    country_code, country_flag, matches, goals
+  )
+  SELECT
+    player_id, sort_order, chronological_order, years, club,
+    country_code, country_flag, matches, goals
+  FROM _new_entries;
+
+  -- Players only count as playable once their career is written
+  UPDATE public.players p
+  SET career_club_count = n.club_count
+  FROM (
+    SELECT player_id, COUNT(*)::smallint as club_count
+    FROM _new_entries
+    GROUP BY player_id
+  ) n
+  WHERE p.id = n.player_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- 4. Pipeline only (service key): new functions are executable by PUBLIC by default
+REVOKE EXECUTE ON FUNCTION public.replace_career_entries_bulk(jsonb) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.replace_career_entries_bulk(jsonb) TO service_role;
@@ -0,0 +1,108 @@
+-- ============================================================
+-- Quiz Payloads: one precomputed row per player for the game
+-- Maintained by the Python pipeline (pipeline/quiz_payloads.py),
+-- so the app never joins players to career_entries at read time.
+-- ============================================================
+
+-- 1. Denormalized payload table
+CREATE TABLE IF NOT EXISTS public.player_quiz_payloads (
+  player_id uuid PRIMARY KEY REFERENCES public.players(id) ON DELETE CASCADE,
+  name text NOT NULL,
+  aliases text[] NOT NULL DEFAULT '{}',
+  difficulty smallint NOT NULL,
+  career jsonb NOT NULL DEFAULT '[]',   -- career entries ordered by chronological_order
+  -- Filter columns (same meaning as on players)
+  is_active boolean NOT NULL DEFAULT true,
+  career_club_count smallint NOT NULL DEFAULT 0,
+  career_start_year smallint,
+  leagues_played text[] NOT NULL DEFAULT '{}',
+  nationality_code text,
+  nationality_flag text,
+  updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_payloads_start_year ON public.player_quiz_payloads(career_start_year);
+CREATE INDEX IF NOT EXISTS idx_payloads_nationality ON public.player_quiz_payloads(nationality_code);
+CREATE INDEX IF NOT EXISTS idx_payloads_leagues ON public.player_quiz_payloads USING gin(leagues_played);
+
+-- 2. Enable RLS
+ALTER TABLE public.player_quiz_payloads ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Quiz payloads are viewable by everyone" ON public.player_quiz_payloads FOR SELECT USING (true);
+
+-- 3. Rebuild payloads for the given players (NULL = every player)
+CREATE OR REPLACE FUNCTION public.refresh_quiz_payloads(
+  p_player_ids uuid[] DEFAULT NULL
+)
+RETURNS int AS $$
+DECLARE
+  v_count int;
+BEGIN
+  INSERT INTO public.player_quiz_payloads (
+    player_id, name, aliases, difficulty, career, is_active, career_club_count,
+    career_start_year, leagues_played, nationality_code, nationality_flag, updated_at
+  )
+  SELECT
+    p.id,
+    p.name,
+    p.aliases,
+    p.difficulty,
+    COALESCE(c.career, '[]'::jsonb),
+    p.is_active,
+    COALESCE(c.club_count, 0),
+    c.start_year,
+    COALESCE(c.leagues, '{}'),
+    p.nationality_code,
+    p.nationality_flag,
+    now()
+  FROM public.players p
+  LEFT JOIN LATERAL (
+    SELECT
+      jsonb_agg(jsonb_build_object(
+        'sort_order', ce.sort_order,
+        'chronological_order', ce.chronological_order,
+        'years', ce.years,
+        'club', ce.club,
+        'country_code', ce.country_code,
+        'country_flag', ce.country_flag,
+        'matches', ce.matches,
+        'goals', ce.goals
+      ) ORDER BY ce.chronological_order) as career,
+      COUNT(*)::smallint as club_count,
+      -- Same parsing as add_filters.sql
+      MIN(CAST(NULLIF(regexp_replace(split_part(ce.years, '–', 1), '[^0-9]', '', 'g'), '') AS int))::smallint as start_year,
+      array_agg(DISTINCT ce.country_code) FILTER (WHERE ce.country_code IS NOT NULL AND ce.country_code != '') as leagues
+    FROM public.career_entries ce
+    WHERE ce.player_id = p.id
+  ) c ON true
+  WHERE p_player_ids IS NULL OR p.id = ANY(p_player_ids)
+  ON CONFLICT (player_id) DO UPDATE SET
+    name = EXCLUDED.name,
+    aliases = EXCLUDED.aliases,
+    difficulty = EXCLUDED.difficulty,
+    career = EXCLUDED.career,
+    is_active = EXCLUDED.is_active,
+    career_club_count = EXCLUDED.career_club_count,
+    career_start_year = EXCLUDED.career_start_year,
+    leagues_played = EXCLUDED.leagues_played,
+    nationality_code = EXCLUDED.nationality_code,
+    nationality_flag = EXCLUDED.nationality_flag,
+    updated_at = EXCLUDED.updated_at;
+
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+  RETURN v_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- 4. Pipeline only (service key): new functions are executable by PUBLIC by default
+REVOKE EXECUTE ON FUNCTION public.refresh_quiz_payloads(uuid[]) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.refresh_quiz_payloads(uuid[]) TO service_role;
+
+-- 5. Initial build
+SELECT public.refresh_quiz_payloads();
+
+-- 6. Verify
+SELECT
+  COUNT(*) as payloads,
+  COUNT(*) FILTER (WHERE career_club_count >= 2) as playable,
+  COUNT(*) FILTER (WHERE career_start_year IS NOT NULL) as with_start_year
+FROM public.player_quiz_payloads;